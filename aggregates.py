@@ -0,0 +1,270 @@
+"""
+Aggregates Module voor RadarChart Feedback Analyse
+
+Houdt per (persoon, competentie, type) samenvoegbare statistieken bij:
+aantal, som en M2 (som van kwadratische afwijkingen, Welford) plus de
+ruwe scores die in de details getoond worden. Nieuwe feedback wordt met de
+formules van Chan samengevoegd, zodat gemiddelden, standaard deviaties en
+team gemiddelden bijgewerkt worden in tijd evenredig aan de nieuwe rijen.
+
+De ruwe scores per type staan in volgorde van toevoegen: na een append
+volgen de nieuwe scores op de bestaande, niet in de volgorde van de rijen
+in het bestand. Statistieken hangen daar niet van af.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import math
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Set
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessingError, combine_klantgerichtheid
+from score_store import PersonScoreStore
+
+# Grootte van een Python float en van een 64-bit rij sleutel als int object
+FLOAT_BYTES = sys.getsizeof(0.0)
+ROW_KEY_BYTES = sys.getsizeof(2 ** 63)
+
+def merge_moments(n_a: int, sum_a: float, m2_a: float, n_b: int, sum_b: float, m2_b: float) -> tuple:
+    """
+    Voegt (aantal, som, M2) van twee groepen samen (Chan et al.)
+    
+    De som blijft exact bij gehele scores, zodat som / aantal hetzelfde
+    gemiddelde (en dezelfde afronding) geeft als een volledige herberekening.
+    
+    Returns:
+        tuple: (aantal, som, M2) van de samengevoegde groep
+    """
+    n = n_a + n_b
+    if n_a == 0 or n_b == 0:
+        return n, sum_a + sum_b, m2_a + m2_b
+    delta = sum_b / n_b - sum_a / n_a
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, sum_a + sum_b, m2
+
+def scores_moments(scores: List[float]) -> tuple:
+    """(aantal, som, M2) van een lijst scores"""
+    n = len(scores)
+    if n == 0:
+        return 0, 0.0, 0.0
+    total = math.fsum(scores)
+    return n, total, math.fsum((score - total / n) ** 2 for score in scores)
+
+class FeedbackAggregates:
+    """Samenvoegbare statistieken van een dataset, bij te werken met nieuwe rijen"""
+    
+    def __init__(self):
+        # persoon -> competentie -> type -> [aantal, som, M2, ruwe scores]
+        self.cells = {}
+        # Aantal long rijen per persoon (total_responses)
+        self.person_rows = {}
+        # Gemiddelde per (persoon, competentie), nodig om team sommen bij te werken
+        self.comp_means = {}
+        # competentie -> [som van persoonsgemiddelden, aantal personen]
+        self.team = {}
+        # Hashes van Timestamp + Beoordelaar + Persoon van alle verwerkte rijen
+        self.row_keys = set()
+        self.total_rows = 0
+        self.total_entries = 0
+        self.competency_categories = []
+        # Versie van de dataset die deze toestand beschrijft
+        self.dataset_id = None
+    
+    @classmethod
+    def from_dataset(cls, persons: Mapping[str, Dict[str, Any]], team_averages: Dict[str, float],
+                     row_keys: Iterable[int], processing_summary: Dict[str, Any]) -> 'FeedbackAggregates':
+        """
+        Bouwt de statistieken op uit een verwerkte dataset (eenmalig per dataset)
+        
+        Args:
+            persons (Mapping[str, Dict[str, Any]]): Persoon data; bij een PersonScoreStore
+                worden de details per sub-competentie gebruikt
+            team_averages (Dict[str, float]): Team gemiddelden (alleen voor de volgorde)
+            row_keys (Iterable[int]): Sleutels van de al verwerkte rijen
+            processing_summary (Dict[str, Any]): Samenvatting van de verwerking
+            
+        Returns:
+            FeedbackAggregates: Statistieken van de dataset
+            
+        Raises:
+            DataProcessingError: Als de details niet per type beschikbaar zijn
+        """
+        aggregates = cls()
+        aggregates.team = {competentie: [0.0, 0] for competentie in team_averages}
+        
+        if isinstance(persons, PersonScoreStore):
+            # Eén gegroepeerde pass over de arrays in plaats van de details per persoon
+            aggregates.cells = {person_name: {} for person_name in persons}
+            for person_name, competentie, feedback_type, scores in persons.iter_cells():
+                scores = scores.astype(float).tolist()
+                types = aggregates.cells.setdefault(person_name, {}).setdefault(competentie, {})
+                types[feedback_type] = [*scores_moments(scores), scores]
+            details_by_person = {name: persons.sub_competency_details(name)
+                                 for name in persons.overrides if name in persons}
+        else:
+            details_by_person = {name: person_data['details'] for name, person_data in persons.items()}
+        
+        for person_name, details in details_by_person.items():
+            competencies = aggregates.cells.setdefault(person_name, {})
+            for competentie, detail in details.items():
+                if 'by_type' not in detail:
+                    raise DataProcessingError(
+                        f"Details van {competentie} voor {person_name} zijn samengevoegd; "
+                        f"toevoegen kan alleen met een volledige nieuwe upload"
+                    )
+                competencies[competentie] = {
+                    feedback_type: [*scores_moments(stats['scores']), list(stats['scores'])]
+                    for feedback_type, stats in detail['by_type'].items()
+                }
+        
+        # Team sommen in volgorde van de personen, zoals bij een volledige verwerking
+        for person_name, person_data in persons.items():
+            for competentie in aggregates.cells.setdefault(person_name, {}):
+                aggregates._update_team(person_name, competentie)
+            aggregates.person_rows[person_name] = person_data['total_responses']
+        
+        aggregates.row_keys = set(int(key) for key in row_keys)
+        aggregates.total_rows = processing_summary.get('total_rows_processed', 0)
+        aggregates.total_entries = processing_summary.get('total_feedback_entries', 0)
+        aggregates.competency_categories = list(processing_summary.get('competency_categories', []))
+        return aggregates
+    
+    def _combined(self, person_name: str, competentie: str) -> tuple:
+        """(aantal, gemiddelde, M2) over alle types van een (persoon, competentie)"""
+        n, total, m2 = 0, 0.0, 0.0
+        for type_n, type_total, type_m2, _ in self.cells[person_name][competentie].values():
+            n, total, m2 = merge_moments(n, total, m2, type_n, type_total, type_m2)
+        return n, (total / n if n else 0.0), m2
+    
+    def _update_team(self, person_name: str, competentie: str) -> None:
+        """Vervangt het gemiddelde van een persoon in de team som van een competentie"""
+        _, mean, _ = self._combined(person_name, competentie)
+        team = self.team.setdefault(competentie, [0.0, 0])
+        previous = self.comp_means.get((person_name, competentie))
+        if previous is None:
+            team[1] += 1
+        else:
+            team[0] -= previous
+        team[0] += mean
+        self.comp_means[(person_name, competentie)] = mean
+    
+    def add_long_frame(self, long_df: pd.DataFrame) -> Set[str]:
+        """
+        Voegt nieuwe feedback in long format toe aan de statistieken
+        
+        Args:
+            long_df (pd.DataFrame): Alleen de nieuwe feedback in long format
+            
+        Returns:
+            Set[str]: Personen waarvan de scores veranderd zijn
+        """
+        valid = long_df[long_df['Score'].notna() & long_df['Persoon'].notna()]
+        grouped = valid.groupby(['Persoon', 'Competentie', 'Type'], sort=False, observed=True)['Score']
+        batch = grouped.agg(['count', 'sum', 'var'])
+        
+        # Ruwe scores per groep, zelfde aanpak als ExcelProcessor._group_statistics
+        order = np.argsort(grouped.ngroup().to_numpy(), kind='stable')
+        boundaries = np.cumsum(batch['count'].to_numpy())[:-1]
+        batch_scores = np.split(valid['Score'].to_numpy(dtype=float)[order], boundaries)
+        
+        touched = set()
+        for (person_name, competentie, feedback_type), n, total, var, scores in zip(
+                batch.index, batch['count'], batch['sum'], batch['var'], batch_scores):
+            n = int(n)
+            m2 = float(var) * (n - 1) if n > 1 else 0.0
+            types = self.cells.setdefault(person_name, {}).setdefault(competentie, {})
+            current = types.get(feedback_type)
+            if current is None:
+                types[feedback_type] = [n, float(total), m2, scores.tolist()]
+            else:
+                current[:3] = merge_moments(current[0], current[1], current[2], n, float(total), m2)
+                current[3].extend(scores.tolist())
+            touched.add((person_name, competentie))
+        
+        for person_name, competentie in touched:
+            self._update_team(person_name, competentie)
+        
+        for person_name, count in long_df.groupby('Persoon', sort=False, observed=True).size().items():
+            self.person_rows[person_name] = self.person_rows.get(person_name, 0) + int(count)
+        self.total_entries += len(long_df)
+        
+        return {person_name for person_name, _ in touched}
+    
+    def build_person(self, person_name: str) -> Dict[str, Any]:
+        """
+        Stelt scores en details van een persoon samen, zelfde vorm als ExcelProcessor
+        
+        KLANTGERICHTHEID blijft per sub-competentie; score_store.combine_person
+        voegt die samen zoals de API ze toont.
+        
+        Args:
+            person_name (str): Naam van de persoon
+            
+        Returns:
+            Dict[str, Any]: Scores, details en aantal responses
+        """
+        competency_scores = {}
+        competency_details = {}
+        for competentie, types in self.cells.get(person_name, {}).items():
+            n, mean, m2 = self._combined(person_name, competentie)
+            competency_scores[competentie] = round(mean, 2)
+            competency_details[competentie] = {
+                'overall_average': round(mean, 2),
+                'by_type': {
+                    feedback_type: {
+                        'average': type_total / type_n,
+                        'count': type_n,
+                        'scores': list(scores)
+                    }
+                    for feedback_type, (type_n, type_total, _, scores) in types.items()
+                },
+                'total_responses': n,
+                'std_deviation': round(math.sqrt(m2 / (n - 1)), 2) if n > 1 else 0
+            }
+        
+        return {
+            'person_name': person_name,
+            'scores': competency_scores,
+            'details': competency_details,
+            'total_responses': self.person_rows.get(person_name, 0)
+        }
+    
+    def team_averages(self) -> Dict[str, float]:
+        """Team gemiddelden per competentie: gemiddelde van de persoonsgemiddelden"""
+        team_averages = {
+            competentie: round(total / count, 2)
+            for competentie, (total, count) in self.team.items() if count
+        }
+        combine_klantgerichtheid(team_averages)
+        return team_averages
+    
+    def available_persons(self) -> List[str]:
+        """Alfabetische lijst van personen, zelfde filter als get_available_persons"""
+        return sorted(person for person in self.cells if person and str(person).strip())
+    
+    def nbytes(self) -> int:
+        """
+        Geschat geheugengebruik in bytes, voor het geheugenbudget van de registry
+        
+        De ruwe scores (een float object per score) en de rij sleutels
+        bepalen de grootte; de overige dicts tellen met hun eigen grootte.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.cells)
+        for competencies in self.cells.values():
+            size += sys.getsizeof(competencies)
+            for types in competencies.values():
+                size += sys.getsizeof(types)
+                for cell in types.values():
+                    size += sys.getsizeof(cell) + sys.getsizeof(cell[3]) + len(cell[3]) * FLOAT_BYTES
+        size += sys.getsizeof(self.row_keys) + len(self.row_keys) * ROW_KEY_BYTES
+        for mapping in (self.person_rows, self.comp_means, self.team):
+            size += sys.getsizeof(mapping) + len(mapping) * 2 * FLOAT_BYTES
+        return size
+    
+    def row_keys_array(self) -> np.ndarray:
+        """Sleutels van alle verwerkte rijen als uint64 array"""
+        return np.fromiter(self.row_keys, dtype=np.uint64, count=len(self.row_keys))
@@ -1,14 +1,73 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, stream_with_context, send_file, g, Response
 from werkzeug.utils import secure_filename
 import os
+import shutil
 import tempfile
-from datetime import datetime
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, date
 import json
-from data_processor import ExcelProcessor, DataProcessingError
+import logging
+import threading
+import time
+import tracemalloc
+from data_processor import ExcelProcessor, DataProcessingError, PROCESSOR_VERSION, estimate_batch_memory
+from result_cache import ResultCache, file_content_key
+from data_store import MemoryBudget, SnapshotStore, DatasetRegistry, DatasetSnapshot, new_dataset_id
+from chart_renderer import render_export_svg, scale_chart_options
+from export_jobs import ExportJobManager, export_zip_name
+from aggregates import FeedbackAggregates
+from score_store import merge_persons
+from score_scales import load_scales, scales_fingerprint
+from schema_cache import SchemaCache
+from metrics import MetricsRegistry, StageTimings, PeakRssSampler, MB
+
+logger = logging.getLogger(__name__)
 
 # Flask applicatie initialisatie
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+MAX_UPLOAD_MB = 64
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024  # 64MB max file size
+
+# Vanaf deze grootte worden .xlsx bestanden in chunks (streaming) verwerkt
+STREAMING_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+# Meetgegevens voor /metrics (Prometheus tekst formaat)
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    'radarchart_http_requests_total', 'Aantal afgehandelde HTTP requests', ('method', 'endpoint', 'status'))
+http_latency = metrics.histogram(
+    'radarchart_http_request_duration_seconds', 'Duur van HTTP requests in seconden', ('method', 'endpoint'))
+upload_stage_latency = metrics.histogram(
+    'radarchart_upload_stage_duration_seconds', 'Duur per verwerkingsstap van uploads in seconden', ('stage',))
+upload_rows = metrics.counter(
+    'radarchart_upload_rows_total', 'Verwerkte wide rijen van uploads', ('mode',))
+upload_admission = metrics.counter(
+    'radarchart_upload_admission_total', 'Toelatingsbeslissingen van uploads op het geheugenbudget', ('decision',))
+
+# RADARCHART_TRACE_MEMORY=1 meet het exacte piekgeheugen per stap (tracemalloc, maakt verwerking trager)
+if os.environ.get('RADARCHART_TRACE_MEMORY') == '1':
+    tracemalloc.start()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label op de route (bijv. /get_scores/<person_name>), niet op de url zelf
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    started = g.get('request_started')
+    if started is not None:
+        http_latency.observe(time.perf_counter() - started, (request.method, endpoint))
+    http_requests.inc((request.method, endpoint, str(response.status_code)))
+    return response
+
+def record_stages(stages):
+    """Neem de duur per verwerkingsstap op in de upload histogrammen"""
+    for stage, entry in stages.items():
+        upload_stage_latency.observe(entry['seconds'], (stage,))
 
 # CORS headers voor lokaal gebruik
 @app.after_request
@@ -18,23 +77,249 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-# In-memory data opslag
-processed_data = {
-    "persons": {},  # Dictionary met persoon data
-    "team_averages": {},  # Team gemiddelden per competentie
-    "upload_timestamp": None,
-    "processing_summary": {},  # Samenvatting van verwerking
-    "available_persons": []  # Lijst van beschikbare personen
-}
+# Lokale snapshots zodat verwerkte data een herstart overleeft; zet
+# RADARCHART_SNAPSHOT_DIR op een lege waarde om dit uit te schakelen
+SNAPSHOT_DIR = os.environ.get('RADARCHART_SNAPSHOT_DIR',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+snapshot_store = SnapshotStore(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+
+# In-memory data opslag: meerdere datasets naast elkaar, elk met een eigen id.
+# Bij overschrijden van het geheugenbudget verdwijnt de minst recent gebruikte
+# dataset uit geheugen (en wordt zo nodig uit zijn snapshot opnieuw geladen).
+# Datasets zijn onveranderlijk en worden pas na volledige opbouw gepubliceerd,
+# dus requests lezen zonder lock en zien nooit een half verwerkte upload.
+MEMORY_BUDGET_MB = int(os.environ.get('RADARCHART_MEMORY_BUDGET_MB', 512))
+registry = DatasetRegistry(MEMORY_BUDGET_MB * 1024 * 1024, snapshot_store)
+
+# Geheugenbudget voor verwerkingen die tegelijk lopen. Elke upload schat vooraf
+# zijn piekgeheugen uit header en rij aantal; past die niet, dan wordt de upload
+# geweigerd (413) of, als andere verwerkingen de ruimte bezetten, uitgesteld (503)
+PROCESSING_MEMORY_MB = int(os.environ.get('RADARCHART_PROCESSING_MEMORY_MB', 1024))
+processing_budget = MemoryBudget(PROCESSING_MEMORY_MB * 1024 * 1024)
+ADMISSION_RETRY_AFTER_SECONDS = 5
+
+def admit_processing(processor, file_path, allow_streaming=True):
+    """
+    Kies de verwerkingsmodus binnen het geheugenbudget en reserveer het geheugen
+    
+    Grote .xlsx bestanden gaan bij voorkeur gestreamd; past de voorkeursmodus
+    niet in het budget, dan wordt de andere modus geprobeerd.
+    
+    Args:
+        processor (ExcelProcessor): Processor die de verwerking gaat doen
+        file_path (str): Pad naar het geüploade bestand
+        allow_streaming (bool): Of de streaming verwerking gebruikt mag worden
+        
+    Returns:
+        tuple: (plan met 'mode', 'reserved' en 'estimated_mb', foutmelding response of None);
+            bij een plan moet processing_budget.release(plan['reserved']) volgen
+    """
+    estimate = processor.estimate_memory(file_path)
+    modes = ['full']
+    if allow_streaming and estimate['streaming_supported']:
+        if os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES:
+            modes.insert(0, 'streaming')
+        else:
+            modes.append('streaming')
+    
+    fitting = [mode for mode in modes if processing_budget.fits(estimate[f'{mode}_bytes'])]
+    if not fitting:
+        smallest = min(estimate[f'{mode}_bytes'] for mode in modes)
+        return None, reject_too_large(smallest, estimate['estimated_rows'])
+    
+    mode = fitting[0]
+    return reserve_processing(mode, estimate[f'{mode}_bytes'])
+
+def admit_batch(processor, file_paths):
+    """
+    Reserveer het geheugen van een batch die alle bestanden tegelijk verwerkt
+    
+    Args:
+        processor (ExcelProcessor): Processor die de batch gaat verwerken
+        file_paths (list): Paden van de bestanden
+        
+    Returns:
+        tuple: (plan, foutmelding response of None), zie admit_processing
+    """
+    estimates = []
+    for file_path in file_paths:
+        try:
+            estimates.append(processor.estimate_memory(file_path))
+        except DataProcessingError:
+            # Een onleesbaar bestand wordt per bestand gemeld door de verwerking
+            continue
+    
+    size = estimate_batch_memory(estimates)
+    if not processing_budget.fits(size):
+        return None, reject_too_large(size, sum(estimate['estimated_rows'] for estimate in estimates))
+    return reserve_processing('batch', size)
+
+def reject_too_large(size, estimated_rows):
+    """413 response voor een verwerking die nooit in het budget past"""
+    upload_admission.inc(('rejected_too_large',))
+    logger.warning(f"Upload geweigerd: geschat {size / MB:.0f}MB, budget {PROCESSING_MEMORY_MB}MB")
+    return jsonify({
+        'error': (f'Bestand te groot om te verwerken: geschat geheugengebruik {size / MB:.0f}MB '
+                  f'({estimated_rows} rijen), budget is {PROCESSING_MEMORY_MB}MB. '
+                  f'Splits het bestand of verhoog RADARCHART_PROCESSING_MEMORY_MB.'),
+        'success': False,
+        'estimated_mb': round(size / MB, 1),
+        'budget_mb': PROCESSING_MEMORY_MB
+    }), 413
+
+def reserve_processing(mode, size):
+    """
+    Reserveer geheugen voor een verwerking naast de lopende verwerkingen
+    
+    Returns:
+        tuple: (plan, None) of (None, 503 response met Retry-After)
+    """
+    if not processing_budget.try_reserve(size):
+        upload_admission.inc(('rejected_busy',))
+        response = jsonify({
+            'error': 'Server is bezig met andere verwerkingen; probeer het over enkele seconden opnieuw',
+            'success': False,
+            'estimated_mb': round(size / MB, 1),
+            'budget_mb': PROCESSING_MEMORY_MB
+        })
+        return None, (response, 503, {'Retry-After': str(ADMISSION_RETRY_AFTER_SECONDS)})
+    
+    upload_admission.inc(('admitted',))
+    return {'mode': mode, 'reserved': size, 'estimated_mb': round(size / MB, 1)}, None
+
+def memory_summary(plan, sampler):
+    """Geschat en gemeten geheugen van een verwerking voor processing_summary"""
+    summary = {
+        'mode': plan['mode'],
+        'estimated_mb': plan['estimated_mb'],
+        'budget_mb': PROCESSING_MEMORY_MB,
+        'measured_peak_rss_mb': sampler.peak_mb,
+        'measured_increase_mb': sampler.increase_mb
+    }
+    if sampler.increase_mb is not None and sampler.increase_mb > plan['estimated_mb']:
+        logger.warning(f"Geheugengebruik {sampler.increase_mb}MB boven de schatting van {plan['estimated_mb']}MB")
+    return summary
+
+def resolve_dataset(dataset_id=None):
+    """
+    Bepaal de gevraagde dataset uit ?dataset_id=..., standaard de nieuwste upload
+    
+    Args:
+        dataset_id (str): Expliciet dataset id, gaat voor de query parameter
+        
+    Returns:
+        tuple: (dataset, foutmelding response of None)
+    """
+    dataset_id = dataset_id or request.args.get('dataset_id')
+    dataset = registry.get(dataset_id)
+    
+    if dataset is None and dataset_id:
+        return None, (jsonify({
+            'error': f'Dataset "{dataset_id}" niet gevonden',
+            'success': False
+        }), 404)
+    
+    if dataset is None or not dataset.persons:
+        return None, (jsonify({
+            'error': 'Geen data beschikbaar. Upload eerst een Excel bestand.',
+            'success': False
+        }), 404)
+    
+    return dataset, None
+
+def dataset_scale(dataset):
+    """Schaal van een dataset voor de chart payloads: naam en hoogste score (as maximum)"""
+    return {
+        'score_scale': dataset.processing_summary.get('score_scale'),
+        'score_max': dataset.processing_summary.get('score_max')
+    }
+
+# Appends bouwen voort op de statistieken van een dataset; één tegelijk
+append_lock = threading.Lock()
+
+def publish_dataset(dataset):
+    """Bewaar de snapshot lokaal en maak de dataset zichtbaar"""
+    # Een fout in de snapshot mag de upload niet laten mislukken
+    if snapshot_store is not None:
+        try:
+            snapshot_store.save(dataset)
+        except Exception as e:
+            logger.warning(f"Kon snapshot niet opslaan: {str(e)}")
+    
+    # Publiceer de dataset in een keer
+    registry.add(dataset)
+
+# Cache van verwerkte resultaten op inhoud van het bestand; zet RADARCHART_CACHE_DIR
+# voor persistente opslag op schijf (blijft lokaal)
+result_cache = ResultCache(cache_dir=os.environ.get('RADARCHART_CACHE_DIR'))
+
+# Batch exports op de server; RADARCHART_EXPORT_WORKERS bepaalt hoeveel jobs tegelijk draaien
+export_jobs = ExportJobManager(max_workers=int(os.environ.get('RADARCHART_EXPORT_WORKERS', 2)))
+
+# Batch uploads lezen elk bestand in een eigen proces; RADARCHART_BATCH_WORKERS bepaalt
+# het aantal processen (standaard het aantal cores, 1 = na elkaar in de server zelf)
+BATCH_WORKERS = int(os.environ.get('RADARCHART_BATCH_WORKERS', os.cpu_count() or 1))
+MAX_BATCH_FILES = 50
+# Grens voor de uitgepakte inhoud van een ZIP, tegen zip bommen
+MAX_BATCH_UNCOMPRESSED_MB = 512
+batch_pool = None
+batch_pool_lock = threading.Lock()
+
+def get_batch_pool(replace_broken=False):
+    """
+    Process pool voor batch uploads, gestart bij de eerste batch
+    
+    Args:
+        replace_broken (bool): Vervang de pool, bijvoorbeeld nadat een worker gestopt is
+        
+    Returns:
+        ProcessPoolExecutor: Pool, of None als de batch in de server zelf draait
+    """
+    global batch_pool
+    if BATCH_WORKERS <= 1:
+        return None
+    with batch_pool_lock:
+        if batch_pool is not None and replace_broken:
+            batch_pool.shutdown(wait=False, cancel_futures=True)
+            batch_pool = None
+        if batch_pool is None:
+            batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return batch_pool
+
+# Antwoordschalen: standaard schalen plus eigen schalen uit RADARCHART_SCALES_FILE (JSON)
+score_scales = load_scales(os.environ.get('RADARCHART_SCALES_FILE'))
+SCALES_VERSION = scales_fingerprint(score_scales)
+
+# Gedetecteerde formulier indelingen op fingerprint van de header; zet
+# RADARCHART_SCHEMA_FILE om ze lokaal te bewaren over herstarts heen
+schema_cache = SchemaCache(schema_file=os.environ.get('RADARCHART_SCHEMA_FILE'))
 
 # Toegestane bestandsextensies
-ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
+ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 
 def allowed_file(filename):
     """Controleer of bestand een toegestane extensie heeft"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def requested_scale():
+    """
+    Schaal uit het form veld of ?scale=..., None voor automatisch herkennen
+    
+    Returns:
+        tuple: (schaal naam of None, foutresponse of None)
+    """
+    scale = request.form.get('scale') or request.args.get('scale')
+    if not scale or scale == 'auto':
+        return None, None
+    if scale not in score_scales:
+        return None, (jsonify({
+            'error': f'Onbekende schaal: {scale}',
+            'success': False,
+            'available_scales': list(score_scales)
+        }), 400)
+    return scale, None
+
 @app.route('/')
 def index():
     """Serveer de hoofdpagina"""
@@ -54,6 +339,7 @@ def index():
                 <ul>
                     <li>.xlsx (Excel 2007+)</li>
                     <li>.xls (Excel 97-2003)</li>
+                    <li>.csv (export van Google Forms of MS Forms)</li>
                 </ul>
                 <h2>Verwachte Excel Structuur:</h2>
                 <ul>
@@ -90,11 +376,15 @@ def upload_file():
         # Valideer bestandstype
         if not allowed_file(file.filename):
             return jsonify({
-                'error': 'Alleen .xlsx en .xls bestanden zijn toegestaan',
+                'error': 'Alleen .xlsx, .xls en .csv bestanden zijn toegestaan',
                 'success': False,
-                'supported_formats': ['.xlsx', '.xls']
+                'supported_formats': ['.xlsx', '.xls', '.csv']
             }), 400
         
+        scale, error_response = requested_scale()
+        if error_response:
+            return error_response
+        
         # Beveilig bestandsnaam
         filename = secure_filename(file.filename)
         
@@ -103,10 +393,42 @@ def upload_file():
             file.save(temp_file.name)
             temp_file_path = temp_file.name
         
+        # Append modus: alleen nieuwe rijen toevoegen aan een bestaande dataset
+        if request.form.get('mode') == 'append':
+            try:
+                return append_upload(temp_file_path, filename, scale)
+            finally:
+                if os.path.exists(temp_file_path):
+                    os.unlink(temp_file_path)
+        
         try:
-            # Gebruik ExcelProcessor voor verwerking
-            processor = ExcelProcessor()
-            result = processor.process_excel_file(temp_file_path)
+            # Identieke uploads worden direct uit de cache beantwoord
+            # De schaal hoort bij de sleutel: een andere schaal geeft andere scores
+            cache_key = file_content_key(temp_file_path, f"{PROCESSOR_VERSION}/{scale or 'auto'}/{SCALES_VERSION}")
+            result = result_cache.get(cache_key)
+            from_cache = result is not None
+            memory = None
+            
+            if result is None:
+                # Gebruik ExcelProcessor voor verwerking, binnen het geheugenbudget
+                processor = ExcelProcessor(scale=scale, scales=score_scales, schema_cache=schema_cache)
+                plan, error_response = admit_processing(processor, temp_file_path)
+                if error_response:
+                    os.unlink(temp_file_path)
+                    return error_response
+                
+                try:
+                    with PeakRssSampler() as sampler:
+                        if plan['mode'] == 'streaming':
+                            result = processor.process_excel_file_streaming(temp_file_path)
+                        else:
+                            result = processor.process_excel_file(temp_file_path)
+                finally:
+                    processing_budget.release(plan['reserved'])
+                memory = memory_summary(plan, sampler)
+                
+                if result['success']:
+                    result_cache.put(cache_key, result)
             
             # Verwijder tijdelijk bestand
             os.unlink(temp_file_path)
@@ -118,19 +440,28 @@ def upload_file():
                     'validation_errors': result.get('validation_errors', [])
                 }), 400
             
-            # Sla verwerkte data op in memory
-            processed_data["persons"] = {}
-            for person_name, person_data in result['persons'].items():
-                processed_data["persons"][person_name] = {
-                    "scores": person_data['scores'],
-                    "details": person_data['details'],
-                    "total_responses": person_data['total_responses']
-                }
+            # Bouw de nieuwe dataset volledig op voordat hij zichtbaar wordt; de
+            # compacte PersonScoreStore blijft staan, dicts per persoon ontstaan bij opvragen
+            persons = result['persons']
+            dataset = DatasetSnapshot.build(
+                dataset_id=new_dataset_id(),
+                persons=persons,
+                team_averages=result['team_averages'],
+                upload_timestamp=datetime.now().isoformat(),
+                processing_summary=result['processing_summary'],
+                available_persons=result['available_persons'],
+                row_keys=result.get('row_keys')
+            )
             
-            processed_data["team_averages"] = result['team_averages']
-            processed_data["upload_timestamp"] = datetime.now().isoformat()
-            processed_data["processing_summary"] = result['processing_summary']
-            processed_data["available_persons"] = result['available_persons']
+            # Stappen van deze request: de verwerking (niet bij een cache hit) en het publiceren
+            timings = StageTimings()
+            with timings.stage('store_publish', rows_in=len(persons)):
+                publish_dataset(dataset)
+            stages = {} if from_cache else dict(result['processing_summary'].get('stages', {}))
+            stages.update(timings.to_dict())
+            record_stages(stages)
+            if not from_cache:
+                upload_rows.inc(('full',), result['processing_summary']['total_rows_processed'])
             
             # Retourneer succesvol resultaat
             return jsonify({
@@ -138,12 +469,20 @@ def upload_file():
                 'message': f'Bestand {filename} succesvol verwerkt',
                 'persons': result['available_persons'],
                 'competencies': result['competencies'],
-                'upload_timestamp': processed_data["upload_timestamp"],
+                'dataset_id': dataset.dataset_id,
+                'upload_timestamp': dataset.upload_timestamp,
                 'processing_summary': {
                     'total_rows_processed': result['processing_summary']['total_rows_processed'],
                     'persons_found': result['processing_summary']['persons_found'],
                     'competencies_found': result['processing_summary']['competencies_found'],
-                    'total_responses': result['total_responses']
+                    'total_responses': result['total_responses'],
+                    'score_scale': result['processing_summary'].get('score_scale'),
+                    'score_max': result['processing_summary'].get('score_max'),
+                    'schema': result['processing_summary'].get('schema'),
+                    'validation_errors': result['processing_summary'].get('validation_errors', []),
+                    'from_cache': from_cache,
+                    'stages': stages,
+                    'memory': memory
                 }
             })
             
@@ -173,44 +512,366 @@ def upload_file():
             'success': False
         }), 500
 
+def save_batch_files(uploads, work_dir):
+    """
+    Sla de bestanden van een batch op; een ZIP wordt uitgepakt
+    
+    Args:
+        uploads (list): Geüploade bestanden (werkzeug FileStorage)
+        work_dir (str): Tijdelijke map voor de bestanden
+        
+    Returns:
+        tuple: (lijst van (pad, bestandsnaam), overgeslagen bestanden met fout, foutmelding response of None)
+    """
+    files = []
+    skipped = []
+    
+    def target_path(name):
+        return os.path.join(work_dir, f"{len(files)}_{name}")
+    
+    for upload in uploads:
+        filename = secure_filename(upload.filename)
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension == 'zip':
+            archive_path = os.path.join(work_dir, f"archive_{filename}")
+            upload.save(archive_path)
+            try:
+                with zipfile.ZipFile(archive_path) as archive:
+                    members = [
+                        info for info in archive.infolist()
+                        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                        and not os.path.basename(info.filename).startswith(('.', '~$'))
+                    ]
+                    if len(files) + len(members) > MAX_BATCH_FILES:
+                        return None, None, (jsonify({
+                            'error': f'Te veel bestanden in een batch, maximaal {MAX_BATCH_FILES}',
+                            'success': False
+                        }), 400)
+                    if sum(info.file_size for info in members) > MAX_BATCH_UNCOMPRESSED_MB * MB:
+                        return None, None, (jsonify({
+                            'error': f'ZIP {filename} is uitgepakt groter dan {MAX_BATCH_UNCOMPRESSED_MB}MB',
+                            'success': False
+                        }), 413)
+                    for info in members:
+                        source = f"{filename}/{info.filename}"
+                        name = secure_filename(os.path.basename(info.filename))
+                        if not allowed_file(name):
+                            skipped.append({'file': source, 'success': False, 'error': 'Niet ondersteund bestandstype'})
+                            continue
+                        path = target_path(name)
+                        with archive.open(info) as member, open(path, 'wb') as target:
+                            shutil.copyfileobj(member, target)
+                        files.append((path, source))
+            except zipfile.BadZipFile as e:
+                skipped.append({'file': filename, 'success': False, 'error': f'Ongeldig ZIP bestand: {str(e)}'})
+            finally:
+                os.unlink(archive_path)
+        elif allowed_file(filename):
+            path = target_path(filename)
+            upload.save(path)
+            files.append((path, filename))
+        else:
+            skipped.append({'file': filename, 'success': False, 'error': 'Niet ondersteund bestandstype'})
+        
+        if len(files) > MAX_BATCH_FILES:
+            return None, None, (jsonify({
+                'error': f'Te veel bestanden in een batch, maximaal {MAX_BATCH_FILES}',
+                'success': False
+            }), 400)
+    
+    return files, skipped, None
+
+@app.route('/upload_batch', methods=['POST'])
+def upload_batch():
+    """
+    Upload meerdere bestanden (veld 'files') of een ZIP met bestanden als één dataset
+    
+    Elk bestand wordt in de process pool gelezen en omgezet, daarna worden ze
+    samengevoegd tot één nieuwe dataset. Per bestand staan herkomst en fouten in
+    processing_summary['files']; een fout bestand laat de rest niet mislukken.
+    """
+    uploads = [upload for upload in request.files.getlist('files') + request.files.getlist('file') if upload.filename]
+    if not uploads:
+        return jsonify({
+            'error': 'Geen bestanden gevonden in request',
+            'success': False
+        }), 400
+    
+    scale, error_response = requested_scale()
+    if error_response:
+        return error_response
+    
+    work_dir = tempfile.mkdtemp(prefix='radarchart_batch_')
+    try:
+        files, skipped, error_response = save_batch_files(uploads, work_dir)
+        if error_response:
+            return error_response
+        if not files:
+            return jsonify({
+                'error': 'Geen .xlsx, .xls of .csv bestanden gevonden in de upload',
+                'success': False,
+                'files': skipped
+            }), 400
+        
+        processor = ExcelProcessor(scale=scale, scales=score_scales, schema_cache=schema_cache)
+        plan, error_response = admit_batch(processor, [path for path, _ in files])
+        if error_response:
+            return error_response
+        
+        try:
+            # Het gemeten geheugen is dat van de server; de worker processen tellen niet mee
+            with PeakRssSampler() as sampler:
+                try:
+                    result = processor.process_excel_files(files, get_batch_pool())
+                except BrokenProcessPool:
+                    logger.warning("Process pool gestopt, wordt opnieuw gestart")
+                    result = processor.process_excel_files(files, get_batch_pool(replace_broken=True))
+        finally:
+            processing_budget.release(plan['reserved'])
+        memory = memory_summary(plan, sampler)
+        
+        if not result['success']:
+            return jsonify({
+                'error': f'Fout bij verwerken van de batch: {result["error"]}',
+                'success': False,
+                'validation_errors': result.get('validation_errors', []),
+                'files': result.get('files', []) + skipped
+            }), 400
+        
+        summary = result['processing_summary']
+        file_summaries = summary['files'] = summary['files'] + skipped
+        persons = result['persons']
+        dataset = DatasetSnapshot.build(
+            dataset_id=new_dataset_id(),
+            persons=persons,
+            team_averages=result['team_averages'],
+            upload_timestamp=datetime.now().isoformat(),
+            processing_summary=summary,
+            available_persons=result['available_persons'],
+            row_keys=result.get('row_keys')
+        )
+        
+        timings = StageTimings()
+        with timings.stage('store_publish', rows_in=len(persons)):
+            publish_dataset(dataset)
+        stages = dict(summary['stages'])
+        stages.update(timings.to_dict())
+        record_stages(stages)
+        upload_rows.inc(('batch',), summary['total_rows_processed'])
+        
+        succeeded = sum(1 for entry in file_summaries if entry['success'])
+        return jsonify({
+            'success': True,
+            'message': f'{succeeded} van {len(file_summaries)} bestanden verwerkt tot één dataset',
+            'persons': result['available_persons'],
+            'competencies': result['competencies'],
+            'dataset_id': dataset.dataset_id,
+            'upload_timestamp': dataset.upload_timestamp,
+            'processing_summary': {
+                'total_rows_processed': summary['total_rows_processed'],
+                'persons_found': summary['persons_found'],
+                'competencies_found': summary['competencies_found'],
+                'total_responses': result['total_responses'],
+                'score_scale': summary['score_scale'],
+                'score_max': summary['score_max'],
+                'validation_errors': summary['validation_errors'],
+                'files': file_summaries,
+                'stages': stages,
+                'memory': memory
+            }
+        })
+    
+    except Exception as e:
+        logger.error(f"Fout bij batch upload: {str(e)}")
+        return jsonify({
+            'error': f'Onverwachte fout bij verwerken van de batch: {str(e)}',
+            'success': False
+        }), 500
+    
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def cached_payload_response(dataset, key, serialize, mimetype='application/json'):
+    """
+    Serveer een eenmalig per dataset geserialiseerde response met ETag en 304 ondersteuning
+    
+    Args:
+        dataset (DatasetSnapshot): Dataset van de request
+        key (tuple): Endpoint en wat de response verder bepaalt (cache sleutel en ETag)
+        serialize (callable): Bouwt de body (bytes) op bij eerste gebruik
+        mimetype (str): Content type van de body
+        
+    Returns:
+        Response: 200 met body, of 304 als de client de versie al heeft
+    """
+    etag = dataset.etag(*key)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        body = dataset.payload(key, serialize)
+        response = app.response_class(body, mimetype=mimetype)
+    
+    response.set_etag(etag)
+    # Browser moet altijd hervalideren; een nieuwe upload geeft een nieuwe ETag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def append_upload(temp_file_path, filename, scale=None):
+    """
+    Voeg de nieuwe rijen van een upload toe aan een bestaande dataset
+    
+    De dataset (form veld of ?dataset_id=..., standaard de nieuwste) blijft
+    ongewijzigd; het resultaat is een nieuwe versie met een eigen dataset id.
+    Alleen personen met nieuwe feedback worden opnieuw samengesteld.
+    
+    Args:
+        temp_file_path (str): Pad naar het geüploade bestand
+        filename (str): Beveiligde bestandsnaam
+        scale (str): Gevraagde schaal; standaard de schaal van de dataset
+        
+    Returns:
+        Response: JSON resultaat van de append
+    """
+    base, error_response = resolve_dataset(request.form.get('dataset_id'))
+    if error_response:
+        return error_response
+    
+    with append_lock:
+        # De statistieken van een dataset horen bij de laatste versie die eruit
+        # is voortgekomen; voor elke andere versie worden ze opnieuw opgebouwd
+        aggregates = base.aggregates
+        if aggregates is not None and aggregates.dataset_id != base.dataset_id:
+            aggregates = None
+        
+        try:
+            if aggregates is None:
+                if base.row_keys is None:
+                    return jsonify({
+                        'error': 'Deze dataset bevat geen rij sleutels; upload het bestand opnieuw volledig',
+                        'success': False
+                    }), 409
+                aggregates = FeedbackAggregates.from_dataset(
+                    base.persons, base.team_averages, base.row_keys.tolist(), base.processing_summary
+                )
+            
+            # Nieuwe rijen worden gescoord op dezelfde schaal als de dataset
+            scale = scale or base.processing_summary.get('score_scale')
+            if scale not in score_scales:
+                scale = None
+            
+            # De append verwerkt het hele bestand in een keer
+            processor = ExcelProcessor(scale=scale, scales=score_scales, schema_cache=schema_cache)
+            plan, error_response = admit_processing(processor, temp_file_path, allow_streaming=False)
+            if error_response:
+                return error_response
+            try:
+                with PeakRssSampler() as sampler:
+                    result = processor.append_excel_file(temp_file_path, aggregates)
+            finally:
+                processing_budget.release(plan['reserved'])
+            memory = memory_summary(plan, sampler)
+            
+            if not result['success']:
+                # De statistieken kunnen half bijgewerkt zijn; de volgende append bouwt ze opnieuw op
+                aggregates.dataset_id = None
+                return jsonify({
+                    'error': f'Fout bij verwerken Excel bestand: {result["error"]}',
+                    'success': False,
+                    'validation_errors': result.get('validation_errors', [])
+                }), 400
+            
+            # Onveranderde personen worden gedeeld met de vorige versie
+            persons = merge_persons(base.persons, result['updated_persons'])
+            dataset = DatasetSnapshot.build(
+                dataset_id=new_dataset_id(),
+                persons=persons,
+                team_averages=result['team_averages'],
+                upload_timestamp=datetime.now().isoformat(),
+                processing_summary=result['processing_summary'],
+                available_persons=result['available_persons'],
+                row_keys=aggregates.row_keys_array(),
+                aggregates=aggregates
+            )
+            aggregates.dataset_id = dataset.dataset_id
+            timings = StageTimings()
+            with timings.stage('store_publish', rows_in=len(result['updated_persons'])):
+                publish_dataset(dataset)
+            stages = dict(result['processing_summary']['stages'])
+            stages.update(timings.to_dict())
+            record_stages(stages)
+            upload_rows.inc(('append',), result['append_summary']['new_rows'])
+        
+        except DataProcessingError as e:
+            if aggregates is not None:
+                aggregates.dataset_id = None
+            return jsonify({
+                'error': f'Data processing fout: {str(e)}',
+                'success': False
+            }), 400
+    
+    return jsonify({
+        'success': True,
+        'message': f'Bestand {filename} toegevoegd aan dataset {base.dataset_id}',
+        'persons': result['available_persons'],
+        'competencies': result['competencies'],
+        'dataset_id': dataset.dataset_id,
+        'appended_to': base.dataset_id,
+        'upload_timestamp': dataset.upload_timestamp,
+        'append_summary': result['append_summary'],
+        'processing_summary': {
+            'total_rows_processed': result['processing_summary']['total_rows_processed'],
+            'persons_found': result['processing_summary']['persons_found'],
+            'competencies_found': result['processing_summary']['competencies_found'],
+            'total_responses': result['processing_summary']['total_feedback_entries'],
+            'score_scale': result['processing_summary']['score_scale'],
+            'score_max': result['processing_summary']['score_max'],
+            'schema': result['processing_summary']['schema'],
+            'validation_errors': result['processing_summary']['validation_errors'],
+            'stages': stages,
+            'memory': memory
+        }
+    })
+
 @app.route('/get_scores/<person_name>')
 def get_scores(person_name):
     """Retourneer scores voor specifieke persoon"""
     try:
         # Controleer of er data beschikbaar is
-        if not processed_data["persons"]:
-            return jsonify({
-                'error': 'Geen data beschikbaar. Upload eerst een Excel bestand.',
-                'success': False
-            }), 404
+        dataset, error_response = resolve_dataset()
+        if error_response:
+            return error_response
         
         # Controleer of persoon bestaat
-        if person_name not in processed_data["persons"]:
-            available_persons = processed_data["available_persons"]
+        if person_name not in dataset.persons:
+            available_persons = dataset.available_persons
             return jsonify({
                 'error': f'Persoon "{person_name}" niet gevonden',
                 'available_persons': available_persons,
                 'success': False
             }), 404
         
-        # Haal persoon data op
-        person_data = processed_data["persons"][person_name]
-        
-        # Bereid data voor radar chart - FIX: Gebruik juiste data structuur
-        radar_data = {
-            'person_name': person_name,
-            'scores': {
-                'individual_scores': person_data["scores"],  # Frontend verwacht individual_scores
-                'team_averages': processed_data["team_averages"]
-            },
-            'person_details': person_data["details"],
-            'competencies': list(person_data["scores"].keys()),
-            'upload_timestamp': processed_data["upload_timestamp"],
-            'total_responses': person_data["total_responses"],
-            'success': True
-        }
+        def build_radar_data():
+            # Haal persoon data op
+            person_data = dataset.persons[person_name]
+            
+            # Bereid data voor radar chart - FIX: Gebruik juiste data structuur
+            return {
+                'person_name': person_name,
+                'scores': {
+                    'individual_scores': person_data["scores"],  # Frontend verwacht individual_scores
+                    'team_averages': dataset.team_averages
+                },
+                'person_details': person_data["details"],
+                'competencies': list(person_data["scores"].keys()),
+                **dataset_scale(dataset),
+                'dataset_id': dataset.dataset_id,
+                'upload_timestamp': dataset.upload_timestamp,
+                'total_responses': person_data["total_responses"],
+                'success': True
+            }
         
-        return jsonify(radar_data)
+        return cached_payload_response(dataset, ('scores', person_name),
+                                       lambda: jsonify(build_radar_data()).get_data())
         
     except Exception as e:
         return jsonify({
@@ -223,33 +884,34 @@ def get_person_details(person_name):
     """Retourneer gedetailleerde informatie voor specifieke persoon"""
     try:
         # Controleer of er data beschikbaar is
-        if not processed_data["persons"]:
-            return jsonify({
-                'error': 'Geen data beschikbaar. Upload eerst een Excel bestand.',
-                'success': False
-            }), 404
+        dataset, error_response = resolve_dataset()
+        if error_response:
+            return error_response
         
         # Controleer of persoon bestaat
-        if person_name not in processed_data["persons"]:
+        if person_name not in dataset.persons:
             return jsonify({
                 'error': f'Persoon "{person_name}" niet gevonden',
-                'available_persons': processed_data["available_persons"],
+                'available_persons': dataset.available_persons,
                 'success': False
             }), 404
         
-        # Haal gedetailleerde persoon data op
-        person_data = processed_data["persons"][person_name]
-        
-        detailed_data = {
-            'person_name': person_name,
-            'scores': person_data["scores"],
-            'details': person_data["details"],
-            'total_responses': person_data["total_responses"],
-            'team_averages': processed_data["team_averages"],
-            'success': True
-        }
+        def build_detailed_data():
+            # Haal gedetailleerde persoon data op
+            person_data = dataset.persons[person_name]
+            
+            return {
+                'person_name': person_name,
+                'scores': person_data["scores"],
+                'details': person_data["details"],
+                'total_responses': person_data["total_responses"],
+                'team_averages': dataset.team_averages,
+                **dataset_scale(dataset),
+                'success': True
+            }
         
-        return jsonify(detailed_data)
+        return cached_payload_response(dataset, ('details', person_name),
+                                       lambda: jsonify(build_detailed_data()).get_data())
         
     except Exception as e:
         return jsonify({
@@ -261,25 +923,25 @@ def get_person_details(person_name):
 def get_all_persons_data():
     """Retourneer data voor alle personen voor batch export"""
     try:
-        if not processed_data["persons"]:
-            return jsonify({
-                'error': 'Geen data beschikbaar',
-                'success': False
-            }), 404
+        dataset, error_response = resolve_dataset()
+        if error_response:
+            return error_response
         
         all_persons_data = []
-        for person_name in processed_data["available_persons"]:
-            person_data = processed_data["persons"][person_name]
+        for person_name in dataset.available_persons:
+            person_data = dataset.persons[person_name]
             all_persons_data.append({
                 'person_name': person_name,
                 'scores': {
                     'individual_scores': person_data["scores"],
-                    'team_averages': processed_data["team_averages"]
+                    'team_averages': dataset.team_averages
                 }
             })
         
         return jsonify({
             'success': True,
+            'dataset_id': dataset.dataset_id,
+            **dataset_scale(dataset),
             'persons_data': all_persons_data,
             'total_persons': len(all_persons_data)
         })
@@ -289,17 +951,246 @@ def get_all_persons_data():
             'success': False
         }), 500
 
+@app.route('/chart_svg/<person_name>')
+def chart_svg(person_name):
+    """Retourneer de export radar chart van een persoon als server-side gerenderde SVG"""
+    try:
+        dataset, error_response = resolve_dataset()
+        if error_response:
+            return error_response
+        
+        if person_name not in dataset.persons:
+            return jsonify({
+                'error': f'Persoon "{person_name}" niet gevonden',
+                'available_persons': dataset.available_persons,
+                'success': False
+            }), 404
+        
+        # De datum staat in de ondertitel, dus hoort bij de cache sleutel
+        export_date = date.today()
+        
+        def serialize():
+            return render_export_svg(
+                dataset.persons[person_name]["scores"],
+                dataset.team_averages,
+                person_name,
+                export_date,
+                scale_chart_options(dataset.processing_summary.get('score_max'))
+            ).encode('utf-8')
+        
+        return cached_payload_response(dataset, ('svg', person_name, export_date.isoformat()),
+                                       serialize, mimetype='image/svg+xml')
+    
+    except Exception as e:
+        return jsonify({
+            'error': f'Fout bij renderen chart: {str(e)}',
+            'success': False
+        }), 500
+
+def ndjson_line(obj):
+    """Compacte JSON regel voor een NDJSON stream"""
+    return (json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+@app.route('/stream_persons_data')
+def stream_persons_data():
+    """
+    Stream data voor alle personen als NDJSON (batch export)
+    
+    De eerste regel bevat de team gemiddelden (een keer), daarna volgt per
+    persoon een compacte regel en tot slot een afsluitende regel met de
+    cursor voor de volgende pagina.
+    
+    Query parameters:
+        dataset_id: Dataset, standaard de nieuwste
+        name: Alleen deze personen (herhaalbaar, of komma gescheiden via names)
+        cursor: Positie om te starten (uit next_cursor van de vorige pagina)
+        limit: Maximaal aantal personen in deze pagina
+    """
+    dataset, error_response = resolve_dataset()
+    if error_response:
+        return error_response
+    
+    try:
+        cursor = int(request.args.get('cursor', 0))
+        limit = request.args.get('limit')
+        limit = int(limit) if limit is not None else None
+        if cursor < 0 or (limit is not None and limit < 1):
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'cursor moet >= 0 en limit >= 1 zijn',
+            'success': False
+        }), 400
+    
+    # Filter op namen, in de volgorde van de dataset
+    requested = request.args.getlist('name')
+    for names in request.args.getlist('names'):
+        requested.extend(name.strip() for name in names.split(',') if name.strip())
+    if requested:
+        wanted = set(requested)
+        selected = [name for name in dataset.available_persons if name in wanted]
+        missing = [name for name in dict.fromkeys(requested) if name not in dataset.persons]
+    else:
+        selected = list(dataset.available_persons)
+        missing = []
+    
+    end = len(selected) if limit is None else min(cursor + limit, len(selected))
+    page = selected[cursor:end]
+    next_cursor = end if end < len(selected) else None
+    
+    def generate():
+        yield ndjson_line({
+            'type': 'header',
+            'success': True,
+            'dataset_id': dataset.dataset_id,
+            'team_averages': dataset.team_averages,
+            **dataset_scale(dataset),
+            'total_persons': len(selected),
+            'cursor': cursor,
+            'page_size': len(page),
+            'missing_persons': missing
+        })
+        try:
+            for person_name in page:
+                # Regels worden per dataset maar een keer geserialiseerd
+                yield dataset.payload(('ndjson', person_name), lambda: ndjson_line({
+                    'type': 'person',
+                    'person_name': person_name,
+                    'individual_scores': dataset.persons[person_name]["scores"]
+                }))
+        except Exception as e:
+            # Status 200 is al verstuurd; meld de fout als laatste regel
+            logger.exception("Fout tijdens streamen van personen data")
+            yield ndjson_line({'type': 'error', 'error': f'Fout bij streamen personen data: {str(e)}', 'success': False})
+            return
+        yield ndjson_line({'type': 'end', 'returned': len(page), 'next_cursor': next_cursor})
+    
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/export_jobs', methods=['POST'])
+def create_export_job():
+    """
+    Start een batch export op de server
+    
+    JSON body (optioneel):
+        dataset_id: Dataset, standaard de nieuwste
+        names: Lijst met personen, standaard iedereen
+    """
+    payload = request.get_json(silent=True) or {}
+    dataset, error_response = resolve_dataset(payload.get('dataset_id'))
+    if error_response:
+        return error_response
+    
+    names = payload.get('names')
+    if names is None:
+        person_names = list(dataset.available_persons)
+    else:
+        if not isinstance(names, list):
+            return jsonify({'error': 'names moet een lijst zijn', 'success': False}), 400
+        missing = [name for name in names if name not in dataset.persons]
+        if missing:
+            return jsonify({
+                'error': f'Personen niet gevonden: {", ".join(map(str, missing))}',
+                'available_persons': dataset.available_persons,
+                'success': False
+            }), 404
+        person_names = list(dict.fromkeys(names))
+    
+    job = export_jobs.submit(dataset, person_names)
+    return jsonify({
+        'success': True,
+        **job.progress(),
+        'progress_url': f'/export_jobs/{job.job_id}',
+        'download_url': f'/export_jobs/{job.job_id}/download'
+    }), 202
+
+@app.route('/export_jobs/<job_id>')
+def export_job_progress(job_id):
+    """Retourneer de voortgang van een export job"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Export job "{job_id}" niet gevonden', 'success': False}), 404
+    return jsonify({'success': True, **job.progress()})
+
+@app.route('/export_jobs/<job_id>/download')
+def export_job_download(job_id):
+    """Stream het ZIP archief van een afgeronde export job"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Export job "{job_id}" niet gevonden', 'success': False}), 404
+    if job.status != 'done':
+        return jsonify({
+            'error': f'Export job is nog niet klaar (status: {job.status})',
+            'success': False,
+            **job.progress()
+        }), 409
+    
+    # Tijdens de download mag de job niet vervallen
+    if not export_jobs.start_download(job):
+        return jsonify({'error': f'Export job "{job_id}" niet gevonden', 'success': False}), 404
+    try:
+        # send_file leest het archief in blokken van schijf
+        response = send_file(job.zip_path, mimetype='application/zip', as_attachment=True,
+                             download_name=export_zip_name(job.export_date))
+    except Exception:
+        export_jobs.finish_download(job)
+        raise
+    # Zonder direct_passthrough sluit de WSGI server de response zelf, zodat
+    # call_on_close ook afgaat als de client de download afbreekt
+    response.direct_passthrough = False
+    response.call_on_close(lambda: export_jobs.finish_download(job))
+    return response
+
 @app.route('/status')
 def status():
-    """Geef status informatie van de applicatie"""
+    """Geef status informatie van de applicatie (?dataset_id=..., standaard de nieuwste)"""
+    dataset_id = request.args.get('dataset_id')
+    dataset = registry.get(dataset_id)
+    if dataset is None and dataset_id:
+        return jsonify({
+            'error': f'Dataset "{dataset_id}" niet gevonden',
+            'success': False
+        }), 404
+    
     return jsonify({
         'status': 'active',
-        'data_available': bool(processed_data["persons"]),
-        'persons_count': len(processed_data["persons"]),
-        'upload_timestamp': processed_data["upload_timestamp"],
-        'available_persons': processed_data["available_persons"],
-        'competencies_count': len(processed_data["team_averages"]),
-        'processing_summary': processed_data.get("processing_summary", {})
+        'dataset_id': dataset.dataset_id if dataset else None,
+        'data_available': bool(dataset and dataset.persons),
+        'persons_count': len(dataset.persons) if dataset else 0,
+        'upload_timestamp': dataset.upload_timestamp if dataset else None,
+        'available_persons': dataset.available_persons if dataset else [],
+        'competencies_count': len(dataset.team_averages) if dataset else 0,
+        'processing_summary': dataset.processing_summary if dataset else {},
+        'datasets': registry.list_datasets(),
+        'registry': registry.stats(),
+        'cache': result_cache.stats(),
+        'schemas': schema_cache.stats(),
+        'export_jobs': export_jobs.stats(),
+        'processing_memory': processing_budget.stats(),
+        'batch_workers': BATCH_WORKERS
+    })
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Cumulatieve request counters en latency histogrammen in het Prometheus tekst formaat"""
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.route('/schemas')
+def list_schemas():
+    """Bekende formulier indelingen: competentie kolommen per categorie, meest recent eerst"""
+    return jsonify({
+        'success': True,
+        'schemas': schema_cache.list_schemas(),
+        'cache': schema_cache.stats()
+    })
+
+@app.route('/scales')
+def list_scales():
+    """Beschikbare antwoordschalen met hun antwoorden en scores"""
+    return jsonify({
+        'success': True,
+        'scales': [scale.describe() for scale in score_scales.values()],
+        'default': 'auto'
     })
 
 @app.route('/validate', methods=['POST'])
@@ -325,10 +1216,14 @@ def validate_file():
         # Valideer bestandstype
         if not allowed_file(file.filename):
             return jsonify({
-                'error': 'Alleen .xlsx en .xls bestanden zijn toegestaan',
+                'error': 'Alleen .xlsx, .xls en .csv bestanden zijn toegestaan',
                 'success': False
             }), 400
         
+        scale, error_response = requested_scale()
+        if error_response:
+            return error_response
+        
         # Beveilig bestandsnaam
         filename = secure_filename(file.filename)
         
@@ -338,20 +1233,36 @@ def validate_file():
             temp_file_path = temp_file.name
         
         try:
-            # Gebruik ExcelProcessor voor validatie
-            from data_processor import validate_excel_file
-            is_valid, errors = validate_excel_file(temp_file_path)
+            # Standaard alleen header en steekproef, ?mode=full leest het hele bestand
+            from data_processor import validate_excel_file, inspect_excel_file
+            if request.args.get('mode') == 'full':
+                is_valid, errors = validate_excel_file(temp_file_path)
+                inspection = {}
+            else:
+                inspection = inspect_excel_file(temp_file_path, scale, score_scales, schema_cache)
+                is_valid, errors = inspection['valid'], inspection['errors']
             
             # Verwijder tijdelijk bestand
             os.unlink(temp_file_path)
             
-            return jsonify({
+            response = {
                 'success': True,
                 'valid': is_valid,
                 'filename': filename,
                 'validation_errors': errors,
                 'message': 'Bestand is geldig en kan worden verwerkt' if is_valid else 'Bestand bevat validatie fouten'
-            })
+            }
+            if inspection:
+                response.update({
+                    'schema': inspection['schema'],
+                    'competency_categories': inspection['competency_categories'],
+                    'estimated_rows': inspection['estimated_rows'],
+                    'schema_fingerprint': inspection['schema_fingerprint'],
+                    'schema_from_cache': inspection['schema_from_cache'],
+                    'score_scale': inspection['score_scale'],
+                    'unknown_answers': inspection['unknown_answers']
+                })
+            return jsonify(response)
             
         except Exception as e:
             # Verwijder tijdelijk bestand bij fout
@@ -373,7 +1284,7 @@ def validate_file():
 def too_large(e):
     """Handle file too large error"""
     return jsonify({
-        'error': 'Bestand te groot. Maximum grootte is 16MB.',
+        'error': f'Bestand te groot. Maximum grootte is {MAX_UPLOAD_MB}MB.',
         'success': False
     }), 413
 
@@ -403,7 +1314,7 @@ if __name__ == '__main__':
     print("📦 Batch export endpoint: GET /get_all_persons_data")
     print("✅ Validatie endpoint: POST /validate")
     print("ℹ️  Status endpoint: GET /status")
-    print("📋 Ondersteunde formaten: .xlsx, .xls")
+    print("📋 Ondersteunde formaten: .xlsx, .xls, .csv")
     print("-" * 50)
     
     app.run(host='0.0.0.0', port=5010, debug=True)
\ No newline at end of file
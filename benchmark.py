@@ -0,0 +1,452 @@
+"""
+Benchmark Module voor RadarChart Feedback Analyse
+
+Genereert realistische synthetische enquête bestanden (zelfde header formaat
+als de echte export: emoji, **CATEGORIE - vraag** en [sub-competentie]) op
+instelbare schaal en meet de duur van elke stap van ExcelProcessor apart.
+Resultaten worden als JSON regels bewaard, zodat elke run vergeleken wordt
+met de vorige run op dezelfde schaal en regressies zichtbaar worden.
+
+Gebruik:
+    python benchmark.py                          # snelle set schalen
+    python benchmark.py --preset full            # tot 50.000 responses / 5.000 personen
+    python benchmark.py --scale 20000x2000 --format csv --repeat 5
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processor import ExcelProcessor, PROCESSOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Vragenlijst van de echte export: (categorie, vraag, sub-competenties)
+SURVEY_QUESTIONS = [
+    ('PROBLEEMANALYSE', 'Laat deze collega zien een goede probleemanalyse uit te kunnen voeren?', [
+        'Begrijpt de kern van het probleem door de juiste vragen te stellen aan de klant',
+        'Biedt effectieve en haalbare oplossingen voor klantproblemen',
+        'Herkent de onderliggende oorzaken van problemen',
+    ]),
+    ('KWALITEITSZORG', 'Draagt deze collega zorg voor hoogwaardige kwaliteit in het werk?', [
+        'Levert analyses en code van hoge kwaliteit',
+        'Toont vindingrijkheid bij probleemoplossing',
+        'Toetst analyses aan de werkelijkheid, controleert of deze wel reëel zijn en valideert resultaten',
+    ]),
+    ('KLANTGERICHTHEID met boodschap overbrengen', 'Communiceert deze collega effectief en duidelijk?', [
+        'Communiceert resultaten, inzichten of analyses op een begrijpelijke manier',
+        'Zet analyse-uitkomsten of ontwikkelvoorstellen om in praktische en begrijpbare adviezen',
+        'Past zijn/haar communicatiestijl aan om effectief aan te sluiten bij de tegenpartij',
+    ]),
+    ('KLANTGERICHTHEID met behoefte ophalen', 'Is deze collega klantgericht in zijn/haar benadering?', [
+        'Begrijpt de behoeften van de klant en betrekt de klant actief bij het proces',
+        'Luistert actief naar de klant en weet in het gesprek de (verschillende) standpunten te identificeren en te benoemen',
+        'Reageert adequaat op veranderingen in klantbehoeften',
+    ]),
+    ('PROJECTMANAGEMENT', 'Beheert deze collega projecten efficiënt en succesvol?', [
+        'Heeft de doelen scherp en bewaakt de scope van het project',
+        'Structureert en verdeelt het werk effectief gedurende het project',
+        'Handhaaft een acceptabel werktempo en respecteert persoonlijke verplichtingen van teamleden',
+    ]),
+    ('TEAMSPELER', 'Toont deze collega goed teamwork en samenwerking?', [
+        'Toont inzet om teamleden te betrekken en te ondersteunen',
+        'Staat open voor uitdagingen en nieuwe ideeën',
+        'Genereert enthousiasme en motiveert het team',
+    ]),
+    ('COLLEGIALE ONTWIKKELING', "Bevordert deze collega de ontwikkeling van zijn/haar collega's?", [
+        "Is beschikbaar en benaderbaar voor collega's",
+        "Draagt actief kennis en ervaring over aan collega's",
+        'Begeleidt teamleden succesvol en stimuleert hun professionele groei',
+    ]),
+    ('LEIDERSCHAP EN INTEGRITEIT', 'Laat deze collega leiderschap en integriteit zien in zijn/haar werk?', [
+        'Behandelt iedereen met respect, ongeacht achtergrond of positie',
+        'Draagt bij aan een positieve en ondersteunende werkomgeving',
+        'Toont doorzettingsvermogen bij obstakels en uitdagingen',
+    ]),
+    ('INNOVATIE EN COMMERCIE', 'Draagt deze collega bij aan vernieuwing en commercieel succes?', [
+        'Denkt proactief mee over nieuwe kansen en mogelijkheden in de markt',
+        'Vertaalt klantbehoeften effectief naar innovatieve oplossingen of diensten',
+        'Initieert en stimuleert vernieuwende ideeën binnen het team',
+    ]),
+]
+
+# Antwoorden met een realistische verdeling
+ANSWERS = ['Zelden', 'Soms', 'Vaak', 'Zeer vaak', 'Weet ik niet', None]
+ANSWER_WEIGHTS = [0.05, 0.2, 0.42, 0.25, 0.05, 0.03]
+
+# Schrijfvarianten zoals die in handmatig ingevulde exports voorkomen
+ANSWER_VARIANTS = {'Vaak': 'vaak ', 'Zeer vaak': ' ZEER VAAK', 'Soms': 'soms'}
+VARIANT_FRACTION = 0.02
+
+# Kans dat een response een zelfevaluatie is
+SELF_FRACTION = 0.1
+
+FIRST_NAMES = ['Anne', 'Bram', 'Daan', 'Emma', 'Fleur', 'Jan', 'Julia', 'Lars', 'Lisa', 'Maria',
+               'Noah', 'Pieter', 'Sanne', 'Sem', 'Sophie', 'Stan', 'Tom', 'Yara', 'Zoë', 'Luuk']
+LAST_NAMES = ['de Vries', 'Jansen', 'Bakker', 'Visser', 'Smit', 'Meijer', 'de Boer', 'Mulder',
+              'de Groot', 'Bos', 'Vos', 'Peters', 'Hendriks', 'van Dijk', 'Dekker']
+PROJECTS = ['NL - Klant A - Data platform', 'NL - Klant B - Forecasting', 'Intern - Academy',
+            'BE - Klant C - Dashboarding', 'NL - Klant D - Migratie']
+
+# Schalen als (responses, personen)
+PRESETS = {
+    'quick': [(100, 10), (1000, 100), (5000, 500)],
+    'full': [(100, 10), (1000, 100), (10000, 1000), (50000, 5000)],
+}
+
+# Standaard bestand voor de resultaten
+DEFAULT_RESULTS_FILE = 'benchmark_results.jsonl'
+
+# Vertraging ten opzichte van de vorige run die als regressie geldt; vergeleken
+# wordt de snelste herhaling, die het minst last heeft van ruis op de machine
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+
+def survey_columns() -> List[str]:
+    """Kolommen van de export: basis kolommen gevolgd door alle competentie vragen"""
+    columns = ['Timestamp', 'Wie ben jij?', 'Wat is je mailadres',
+               'Voor welke collega vul je dit formulier in?', 'Op welk project baseer je je feedback?']
+    for category, question, sub_competencies in SURVEY_QUESTIONS:
+        columns.extend(f"🔹 **{category} - {question}** [{sub}]" for sub in sub_competencies)
+    return columns
+
+def person_names(n_persons: int) -> List[str]:
+    """Unieke, realistische namen; bij veel personen met een volgnummer"""
+    names = [f"{first} {last}" for last in LAST_NAMES for first in FIRST_NAMES]
+    if n_persons <= len(names):
+        return names[:n_persons]
+    return [f"{names[i % len(names)]} {i // len(names) + 1}" for i in range(n_persons)]
+
+def generate_survey(n_responses: int, n_persons: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Genereert een synthetische enquête export
+    
+    Args:
+        n_responses (int): Aantal ingevulde formulieren (wide rijen)
+        n_persons (int): Aantal collega's in de organisatie
+        seed (int): Seed voor reproduceerbare data
+        
+    Returns:
+        pd.DataFrame: Wide format data met de kolommen van survey_columns()
+    """
+    rng = np.random.default_rng(seed)
+    columns = survey_columns()
+    names = np.array(person_names(n_persons), dtype=object)
+    
+    # Beoordeelde collega's met een scheve verdeling: sommigen krijgen veel meer feedback
+    popularity = rng.pareto(1.5, n_persons) + 1
+    persons = rng.choice(n_persons, size=n_responses, p=popularity / popularity.sum())
+    raters = rng.integers(0, n_persons, size=n_responses)
+    is_self = rng.random(n_responses) < SELF_FRACTION
+    raters = np.where(is_self, persons, raters)
+    
+    # Timestamps verspreid over een feedback ronde van zes weken
+    start = pd.Timestamp('2025-02-03 08:00')
+    minutes = np.sort(rng.integers(0, 6 * 7 * 24 * 60, size=n_responses))
+    moments = start + pd.to_timedelta(minutes, unit='min')
+    # Zelfde notatie als de export: dag en maand zonder voorloopnul (19-2-2025 14:01)
+    timestamps = (moments.day.astype(str) + '-' + moments.month.astype(str) + '-'
+                  + moments.year.astype(str) + moments.strftime(' %H:%M'))
+    
+    rater_names = names[raters]
+    emails = np.array([name.lower().replace(' ', '.') + '@bedrijf.nl' for name in names], dtype=object)[raters]
+    # Namen worden in de export soms met een spatie aan het eind ingevuld
+    trailing = rng.random(n_responses) < 0.2
+    rater_names = np.where(trailing, rater_names + ' ', rater_names)
+    
+    answers = np.array(ANSWERS, dtype=object)[
+        rng.choice(len(ANSWERS), size=(n_responses, len(columns) - 5), p=ANSWER_WEIGHTS)
+    ]
+    variants = rng.random(answers.shape) < VARIANT_FRACTION
+    for answer, variant in ANSWER_VARIANTS.items():
+        answers[variants & (answers == answer)] = variant
+    
+    data = {
+        columns[0]: np.asarray(timestamps, dtype=object),
+        columns[1]: rater_names,
+        columns[2]: emails,
+        columns[3]: names[persons],
+        columns[4]: np.array(PROJECTS, dtype=object)[rng.integers(0, len(PROJECTS), size=n_responses)],
+    }
+    for index, column in enumerate(columns[5:]):
+        data[column] = answers[:, index]
+    return pd.DataFrame(data, columns=columns)
+
+def write_survey(df: pd.DataFrame, file_path: str) -> None:
+    """Schrijft een export als .xlsx of als .csv met ';' zoals de echte export"""
+    if file_path.endswith('.xlsx'):
+        df.to_excel(file_path, index=False, engine='openpyxl')
+    elif file_path.endswith('.csv'):
+        df.to_csv(file_path, sep=';', index=False)
+    else:
+        raise ValueError(f"Niet ondersteund bestandsformaat: {file_path}")
+
+def survey_file(n_responses: int, n_persons: int, file_format: str, data_dir: str, seed: int = 0) -> str:
+    """
+    Pad naar een gegenereerd bestand; bestaande bestanden worden hergebruikt
+    
+    Args:
+        n_responses (int): Aantal responses
+        n_persons (int): Aantal personen
+        file_format (str): 'xlsx' of 'csv'
+        data_dir (str): Map voor de gegenereerde bestanden
+        seed (int): Seed voor de generator
+        
+    Returns:
+        str: Pad naar het bestand
+    """
+    file_path = os.path.join(data_dir, f"survey_{n_responses}x{n_persons}_s{seed}.{file_format}")
+    if not os.path.exists(file_path):
+        started = time.perf_counter()
+        write_survey(generate_survey(n_responses, n_persons, seed), file_path)
+        logger.info(f"Gegenereerd: {file_path} in {time.perf_counter() - started:.1f}s")
+    return file_path
+
+def _timed(timings: Dict[str, List[float]], stage: str, func: Callable, *args, **kwargs) -> Any:
+    """Voert een stap uit en voegt de duur toe aan timings[stage]"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings.setdefault(stage, []).append(time.perf_counter() - started)
+    return result
+
+def time_stages(file_path: str, repeat: int = 3) -> Tuple[Dict[str, Dict[str, float]], Dict[str, int]]:
+    """
+    Meet de duur van elke stap van ExcelProcessor op een bestand
+    
+    De stappen zijn lezen, valideren, wide naar long, scores, personen en
+    serialisatie; daarnaast de volledige verwerking (en streaming bij .xlsx).
+    
+    Args:
+        file_path (str): Pad naar het bestand
+        repeat (int): Aantal herhalingen per stap
+        
+    Returns:
+        Tuple[Dict[str, Dict[str, float]], Dict[str, int]]: (median en min per stap in
+            seconden, aantallen van de verwerking)
+    """
+    timings = {}
+    counts = {}
+    for _ in range(repeat):
+        gc.collect()
+        processor = ExcelProcessor()
+        df = _timed(timings, 'read', processor.read_excel_file, file_path)
+        _timed(timings, 'validate', processor.validate_excel_structure, df)
+        long_df = _timed(timings, 'wide_to_long', processor.convert_wide_to_long, df)
+        persons_data, team_averages = _timed(timings, 'scores', processor.calculate_all_scores, long_df)
+        _timed(timings, 'persons', processor.get_available_persons, long_df)
+        # De dict per persoon wordt pas bij het serialiseren samengesteld
+        payload = {'persons': persons_data, 'team_averages': team_averages}
+        _timed(timings, 'serialize', json.dumps, payload, default=dict)
+        counts = {'wide_rows': len(df), 'long_rows': len(long_df), 'persons': len(persons_data)}
+        del df, long_df, persons_data, payload
+        
+        gc.collect()
+        _timed(timings, 'process_excel_file', ExcelProcessor().process_excel_file, file_path)
+        if file_path.endswith('.xlsx'):
+            gc.collect()
+            _timed(timings, 'process_excel_file_streaming', ExcelProcessor().process_excel_file_streaming, file_path)
+    
+    summary = {
+        stage: {'median': statistics.median(values), 'min': min(values)}
+        for stage, values in timings.items()
+    }
+    return summary, counts
+
+def environment_info() -> Dict[str, Any]:
+    """Gegevens over de machine en versies, om runs eerlijk te kunnen vergelijken"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'processor_version': PROCESSOR_VERSION,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+def peak_memory_mb() -> Optional[float]:
+    """Piek geheugengebruik van het proces in MB (niet beschikbaar op Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux rapporteert in KB, macOS in bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_benchmark(scales: List[Tuple[int, int]], file_format: str = 'xlsx', repeat: int = 3,
+                  data_dir: Optional[str] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Draait de benchmark op alle schalen
+    
+    Args:
+        scales (List[Tuple[int, int]]): Schalen als (responses, personen)
+        file_format (str): 'xlsx' of 'csv'
+        repeat (int): Aantal herhalingen per stap
+        data_dir (Optional[str]): Map voor gegenereerde bestanden, standaard een tijdelijke map
+        seed (int): Seed voor de generator
+        
+    Returns:
+        List[Dict[str, Any]]: Een resultaat per schaal
+    """
+    data_dir = data_dir or tempfile.mkdtemp(prefix='radarchart_benchmark_')
+    os.makedirs(data_dir, exist_ok=True)
+    environment = environment_info()
+    
+    records = []
+    for n_responses, n_persons in scales:
+        file_path = survey_file(n_responses, n_persons, file_format, data_dir, seed)
+        timings, counts = time_stages(file_path, repeat)
+        records.append({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'responses': n_responses,
+            'persons': n_persons,
+            'format': file_format,
+            'seed': seed,
+            'repeat': repeat,
+            'file_size': os.path.getsize(file_path),
+            'counts': counts,
+            'timings': timings,
+            'peak_memory_mb': peak_memory_mb(),
+            'environment': environment
+        })
+    return records
+
+def load_results(results_file: str) -> List[Dict[str, Any]]:
+    """Leest eerdere resultaten; een ontbrekend bestand geeft een lege lijst"""
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_results(results_file: str, records: List[Dict[str, Any]]) -> None:
+    """Voegt resultaten als JSON regels toe aan het resultaten bestand"""
+    with open(results_file, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def previous_result(history: List[Dict[str, Any]], record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Laatste eerdere run op dezelfde schaal, hetzelfde formaat en dezelfde machine"""
+    for candidate in reversed(history):
+        if (candidate['responses'], candidate['persons'], candidate['format'], candidate['seed']) == \
+                (record['responses'], record['persons'], record['format'], record['seed']) and \
+                candidate['environment'].get('platform') == record['environment'].get('platform'):
+            return candidate
+    return None
+
+def compare(record: Dict[str, Any], previous: Dict[str, Any],
+            threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Vergelijkt de snelste duur per stap met een eerdere run
+    
+    Args:
+        record (Dict[str, Any]): Nieuw resultaat
+        previous (Dict[str, Any]): Eerder resultaat op dezelfde schaal
+        threshold (float): Relatieve vertraging die als regressie geldt
+        
+    Returns:
+        List[str]: Stappen die meer dan threshold trager zijn geworden
+    """
+    regressions = []
+    for stage, timing in record['timings'].items():
+        before = previous['timings'].get(stage)
+        if not before or before['min'] <= 0:
+            continue
+        change = timing['min'] / before['min'] - 1
+        if change > threshold:
+            regressions.append(f"{stage}: {before['min'] * 1000:.1f}ms -> "
+                               f"{timing['min'] * 1000:.1f}ms (+{change:.0%})")
+    return regressions
+
+def format_record(record: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> str:
+    """Tabel met de duur per stap, met het verschil ten opzichte van de vorige run"""
+    counts = record['counts']
+    lines = [
+        f"\n📊 {record['responses']} responses x {record['persons']} personen ({record['format']}, "
+        f"{record['file_size'] / 1024 / 1024:.1f} MB, {counts['long_rows']} long rijen, "
+        f"{counts['persons']} personen gevonden)",
+        f"   {'stap':<30}{'median':>12}{'min':>12}{'vorige':>12}"
+    ]
+    for stage, timing in record['timings'].items():
+        before = previous['timings'].get(stage) if previous else None
+        change = f"{timing['min'] / before['min'] - 1:+.0%}" if before and before['min'] > 0 else '-'
+        lines.append(f"   {stage:<30}{timing['median'] * 1000:>10.1f}ms{timing['min'] * 1000:>10.1f}ms{change:>12}")
+    if record['peak_memory_mb'] is not None:
+        lines.append(f"   piek geheugen van het proces: {record['peak_memory_mb']} MB")
+    return '\n'.join(lines)
+
+def parse_scale(value: str) -> Tuple[int, int]:
+    """Leest een schaal in de vorm RESPONSESxPERSONEN, bijvoorbeeld 1000x100"""
+    try:
+        n_responses, n_persons = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ongeldige schaal '{value}', verwacht bijvoorbeeld 1000x100")
+    if n_responses < 1 or n_persons < 1:
+        raise argparse.ArgumentTypeError(f"Ongeldige schaal '{value}': aantallen moeten positief zijn")
+    return n_responses, n_persons
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark van de RadarChart verwerking op synthetische data')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick', help='Vaste set schalen')
+    parser.add_argument('--scale', type=parse_scale, action='append',
+                        help='Schaal als RESPONSESxPERSONEN, herhaalbaar (overschrijft --preset)')
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx', help='Bestandsformaat')
+    parser.add_argument('--repeat', type=int, default=3, help='Herhalingen per stap')
+    parser.add_argument('--seed', type=int, default=0, help='Seed voor de generator')
+    parser.add_argument('--data-dir', help='Map om gegenereerde bestanden te bewaren en te hergebruiken')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE, help='Bestand voor de resultaten (JSON regels)')
+    parser.add_argument('--no-save', action='store_true', help='Resultaten niet bewaren')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='Relatieve vertraging die als regressie geldt')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit code 1 bij een regressie')
+    args = parser.parse_args(argv)
+    
+    # De verwerking logt per bestand; tijdens het meten alleen waarschuwingen
+    logging.getLogger('data_processor').setLevel(logging.WARNING)
+    logging.getLogger(__name__).setLevel(logging.INFO)
+    
+    history = load_results(args.results)
+    records = run_benchmark(args.scale or PRESETS[args.preset], args.format, args.repeat, args.data_dir, args.seed)
+    
+    regressions = []
+    for record in records:
+        previous = previous_result(history, record)
+        print(format_record(record, previous))
+        if previous:
+            for regression in compare(record, previous, args.threshold):
+                regressions.append(f"{record['responses']}x{record['persons']} {regression}")
+    
+    if not args.no_save:
+        append_results(args.results, records)
+        print(f"\n💾 Resultaten toegevoegd aan {args.results}")
+    
+    if regressions:
+        print(f"\n⚠️  Trager dan de vorige run (> {args.threshold:.0%}):")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
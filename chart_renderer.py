@@ -0,0 +1,330 @@
+"""
+Chart Renderer Module voor RadarChart Feedback Analyse
+
+Rendert de radar chart van een persoon server-side als SVG, zonder browser.
+De opbouw volgt static/js/radarChart.js (assen, niveaus, polygonen en dots)
+en ChartExporter.createCompleteExportSvg (titel, legenda en witte
+achtergrond), zodat een export er hetzelfde uitziet als in de browser.
+Tekstbreedtes voor het afbreken van labels worden geschat met vaste Arial
+tekenbreedtes, waardoor de output deterministisch is.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import math
+from datetime import date
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+# Standaard opties, gelijk aan window.DEFAULT_CHART_OPTIONS (chartConfig.js)
+# met de afmetingen die de batch export gebruikt
+DEFAULT_CHART_OPTIONS = {
+    'w': 600,
+    'h': 600,
+    'margin': {'top': 200, 'right': 400, 'bottom': 200, 'left': 400},
+    'levels': 4,
+    'maxValue': 4,
+    'labelFactor': 1.3,
+    'wrapWidth': 120,
+    'opacityArea': 0.35,
+    'dotRadius': 4,
+    'opacityCircles': 0.1,
+    'strokeWidth': 2,
+    # Kleur per dataset: index 0 is het team, index 1 de persoon
+    'colors': ['#27ae60', '#3498db']
+}
+
+# Meer cirkels dan dit wordt onleesbaar; grotere schalen krijgen dit aantal
+MAX_SCALE_LEVELS = 6
+SCALE_LEVELS_LARGE = 5
+
+# Ruimte rond de chart in de export (createCompleteExportSvg)
+EXPORT_TITLE_HEIGHT = 80
+EXPORT_LEGEND_HEIGHT = 60
+EXPORT_PADDING = 40
+
+DUTCH_MONTHS = ['januari', 'februari', 'maart', 'april', 'mei', 'juni', 'juli',
+                'augustus', 'september', 'oktober', 'november', 'december']
+
+# Arial tekenbreedtes in duizendsten van de font-size
+ARIAL_WIDTHS = {
+    ' ': 278, '!': 278, '"': 355, '#': 556, '$': 556, '%': 889, '&': 667, "'": 191,
+    '(': 333, ')': 333, '*': 389, '+': 584, ',': 278, '-': 333, '.': 278, '/': 278,
+    ':': 278, ';': 278, '<': 584, '=': 584, '>': 584, '?': 556, '@': 1015,
+    'A': 667, 'B': 667, 'C': 722, 'D': 722, 'E': 667, 'F': 611, 'G': 778, 'H': 722,
+    'I': 278, 'J': 500, 'K': 667, 'L': 556, 'M': 833, 'N': 722, 'O': 778, 'P': 667,
+    'Q': 778, 'R': 722, 'S': 667, 'T': 611, 'U': 722, 'V': 667, 'W': 944, 'X': 667,
+    'Y': 667, 'Z': 611, '[': 278, '\\': 278, ']': 278, '_': 556,
+    'a': 556, 'b': 556, 'c': 500, 'd': 556, 'e': 556, 'f': 278, 'g': 556, 'h': 556,
+    'i': 222, 'j': 222, 'k': 500, 'l': 222, 'm': 833, 'n': 556, 'o': 556, 'p': 556,
+    'q': 556, 'r': 333, 's': 500, 't': 278, 'u': 556, 'v': 500, 'w': 722, 'x': 500,
+    'y': 500, 'z': 500
+}
+ARIAL_DEFAULT_WIDTH = 556
+
+# Zelfde CSS als ChartExporter.addInlineStyles aan de export toevoegt
+EXPORT_STYLE = """
+            .radar { font-family: Arial, sans-serif; }
+            .axisLabel { font-size: 10px; fill: #737373; }
+            .legend { font-size: 12px; font-weight: 500; fill: #2c3e50; text-anchor: middle; }
+            .gridCircle { fill: #CDCDCD; stroke: #CDCDCD; fill-opacity: 0.1; }
+            .line { stroke: white; stroke-width: 2px; }
+            .export-title text { font-family: Arial, sans-serif; }
+            .export-legend text { font-family: Arial, sans-serif; }
+            .export-legend rect { rx: 3; }
+        """
+
+def js_number(value: float) -> str:
+    """
+    Formatteert een getal zoals JavaScript dat doet (String(value))
+    
+    Args:
+        value (float): Getal
+        
+    Returns:
+        str: Tekst zoals de browser hem in een attribuut zet
+    """
+    if value == int(value) and abs(value) < 1e21:
+        return str(int(value))
+    text = repr(float(value))
+    if 'e-' in text and abs(value) >= 1e-6:
+        # Python schrijft 1e-05 waar JavaScript 0.00001 schrijft
+        mantissa, exponent = text.split('e-')
+        sign = '-' if mantissa.startswith('-') else ''
+        digits = mantissa.lstrip('-').replace('.', '')
+        text = f"{sign}0.{'0' * (int(exponent) - 1)}{digits}"
+    return text
+
+def d3_number(value: float) -> str:
+    """Getal zoals d3.line het in een path zet (afgerond op 3 decimalen)"""
+    return js_number(round(value, 3))
+
+def text_width(text: str, font_size: float) -> float:
+    """Geschatte breedte van tekst in Arial, als vervanger van getComputedTextLength"""
+    return sum(ARIAL_WIDTHS.get(char, ARIAL_DEFAULT_WIDTH) for char in text) * font_size / 1000
+
+def format_export_date(day: date) -> str:
+    """Datum zoals toLocaleDateString('nl-NL', {day, month: 'long', year})"""
+    return f"{day.day} {DUTCH_MONTHS[day.month - 1]} {day.year}"
+
+def wrap_label(label: str, width: float, font_size: float) -> List[str]:
+    """
+    Breekt een as label af in regels, volgens de wrap functie van radarChart.js
+    
+    Args:
+        label (str): Tekst van het label
+        width (float): Maximale breedte in pixels
+        font_size (float): Font grootte in pixels
+        
+    Returns:
+        List[str]: Regels (een eerste regel kan leeg zijn als het eerste woord te breed is)
+    """
+    lines = []
+    line = []
+    for word in label.split():
+        line.append(word)
+        if text_width(' '.join(line), font_size) > width:
+            line.pop()
+            lines.append(' '.join(line))
+            line = [word]
+    lines.append(' '.join(line))
+    return lines
+
+def _radar_points(scores: Dict[str, float], radius: float, max_value: float, angle_slice: float) -> List[tuple]:
+    """(x, y) per as voor een dataset; hoek volgt de volgorde van de eigen scores"""
+    points = []
+    for i, value in enumerate(scores.values()):
+        r = radius * (value / max_value)
+        angle = angle_slice * i - math.pi / 2
+        points.append((r * math.cos(angle), r * math.sin(angle)))
+    return points
+
+def _radar_path(scores: Dict[str, float], radius: float, max_value: float, angle_slice: float) -> str:
+    """Gesloten lineair pad zoals d3.lineRadial met curveLinearClosed"""
+    parts = []
+    for i, value in enumerate(scores.values()):
+        r = radius * (value / max_value)
+        angle = i * angle_slice
+        x, y = r * math.sin(angle), -r * math.cos(angle)
+        parts.append(f"{'M' if i == 0 else 'L'}{d3_number(x)},{d3_number(y)}")
+    return ''.join(parts) + 'Z' if parts else ''
+
+def render_radar_chart(individual_scores: Dict[str, float], team_averages: Dict[str, float],
+                       person_name: str, options: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Rendert de elementen van de radar chart (inhoud van het svg element van RadarChart)
+    
+    Args:
+        individual_scores (Dict[str, float]): Scores van de persoon per competentie
+        team_averages (Dict[str, float]): Team gemiddelden per competentie
+        person_name (str): Naam van de persoon
+        options (Optional[Dict[str, Any]]): Afwijkingen van DEFAULT_CHART_OPTIONS
+        
+    Returns:
+        List[str]: SVG fragmenten
+    """
+    cfg = {**DEFAULT_CHART_OPTIONS, **(options or {})}
+    margin = cfg['margin']
+    levels = cfg['levels']
+    max_value = cfg['maxValue']
+    colors = cfg['colors']
+    
+    # Zonder team gemiddelden tekent de browser de persoon twee keer
+    datasets = [team_averages or individual_scores, individual_scores]
+    all_axis = list(datasets[0].keys())
+    radius = min(cfg['w'] / 2, cfg['h'] / 2)
+    angle_slice = math.pi * 2 / len(all_axis) if all_axis else 0
+    
+    out = [
+        f'<g transform="translate({js_number(cfg["w"] / 2 + margin["left"])},'
+        f'{js_number(cfg["h"] / 2 + margin["top"])})">',
+        '<defs><filter id="glow"><feGaussianBlur stdDeviation="2" result="coloredBlur"></feGaussianBlur>'
+        '<feMerge><feMergeNode in="coloredBlur"></feMergeNode><feMergeNode in="SourceGraphic"></feMergeNode>'
+        '</feMerge></filter></defs>',
+        '<g class="axisWrapper">'
+    ]
+    
+    # Concentrische cirkels en hun labels, grootste eerst
+    for level in range(levels, 0, -1):
+        out.append(
+            f'<circle class="gridCircle" r="{js_number(radius / levels * level)}" '
+            f'style="fill: #CDCDCD; stroke: #CDCDCD; fill-opacity: {js_number(cfg["opacityCircles"])}; '
+            f'filter: url(#glow);"></circle>'
+        )
+    for level in range(levels, 0, -1):
+        out.append(
+            f'<text class="axisLabel" x="4" y="{js_number(-level * radius / levels)}" dy="0.4em" '
+            f'fill="#737373" style="font-size: 10px;">{max_value * level / levels:.1f}</text>'
+        )
+    
+    # Assen met labels
+    for i, axis_name in enumerate(all_axis):
+        angle = angle_slice * i - math.pi / 2
+        x = radius * cfg['labelFactor'] * math.cos(angle)
+        y = radius * cfg['labelFactor'] * math.sin(angle)
+        # Extra ruimte voor labels aan de zijkanten en boven/onder
+        if abs(math.cos(angle)) > 0.7:
+            x *= 1.1
+        if abs(math.sin(angle)) > 0.7:
+            y *= 1.1
+        
+        lines = wrap_label(axis_name, cfg['wrapWidth'], 12)
+        line_height = 1.2
+        dy = 0.35
+        x_attr, y_attr = js_number(x), js_number(y)
+        tspans = []
+        for line_number, line in enumerate(lines):
+            if len(lines) > 1:
+                # Multi-line labels worden verticaal gecentreerd
+                line_dy = dy - (len(lines) - 1) * line_height / 2 if line_number == 0 else line_height
+            else:
+                line_dy = dy
+            tspans.append(f'<tspan x="{x_attr}" y="{y_attr}" dy="{js_number(line_dy)}em">{escape(line)}</tspan>')
+        
+        out.append(
+            f'<g class="axis"><line x1="0" y1="0" x2="{js_number(radius * math.cos(angle))}" '
+            f'y2="{js_number(radius * math.sin(angle))}" class="line" style="stroke: white; stroke-width: 2px;"></line>'
+            f'<text class="legend" text-anchor="middle" dy="0.35em" x="{x_attr}" y="{y_attr}" '
+            f'style="font-size: 12px; font-weight: 500; fill: #2c3e50;">{"".join(tspans)}</text></g>'
+        )
+    out.append('</g>')
+    
+    # Areas, strokes en dots per dataset (team eerst, daarna de persoon)
+    for index, scores in enumerate(datasets):
+        color = colors[index]
+        path = _radar_path(scores, radius, max_value, angle_slice)
+        out.append('<g class="radarWrapper">')
+        out.append(
+            f'<path class="radarArea" d="{path}" '
+            f'style="fill: {color}; fill-opacity: {js_number(cfg["opacityArea"])};"></path>'
+        )
+        out.append(
+            f'<path class="radarStroke" d="{path}" style="stroke-width: {js_number(cfg["strokeWidth"])}px; '
+            f'stroke: {color}; fill: none; filter: url(#glow);"></path>'
+        )
+        for x, y in _radar_points(scores, radius, max_value, angle_slice):
+            out.append(
+                f'<circle class="radarCircle" r="{js_number(cfg["dotRadius"])}" cx="{js_number(x)}" '
+                f'cy="{js_number(y)}" style="fill: {color}; fill-opacity: 0.8;"></circle>'
+            )
+        out.append('</g>')
+    
+    out.append('</g>')
+    return out
+
+def scale_chart_options(score_max: Optional[float]) -> Dict[str, Any]:
+    """
+    As maximum en aantal cirkels voor de schaal van een dataset, gelijk aan
+    window.chartOptionsForScale (chartConfig.js)
+    
+    Args:
+        score_max (Optional[float]): Hoogste score van de schaal (processing_summary['score_max'])
+        
+    Returns:
+        Dict[str, Any]: 'maxValue' en 'levels', leeg (standaard opties) zonder geldige score_max
+    """
+    if not score_max or score_max <= 0:
+        return {}
+    levels = int(score_max) if score_max <= MAX_SCALE_LEVELS and float(score_max).is_integer() else SCALE_LEVELS_LARGE
+    return {'maxValue': score_max, 'levels': levels}
+
+def render_export_svg(individual_scores: Dict[str, float], team_averages: Dict[str, float],
+                      person_name: str, export_date: Optional[date] = None,
+                      options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Rendert de complete export SVG van een persoon: titel, radar chart en legenda
+    
+    Args:
+        individual_scores (Dict[str, float]): Scores van de persoon per competentie
+        team_averages (Dict[str, float]): Team gemiddelden per competentie
+        person_name (str): Naam van de persoon
+        export_date (Optional[date]): Datum in de ondertitel, standaard vandaag
+        options (Optional[Dict[str, Any]]): Afwijkingen van DEFAULT_CHART_OPTIONS
+        
+    Returns:
+        str: SVG document
+    """
+    cfg = {**DEFAULT_CHART_OPTIONS, **(options or {})}
+    margin = cfg['margin']
+    chart_width = cfg['w'] + margin['left'] + margin['right']
+    chart_height = cfg['h'] + margin['top'] + margin['bottom']
+    width = chart_width + EXPORT_PADDING * 2
+    height = chart_height + EXPORT_TITLE_HEIGHT + EXPORT_LEGEND_HEIGHT + EXPORT_PADDING * 2
+    center = js_number(width / 2)
+    legend_y = chart_height + EXPORT_TITLE_HEIGHT + EXPORT_PADDING + 20
+    export_date = export_date or date.today()
+    text_style = 'font-family="Arial, sans-serif"'
+    
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" style="background-color: white;">',
+        f'<style>{EXPORT_STYLE}</style>',
+        '<rect width="100%" height="100%" fill="white"></rect>',
+        # Titel
+        '<g class="export-title">',
+        f'<text x="{center}" y="{EXPORT_PADDING + 25}" text-anchor="middle" {text_style} font-size="20px" '
+        f'font-weight="bold" fill="#2c3e50">{escape(f"Feedback Analyse voor {person_name}")}</text>',
+        f'<text x="{center}" y="{EXPORT_PADDING + 50}" text-anchor="middle" {text_style} font-size="14px" '
+        f'fill="#7f8c8d">Radar Chart Analyse - {format_export_date(export_date)}</text>',
+        '</g>',
+        # Radar chart
+        f'<g transform="translate({EXPORT_PADDING}, {EXPORT_TITLE_HEIGHT + EXPORT_PADDING})">'
+    ]
+    out.extend(render_radar_chart(individual_scores, team_averages, person_name, cfg))
+    out.extend([
+        '</g>',
+        # Legenda: persoon (blauw) en team (groen)
+        '<g class="export-legend">',
+        f'<text x="{center}" y="{legend_y}" text-anchor="middle" {text_style} font-size="14px" '
+        f'font-weight="bold" fill="#2c3e50">Legenda:</text>',
+        f'<g transform="translate({js_number(width / 2 - 120)}, {legend_y + 25})">'
+        f'<rect width="20" height="15" fill="{cfg["colors"][1]}" rx="3"></rect>'
+        f'<text x="30" y="12" {text_style} font-size="12px" fill="#2c3e50">{escape(person_name)}</text></g>',
+        f'<g transform="translate({js_number(width / 2 + 20)}, {legend_y + 25})">'
+        f'<rect width="20" height="15" fill="{cfg["colors"][0]}" rx="3"></rect>'
+        f'<text x="30" y="12" {text_style} font-size="12px" fill="#2c3e50">Team Gemiddelde</text></g>',
+        '</g>',
+        '</svg>'
+    ])
+    return ''.join(out)
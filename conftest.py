@@ -0,0 +1,23 @@
+"""
+Gedeelde pytest fixtures
+
+De app leest zijn instellingen bij het importeren, daarom worden de
+omgevingsvariabelen hier gezet voordat een test app.py importeert.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault('RADARCHART_SNAPSHOT_DIR', tempfile.mkdtemp(prefix='radarchart-snapshots-'))
+# Batch uploads na elkaar in het test proces, zonder process pool
+os.environ.setdefault('RADARCHART_BATCH_WORKERS', '1')
+
+@pytest.fixture
+def client():
+    """Flask test client van de app"""
+    from app import app
+    app.config['TESTING'] = True
+    with app.test_client() as test_client:
+        yield test_client
@@ -10,26 +10,34 @@ Versie: 2.0
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Callable, Iterable, Iterator, Union, Mapping
+from pandas.api.types import union_categoricals
 import logging
 from pathlib import Path
+import codecs
+import csv
+import importlib.util
+import io
+import os
 import re
+from collections import Counter
+from concurrent.futures import Executor
+from itertools import islice
+
+from metrics import StageTimings
+from score_scales import (BUILTIN_SCALES, FREQUENCY_ANSWERS, ScoreScale, detect_scale, format_unknown_answers,
+                          scales_fingerprint)
+from schema_cache import FormSchema, SchemaCache, header_fingerprint
 
 # Logging configuratie
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Score mapping van tekst naar numeriek
-SCORE_MAPPING = {
-    'zelden': 1,
-    'soms': 2,
-    'vaak': 3,
-    'zeer vaak': 4,
-    'weet ik niet': None,  # Wordt genegeerd in berekeningen
-    'n.v.t.': None,
-    'nvt': None,
-    '': None
-}
+# Versie van de verwerking; verhogen bij elke wijziging in de output (cache sleutels)
+PROCESSOR_VERSION = '2.5'
+
+# Score mapping van tekst naar numeriek van de standaard schaal; andere schalen in score_scales
+SCORE_MAPPING = FREQUENCY_ANSWERS
 
 # Verwachte basis kolommen
 BASE_COLUMNS = [
@@ -38,19 +46,388 @@ BASE_COLUMNS = [
     'Voor welke collega vul je dit formulier in?'
 ]
 
+# Kolomnamen met een van deze patronen zijn altijd competentie kolommen
+COMPETENCY_MARKERS = ['**', 'ANALYSE', 'KWALITEIT', 'KLANT', 'PROJECT', 'TEAM', 'LEIDER', 'INNOVATIE']
+
+# Id kolommen die na de wide naar long conversie nog gebruikt worden
+LONG_ID_COLUMNS = ['Response_ID', 'Persoon', 'Beoordelaar', 'Type']
+
+# Optionele kolommen die één keer per response bewaard blijven (nooit het mailadres)
+RESPONSE_COLUMNS = [
+    'Timestamp',
+    'Op welk project baseer je je feedback?'
+]
+
+# Aantal rijen per chunk bij streaming verwerking van grote .xlsx bestanden
+STREAMING_CHUNK_SIZE = 5000
+
+# Aantal data rijen dat de snelle validatie naast de header inleest
+VALIDATION_SAMPLE_ROWS = 20
+
+# Aantal bytes aan het begin van een CSV bestand waaruit encoding en scheidingsteken bepaald worden
+CSV_SNIFF_BYTES = 64 * 1024
+
+# Mogelijke scheidingstekens; ';' is de standaard van een Nederlandse Excel export
+CSV_DELIMITERS = (';', ',', '\t')
+
+# Encodings zonder BOM, in volgorde van proberen; latin-1 kan elke byte decoderen
+CSV_ENCODINGS = ('utf-8', 'cp1252', 'latin-1')
+
+# Snelste beschikbare CSV parser: pyarrow (multi-threaded) als die geïnstalleerd is
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+# Aantal rijen waarin de kolom detectie naar antwoorden zoekt; alleen kolommen
+# die in deze rijen leeg zijn worden verder gescand
+SCHEMA_SAMPLE_ROWS = 200
+
+# Maximaal aantal onbekende antwoorden in processing_summary
+UNKNOWN_ANSWERS_LIMIT = 50
+
+# Geheugenmodel van een verwerking in bytes, gekalibreerd met benchmark.py data
+# (tracemalloc piek per stap). Een wide cel is rij x kolom, een long rij is
+# rij x competentie kolom; de piek valt bij de melt en de groepsstatistieken.
+MEMORY_BYTES_PER_WIDE_CELL = 20
+MEMORY_BYTES_PER_LONG_ROW = 105
+# Streaming houdt alleen een chunk wide data vast (openpyxl rijen tijdens het
+# lezen), maar de compacte long frames worden aan het eind nog samengevoegd
+MEMORY_BYTES_PER_READ_CELL = 90
+MEMORY_BYTES_PER_LONG_ROW_STREAMING = 140
+# Gemeten RSS stijging ligt ~1.75x boven de tracemalloc piek (fragmentatie,
+# vrijgegeven maar niet teruggegeven geheugen, buffers van libraries)
+MEMORY_SAFETY_FACTOR = 1.8
+# Ondergrens voor bytes per rij in een .xlsx als het aantal rijen onbekend is
+XLSX_MIN_BYTES_PER_ROW = 50
+
 class DataProcessingError(Exception):
     """Custom exception voor data processing fouten"""
     pass
 
+def combine_klantgerichtheid(scores: Dict[str, float], details: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Voegt gesplitste KLANTGERICHTHEID sub-competenties samen tot één score
+
+    Args:
+        scores (Dict[str, float]): Scores per competentie, wordt in-place aangepast
+        details (Optional[Dict[str, Any]]): Details per competentie, wordt in-place aangepast
+    """
+    klant_keys = [k for k in scores.keys() if 'KLANTGERICHTHEID' in k]
+    if len(klant_keys) <= 1:
+        return
+
+    # Bereken gemiddelde van alle KLANTGERICHTHEID scores
+    combined_score = round(np.mean([scores[k] for k in klant_keys]), 2)
+
+    # Verwijder individuele scores en voeg gecombineerde toe
+    for k in klant_keys:
+        del scores[k]
+        if details is not None:
+            del details[k]
+
+    scores['KLANTGERICHTHEID'] = combined_score
+    if details is not None:
+        details['KLANTGERICHTHEID'] = {
+            'overall_average': combined_score,
+            'note': 'Gecombineerd uit meerdere sub-competenties'
+        }
+
+def estimate_processing_memory(n_rows: int, n_columns: int, n_competency_columns: int,
+                               chunk_size: int = STREAMING_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Schat het piekgeheugen van een verwerking uit de header en het aantal rijen
+    
+    Args:
+        n_rows (int): Aantal data rijen
+        n_columns (int): Aantal kolommen in de header
+        n_competency_columns (int): Aantal competentie kolommen
+        chunk_size (int): Chunk grootte van de streaming verwerking
+        
+    Returns:
+        Dict[str, int]: Aantal long rijen en de geschatte piek in bytes voor de
+            volledige ('full_bytes') en de streaming verwerking ('streaming_bytes')
+    """
+    long_rows = n_rows * n_competency_columns
+    full = n_rows * n_columns * MEMORY_BYTES_PER_WIDE_CELL + long_rows * MEMORY_BYTES_PER_LONG_ROW
+    streaming = (min(n_rows, chunk_size) * n_columns * MEMORY_BYTES_PER_READ_CELL
+                 + long_rows * MEMORY_BYTES_PER_LONG_ROW_STREAMING)
+    return {
+        'long_rows': long_rows,
+        'full_bytes': int(full * MEMORY_SAFETY_FACTOR),
+        'streaming_bytes': int(streaming * MEMORY_SAFETY_FACTOR)
+    }
+
+def estimate_batch_memory(estimates: List[Dict[str, Any]]) -> int:
+    """
+    Schat het piekgeheugen van een batch die alle bestanden tegelijk verwerkt
+    
+    Elk bestand telt met zijn volledige verwerking; daarbovenop komen de
+    compacte long frames die aan het eind samengevoegd worden.
+    
+    Args:
+        estimates (List[Dict[str, Any]]): Schattingen per bestand (zie ExcelProcessor.estimate_memory)
+        
+    Returns:
+        int: Geschatte piek in bytes
+    """
+    long_rows = sum(estimate['long_rows'] for estimate in estimates)
+    combine = long_rows * MEMORY_BYTES_PER_LONG_ROW_STREAMING * MEMORY_SAFETY_FACTOR
+    return int(sum(estimate['full_bytes'] for estimate in estimates) + combine)
+
+def concat_long_frames(frames: List[pd.DataFrame], ignore_index: bool = True) -> pd.DataFrame:
+    """
+    Voegt long format DataFrames samen zonder categorische kolommen te verliezen
+    
+    pd.concat valt terug op object kolommen als de categorieën per frame
+    verschillen; hier worden de categorieën per kolom eerst samengevoegd.
+    
+    Args:
+        frames (List[pd.DataFrame]): Long format DataFrames met dezelfde kolommen
+        ignore_index (bool): Nieuwe RangeIndex in plaats van de index van de frames
+        
+    Returns:
+        pd.DataFrame: Samengevoegde DataFrame
+    """
+    if len(frames) == 1:
+        return frames[0]
+    
+    index = None if ignore_index else frames[0].index.append([frame.index for frame in frames[1:]])
+    combined = {}
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            combined[col] = union_categoricals([frame[col] for frame in frames])
+        else:
+            combined[col] = np.concatenate([frame[col].to_numpy() for frame in frames])
+    return pd.DataFrame(combined, index=index)
+
+def response_row_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Sleutel per wide rij op Timestamp + Beoordelaar + Persoon, om rijen te herkennen
+    
+    Args:
+        df (pd.DataFrame): Wide format DataFrame
+        
+    Returns:
+        np.ndarray: uint64 hash per rij
+    """
+    key_columns = {}
+    for col in ['Timestamp', 'Wie ben jij?', 'Voor welke collega vul je dit formulier in?']:
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        key_columns[col] = values.astype(str).str.strip()
+    return pd.util.hash_pandas_object(pd.DataFrame(key_columns), index=False).to_numpy()
+
+def sniff_csv(file_path: str, sample_bytes: int = CSV_SNIFF_BYTES) -> Tuple[str, str]:
+    """
+    Bepaalt encoding en scheidingsteken van een CSV bestand uit de eerste bytes
+    
+    De encoding volgt uit een BOM, anders de eerste encoding uit CSV_ENCODINGS
+    die de steekproef foutloos decodeert. Het scheidingsteken is het teken
+    waarmee de header de meeste kolommen heeft en de rijen evenveel velden.
+    
+    Args:
+        file_path (str): Pad naar CSV bestand
+        sample_bytes (int): Aantal bytes in de steekproef
+        
+    Returns:
+        Tuple[str, str]: (encoding, scheidingsteken)
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read(sample_bytes)
+    
+    if raw.startswith(codecs.BOM_UTF8):
+        candidates = ['utf-8-sig']
+    elif raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates = ['utf-16']
+    else:
+        candidates = CSV_ENCODINGS
+    for encoding in candidates:
+        try:
+            # Incrementeel, zodat een afgebroken teken aan het eind geen fout geeft
+            text = codecs.getincrementaldecoder(encoding)().decode(raw, final=False)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        encoding, text = 'latin-1', raw.decode('latin-1')
+    
+    truncated = len(raw) == sample_bytes
+    best, best_score = CSV_DELIMITERS[0], None
+    for delimiter in CSV_DELIMITERS:
+        rows = []
+        try:
+            for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+                rows.append(row)
+        except csv.Error:
+            pass
+        if truncated and len(rows) > 1:
+            # De laatste rij kan halverwege afgebroken zijn
+            rows = rows[:-1]
+        if not rows or len(rows[0]) < 2:
+            continue
+        consistent = sum(len(row) == len(rows[0]) for row in rows[1:]) / max(len(rows) - 1, 1)
+        score = (consistent, len(rows[0]))
+        if best_score is None or score > best_score:
+            best, best_score = delimiter, score
+    return encoding, best
+
+def _unique_column_names(header: Iterable[Any]) -> List[str]:
+    """Zelfde kolomnamen als pd.read_excel: 'Unnamed: n' en '.1' voor duplicaten"""
+    columns = []
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        candidate, n = name, 0
+        while candidate in columns:
+            n += 1
+            candidate = f"{name}.{n}"
+        columns.append(candidate)
+    return columns
+
+# Een classificatie regel krijgt (persoon, beoordelaar) en geeft een type of None
+FeedbackRule = Callable[[str, str], Optional[str]]
+
+def self_assessment_rule(persoon: str, beoordelaar: str) -> Optional[str]:
+    """Self assessment als persoon en beoordelaar (bijna) gelijk zijn"""
+    persoon = persoon.lower().strip()
+    beoordelaar = beoordelaar.lower().strip()
+    if persoon in beoordelaar or beoordelaar in persoon:
+        return 'self'
+    return None
+
+def manager_rule(managers: Union[Iterable[str], Dict[str, Iterable[str]]]) -> FeedbackRule:
+    """
+    Maakt een regel die feedback van managers als 'manager' classificeert
+    
+    Args:
+        managers: Lijst van managers, of mapping van persoon naar diens managers
+        
+    Returns:
+        FeedbackRule: Classificatie regel
+    """
+    def normalize(name: str) -> str:
+        return str(name).lower().strip()
+    
+    if isinstance(managers, dict):
+        per_person = {normalize(p): {normalize(m) for m in ms} for p, ms in managers.items()}
+        
+        def rule(persoon: str, beoordelaar: str) -> Optional[str]:
+            if normalize(beoordelaar) in per_person.get(normalize(persoon), ()):
+                return 'manager'
+            return None
+    else:
+        all_managers = {normalize(m) for m in managers}
+        
+        def rule(persoon: str, beoordelaar: str) -> Optional[str]:
+            return 'manager' if normalize(beoordelaar) in all_managers else None
+    
+    return rule
+
+class FeedbackClassifier:
+    """Bepaalt het feedback type per uniek (Persoon, Beoordelaar) paar"""
+    
+    def __init__(self, rules: Optional[List[FeedbackRule]] = None, managers=None, default_type: str = 'peer'):
+        """
+        Args:
+            rules (Optional[List[FeedbackRule]]): Regels in volgorde van prioriteit
+            managers: Optionele managerlijst of mapping persoon -> managers
+            default_type (str): Type als geen enkele regel van toepassing is
+        """
+        self.rules = list(rules) if rules is not None else [self_assessment_rule]
+        if managers:
+            self.rules.append(manager_rule(managers))
+        self.default_type = default_type
+    
+    def classify_pair(self, persoon: Any, beoordelaar: Any) -> str:
+        """Classificeert één (persoon, beoordelaar) paar"""
+        if pd.isna(persoon) or pd.isna(beoordelaar):
+            return self.default_type
+        
+        for rule in self.rules:
+            feedback_type = rule(str(persoon), str(beoordelaar))
+            if feedback_type:
+                return feedback_type
+        return self.default_type
+    
+    def classify(self, persons: pd.Series, raters: pd.Series) -> np.ndarray:
+        """
+        Classificeert alle rijen door elk uniek paar één keer te beoordelen
+        
+        Args:
+            persons (pd.Series): Beoordeelde personen
+            raters (pd.Series): Beoordelaars
+            
+        Returns:
+            np.ndarray: Feedback type per rij
+        """
+        person_codes, person_uniques = pd.factorize(persons)
+        rater_codes, rater_uniques = pd.factorize(raters)
+        
+        # Codeer elk paar als één integer (-1 = ontbrekende naam wordt 0)
+        stride = len(rater_uniques) + 1
+        pair_codes, pair_uniques = pd.factorize((person_codes + 1) * stride + (rater_codes + 1))
+        
+        pair_types = np.array([
+            self.classify_pair(
+                person_uniques[code // stride - 1] if code // stride else None,
+                rater_uniques[code % stride - 1] if code % stride else None
+            )
+            for code in pair_uniques
+        ], dtype=object)
+        
+        return pair_types[pair_codes]
+
 class ExcelProcessor:
     """Hoofdklasse voor Excel bestand verwerking"""
     
-    def __init__(self):
+    def __init__(self, classifier: Optional[FeedbackClassifier] = None,
+                 scale: Optional[Union[str, ScoreScale]] = None,
+                 scales: Optional[Dict[str, ScoreScale]] = None,
+                 schema_cache: Optional[SchemaCache] = None):
+        """
+        Args:
+            classifier (Optional[FeedbackClassifier]): Bepaalt het feedback type, standaard self/peer
+            scale (Optional[Union[str, ScoreScale]]): Antwoordschaal (of naam), standaard
+                automatisch gekozen uit de data
+            scales (Optional[Dict[str, ScoreScale]]): Beschikbare schalen, standaard BUILTIN_SCALES
+            schema_cache (Optional[SchemaCache]): Gedeelde cache van formulier schema's,
+                None om de kolommen elke keer te detecteren
+            
+        Raises:
+            DataProcessingError: Bij een onbekende schaal naam
+        """
+        self.scales = scales or BUILTIN_SCALES
+        if isinstance(scale, str):
+            if scale not in self.scales:
+                raise DataProcessingError(f"Onbekende schaal: {scale} (beschikbaar: {', '.join(self.scales)})")
+            scale = self.scales[scale]
+        self.requested_scale = scale
+        self.scale = scale
+        self.schema_cache = schema_cache
+        # Een schema geldt alleen voor dezelfde gevraagde schaal en dezelfde schalen
+        self.schema_context = f"{scale.name if scale is not None else 'auto'}/{scales_fingerprint(self.scales)}"
+        self.schema = None
+        self.schema_from_cache = False
+        # Onbekende antwoorden met hun aantal, over alle chunks van de laatste verwerking
+        self.unknown_answers = Counter()
+        # Volledige header van het laatst gelezen bestand, ook als niet alle kolommen gelezen zijn
+        self.source_header = None
         self.df = None
         self.processed_data = {}
         self.validation_errors = []
         self.competency_columns = []
         self.competency_categories = {}
+        self.column_categories = {}
+        self.responses = pd.DataFrame()
+        self.row_keys = np.empty(0, dtype=np.uint64)
+        self.estimated_rows = None
+        self.classifier = classifier or FeedbackClassifier()
+        # Tijd, rijen en geheugen per verwerkingsstap van de laatste verwerking
+        self.timings = StageTimings()
+    
+    def _start_run(self) -> None:
+        """Zet de toestand van een vorige verwerking terug (tijden, schaal, schema, onbekende antwoorden)"""
+        self.timings = StageTimings()
+        self.scale = self.requested_scale
+        self.unknown_answers = Counter()
+        self.schema = None
+        self.schema_from_cache = False
     
     def read_excel_file(self, file_path: str) -> pd.DataFrame:
         """
@@ -65,6 +442,7 @@ class ExcelProcessor:
         Raises:
             DataProcessingError: Bij fouten in bestand lezen
         """
+        self.source_header = None
         try:
             # Probeer verschillende Excel formaten en separators
             if file_path.endswith('.xlsx'):
@@ -72,14 +450,7 @@ class ExcelProcessor:
             elif file_path.endswith('.xls'):
                 df = pd.read_excel(file_path, engine='xlrd')
             elif file_path.endswith('.csv'):
-                # Probeer verschillende separators
-                for sep in [';', ',', '\t']:
-                    try:
-                        df = pd.read_csv(file_path, sep=sep)
-                        if len(df.columns) > 1:  # Succesvolle split
-                            break
-                    except:
-                        continue
+                df = self.read_csv_file(file_path)
             else:
                 raise DataProcessingError(f"Niet ondersteund bestandsformaat: {file_path}")
             
@@ -92,6 +463,9 @@ class ExcelProcessor:
             # Verwijder lege rijen (waar alle competentie scores leeg zijn)
             df = df.dropna(how='all')
             
+            # Een CSV wordt alleen met de gebruikte kolommen gelezen
+            if self.source_header is None:
+                self.source_header = list(df.columns)
             self.df = df
             return df
             
@@ -102,10 +476,64 @@ class ExcelProcessor:
         except Exception as e:
             raise DataProcessingError(f"Fout bij lezen Excel bestand: {str(e)}")
     
+    def read_csv_file(self, file_path: str) -> pd.DataFrame:
+        """
+        Leest een CSV export in één keer, alleen met de kolommen die de verwerking gebruikt
+        
+        Encoding en scheidingsteken komen uit de eerste bytes (zie sniff_csv).
+        Met een bekend schema (zie detect_schema) staan de competentie kolommen
+        al vast; anders bepaalt een steekproef welke kolommen zeker geen
+        antwoorden bevatten. Alle kolommen worden als categorieën gelezen: een
+        formulier heeft per kolom maar een handvol verschillende antwoorden.
+        Zet self.source_header op de volledige header.
+        
+        Args:
+            file_path (str): Pad naar CSV bestand
+            
+        Returns:
+            pd.DataFrame: Wide format data met de gebruikte kolommen
+        """
+        encoding, delimiter = sniff_csv(file_path)
+        options = {'sep': delimiter, 'encoding': encoding}
+        header = list(pd.read_csv(file_path, nrows=0, **options).columns)
+        self.source_header = header
+        
+        keep = set(BASE_COLUMNS + RESPONSE_COLUMNS)
+        schema = None
+        if self.schema_cache is not None:
+            schema = self.schema_cache.get(header_fingerprint(header), self.schema_context)
+        if schema is not None:
+            keep.update(schema.competency_columns)
+        else:
+            # Zelfde regels als identify_competency_columns: alleen kolommen die in
+            # de steekproef gevuld zijn zonder een antwoord van een schaal vallen af
+            sample = pd.read_csv(file_path, nrows=SCHEMA_SAMPLE_ROWS, dtype=object, **options)
+            scales = [self.scale] if self.scale is not None else self.scales.values()
+            answers = set().union(*(scale.text_answers() for scale in scales))
+            for col in header:
+                values = sample[col].dropna()
+                if (any(marker in col for marker in COMPETENCY_MARKERS) or values.empty or
+                        values.astype(str).str.lower().isin(answers).any()):
+                    keep.add(col)
+        
+        # Zonder herkende kolommen alles lezen, zodat de validatie de fout benoemt
+        columns = [col for col in header if col in keep] or header
+        logger.info(f"CSV gelezen met encoding {encoding}, scheidingsteken {delimiter!r}, "
+                    f"{len(columns)} van {len(header)} kolommen ({CSV_ENGINE} parser)")
+        if CSV_ENGINE == 'pyarrow':
+            try:
+                return pd.read_csv(file_path, engine='pyarrow', usecols=columns, dtype='category', **options)
+            except (ValueError, ImportError) as e:
+                logger.warning(f"pyarrow parser niet bruikbaar, valt terug op de C parser: {str(e)}")
+        return pd.read_csv(file_path, usecols=columns, dtype='category', **options)
+    
     def identify_competency_columns(self, df: pd.DataFrame) -> List[str]:
         """
         Identificeert competentie kolommen in de dataset
         
+        Zoekt naar antwoorden in de eerste SCHEMA_SAMPLE_ROWS rijen; alleen een
+        kolom die daar leeg is wordt over alle rijen gescand.
+        
         Args:
             df (pd.DataFrame): DataFrame om te analyseren
             
@@ -113,19 +541,85 @@ class ExcelProcessor:
             List[str]: Lijst van competentie kolommen
         """
         competency_columns = []
+        # Met een gekozen schaal alleen diens antwoorden, anders die van alle schalen
+        scales = [self.scale] if self.scale is not None else self.scales.values()
+        answers = set().union(*(scale.text_answers() for scale in scales))
+        sample = df.head(SCHEMA_SAMPLE_ROWS)
         
         for col in df.columns:
             # Competentie kolommen bevatten vaak ** of specifieke patronen
-            if any(marker in str(col) for marker in ['**', 'ANALYSE', 'KWALITEIT', 'KLANT', 'PROJECT', 'TEAM', 'LEIDER', 'INNOVATIE']):
+            if any(marker in str(col) for marker in COMPETENCY_MARKERS):
                 competency_columns.append(col)
             # Of kolommen die scores bevatten
-            elif col not in BASE_COLUMNS and df[col].dropna().astype(str).str.lower().isin(SCORE_MAPPING.keys()).any():
-                competency_columns.append(col)
+            elif col not in BASE_COLUMNS:
+                values = sample[col].dropna()
+                if values.empty and len(df) > len(sample):
+                    values = df[col].dropna()
+                if values.astype(str).str.lower().isin(answers).any():
+                    competency_columns.append(col)
         
         self.competency_columns = competency_columns
         logger.info(f"Gevonden competentie kolommen: {len(competency_columns)}")
         return competency_columns
     
+    def detect_schema(self, df: pd.DataFrame, store: bool = True,
+                      header: Optional[List[str]] = None) -> FormSchema:
+        """
+        Bepaalt competentie kolommen, categorieën en (zonder gekozen schaal) de schaal
+        
+        Met een schema_cache wordt de indeling opgezocht op de fingerprint van de
+        header; bij een hit wordt de data niet gescand. Zet self.competency_columns,
+        self.competency_categories, self.column_categories en self.scale.
+        
+        Args:
+            df (pd.DataFrame): Wide format data (of een steekproef)
+            store (bool): Sla een nieuw gedetecteerd schema op in de cache; uit voor
+                een kleine steekproef, die een kolom kan missen
+            header (Optional[List[str]]): Volledige header als df niet alle kolommen
+                bevat (zie read_csv_file), standaard de kolommen van df
+                
+        Returns:
+            FormSchema: Gedetecteerd of hergebruikt schema
+        """
+        header = list(df.columns) if header is None else header
+        fingerprint = header_fingerprint(header)
+        
+        with self.timings.stage('detect_columns', rows_in=len(df)) as stage:
+            schema = None
+            if self.schema_cache is not None:
+                schema = self.schema_cache.get(fingerprint, self.schema_context)
+            from_cache = schema is not None
+            
+            if from_cache:
+                self.competency_columns = list(schema.competency_columns)
+                self.competency_categories = schema.competency_categories
+                self.column_categories = schema.column_categories
+                if self.scale is None and schema.scale in self.scales:
+                    self.scale = self.scales[schema.scale]
+            else:
+                competency_columns = self.identify_competency_columns(df)
+                self.extract_competency_categories(competency_columns)
+            
+            # Zonder gekozen schaal de schaal die de antwoorden het best herkent
+            detected_scale = None
+            if self.requested_scale is None and self.competency_columns:
+                if self.scale is None:
+                    self.scale = detect_scale(df, self.competency_columns, self.scales)
+                    logger.info(f"Antwoordschaal gedetecteerd: {self.scale.name}")
+                detected_scale = self.scale.name
+            
+            if not from_cache:
+                schema = FormSchema.create(fingerprint, self.schema_context, len(header), self.competency_columns,
+                                           self.competency_categories, detected_scale)
+                if store and self.schema_cache is not None and self.competency_columns:
+                    self.schema_cache.put(schema)
+            
+            stage.rows_out = len(self.competency_columns)
+        
+        self.schema = schema
+        self.schema_from_cache = from_cache
+        return schema
+    
     def extract_competency_categories(self, columns: List[str]) -> Dict[str, List[str]]:
         """
         Extraheert competentie categorieën uit kolomnamen
@@ -137,6 +631,7 @@ class ExcelProcessor:
             Dict[str, List[str]]: Mapping van categorieën naar sub-competenties
         """
         categories = {}
+        column_categories = {}
         
         for col in columns:
             # Probeer categorie te extraheren tussen ** **
@@ -156,237 +651,450 @@ class ExcelProcessor:
                     'column': col,
                     'description': sub_competency
                 })
+                column_categories[col] = main_category
         
         self.competency_categories = categories
+        self.column_categories = column_categories
         logger.info(f"Gevonden competentie categorieën: {list(categories.keys())}")
         return categories
     
-    def convert_wide_to_long(self, df: pd.DataFrame) -> pd.DataFrame:
+    def classify_feedback(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Converteert wide format (competenties als kolommen) naar long format
+        Voegt Persoon, Beoordelaar en Type kolommen toe aan de wide format data
+        
+        Het feedback type wordt per uniek (Persoon, Beoordelaar) paar bepaald
+        en daarna naar alle rijen uitgezet, zodat de regels niet per cel draaien.
         
         Args:
             df (pd.DataFrame): Wide format DataFrame
             
         Returns:
-            pd.DataFrame: Long format DataFrame
+            pd.DataFrame: Kopie van de DataFrame met classificatie kolommen
         """
-        # Identificeer competentie kolommen
-        competency_columns = self.identify_competency_columns(df)
+        df = df.copy(deep=False)
         
-        if not competency_columns:
-            raise DataProcessingError("Geen competentie kolommen gevonden")
+        # Map persoon en beoordelaar kolommen
+        if 'Voor welke collega vul je dit formulier in?' in df.columns:
+            df['Persoon'] = df['Voor welke collega vul je dit formulier in?'].str.strip()
         
-        # Extract categorieën
-        categories = self.extract_competency_categories(competency_columns)
+        if 'Wie ben jij?' in df.columns:
+            df['Beoordelaar'] = df['Wie ben jij?'].str.strip()
         
-        # Bepaal id kolommen (niet-competentie kolommen)
-        id_columns = [col for col in df.columns if col not in competency_columns]
+        persons = df['Persoon'] if 'Persoon' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        raters = df['Beoordelaar'] if 'Beoordelaar' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        df['Type'] = pd.Categorical(self.classifier.classify(persons, raters))
         
-        # Melt de dataframe
-        long_df = pd.melt(
-            df,
-            id_vars=id_columns,
-            value_vars=competency_columns,
-            var_name='Competentie_Raw',
-            value_name='Score_Text'
-        )
+        # Herhaalde namen compact opslaan, de melt neemt de categorieën over
+        for col in ['Persoon', 'Beoordelaar']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
-        # Voeg categorie informatie toe
-        def get_category(comp_raw):
-            for cat, comps in categories.items():
-                for comp in comps:
-                    if comp['column'] == comp_raw:
-                        return cat
-            return 'Overig'
+        return df
+    
+    def project_columns(self, df: pd.DataFrame, competency_columns: List[str], row_offset: int = 0) -> pd.DataFrame:
+        """
+        Beperkt de wide format data tot de kolommen die latere stappen gebruiken
         
-        long_df['Competentie'] = long_df['Competentie_Raw'].apply(get_category)
+        Optionele kolommen (zie RESPONSE_COLUMNS) worden als categorieën één keer
+        per response in self.responses bewaard en zijn via Response_ID terug te
+        koppelen. Overige kolommen, zoals het mailadres, worden niet meegenomen.
         
-        # Map persoon en beoordelaar kolommen
-        if 'Voor welke collega vul je dit formulier in?' in long_df.columns:
-            long_df['Persoon'] = long_df['Voor welke collega vul je dit formulier in?'].str.strip()
+        Args:
+            df (pd.DataFrame): Wide format DataFrame
+            competency_columns (List[str]): Competentie kolommen
+            row_offset (int): Eerste Response_ID, voor verwerking in chunks
+            
+        Returns:
+            pd.DataFrame: Response_ID, persoon/beoordelaar en competentie kolommen
+        """
+        response_ids = np.arange(row_offset, row_offset + len(df), dtype=np.int32)
+        self.row_keys = response_row_keys(df)
+        
+        self.responses = pd.DataFrame(
+            {col: df[col].astype('category').to_numpy() for col in RESPONSE_COLUMNS if col in df.columns},
+            index=pd.Index(response_ids, name='Response_ID')
+        )
+        
+        keep_columns = [col for col in ['Wie ben jij?', 'Voor welke collega vul je dit formulier in?'] if col in df.columns]
+        projected = df[keep_columns + competency_columns].copy(deep=False)
+        projected.insert(0, 'Response_ID', response_ids)
+        return projected
+    
+    def attach_response_columns(self, long_df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Koppelt optionele response kolommen via Response_ID terug aan long format data
         
-        if 'Wie ben jij?' in long_df.columns:
-            long_df['Beoordelaar'] = long_df['Wie ben jij?'].str.strip()
+        Args:
+            long_df (pd.DataFrame): Long format DataFrame
+            columns (Optional[List[str]]): Kolommen om toe te voegen, standaard alle
+            
+        Returns:
+            pd.DataFrame: Long format DataFrame met de gevraagde kolommen
+        """
+        columns = list(self.responses.columns) if columns is None else columns
+        return long_df.join(self.responses[columns], on='Response_ID')
+    
+    def convert_wide_to_long(self, df: pd.DataFrame, competency_columns: Optional[List[str]] = None,
+                             row_offset: int = 0) -> pd.DataFrame:
+        """
+        Converteert wide format (competenties als kolommen) naar long format
         
-        # Bepaal feedback type
-        def determine_feedback_type(row):
-            if pd.isna(row.get('Persoon')) or pd.isna(row.get('Beoordelaar')):
-                return 'peer'
+        Args:
+            df (pd.DataFrame): Wide format DataFrame
+            competency_columns (Optional[List[str]]): Al bepaalde competentie kolommen
+                (categorieën moeten dan al geëxtraheerd zijn), standaard automatisch
+            row_offset (int): Eerste Response_ID, voor verwerking in chunks
             
-            persoon = str(row['Persoon']).lower().strip()
-            beoordelaar = str(row['Beoordelaar']).lower().strip()
+        Returns:
+            pd.DataFrame: Long format DataFrame
+        """
+        if competency_columns is None:
+            # Identificeer competentie kolommen en categorieën
+            self.detect_schema(df)
+            competency_columns = self.competency_columns
             
-            # Self assessment als persoon en beoordelaar (bijna) gelijk zijn
-            if persoon in beoordelaar or beoordelaar in persoon:
-                return 'self'
-            # Voor nu alles als peer, later kunnen we manager logic toevoegen
-            else:
-                return 'peer'
+            if not competency_columns:
+                raise DataProcessingError("Geen competentie kolommen gevonden")
+        
+        # Leg de categorie per kolom één keer vast
+        column_category_codes, category_names = pd.factorize(
+            np.array([self.column_categories.get(col, 'Overig') for col in competency_columns], dtype=object)
+        )
         
-        long_df['Type'] = long_df.apply(determine_feedback_type, axis=1)
+        # Neem alleen de kolommen mee die na de melt nog gebruikt worden
+        with self.timings.stage('project', rows_in=len(df)) as stage:
+            df = self.project_columns(df, competency_columns, row_offset)
+            stage.rows_out = len(df)
         
-        # Converteer scores naar numeriek
-        long_df['Score'] = long_df['Score_Text'].str.lower().str.strip().map(SCORE_MAPPING)
+        # Bepaal persoon, beoordelaar en feedback type één keer per wide rij
+        with self.timings.stage('classify', rows_in=len(df)) as stage:
+            df = self.classify_feedback(df)
+            stage.rows_out = len(df)
         
-        # Verwijder rijen zonder geldige score
-        long_df = long_df[long_df['Score'].notna()]
+        with self.timings.stage('melt', rows_in=len(df)) as stage:
+            # Bepaal id kolommen
+            id_columns = [col for col in LONG_ID_COLUMNS if col in df.columns]
+            
+            # Melt de dataframe
+            long_df = pd.melt(
+                df,
+                id_vars=id_columns,
+                value_vars=competency_columns,
+                var_name='Competentie_Raw',
+                value_name='Score_Text'
+            )
+            
+            # Melt stapelt de competentie kolommen achter elkaar, dus de kolom per
+            # long rij volgt direct uit de positie en wordt als categorie opgeslagen
+            raw_codes = np.repeat(np.arange(len(competency_columns)), len(df))
+            long_df['Competentie_Raw'] = pd.Categorical.from_codes(raw_codes, categories=competency_columns)
+            long_df['Competentie'] = pd.Categorical.from_codes(column_category_codes[raw_codes], categories=category_names)
+            
+            # Converteer scores naar numeriek: één lookup per uniek antwoord
+            if self.scale is None:
+                self.scale = detect_scale(df, competency_columns, self.scales)
+            scores, unknown = self.scale.map_answers(long_df['Score_Text'])
+            long_df['Score'] = scores
+            self.unknown_answers.update(unknown)
+            
+            # Verwijder rijen zonder geldige score, de ruwe tekst is niet meer nodig
+            long_df = long_df[long_df['Score'].notna()].drop(columns='Score_Text')
+            stage.rows_out = len(long_df)
         
         logger.info(f"Data geconverteerd van wide naar long format: {len(long_df)} rijen")
         
         return long_df
     
-    def validate_excel_structure(self, df: pd.DataFrame) -> Tuple[bool, List[str]]:
+    def validate_excel_structure(self, df: pd.DataFrame, store_schema: bool = True,
+                                 header: Optional[List[str]] = None) -> Tuple[bool, List[str]]:
         """
         Valideert of Excel bestand de juiste structuur heeft
         
         Args:
             df (pd.DataFrame): DataFrame om te valideren
+            store_schema (bool): Sla het gedetecteerde schema op (zie detect_schema)
+            header (Optional[List[str]]): Volledige header van het bestand (zie detect_schema)
             
         Returns:
             Tuple[bool, List[str]]: (is_valid, error_messages)
         """
         errors = []
         
-        # Check voor basis kolommen
-        missing_base = []
-        for col in ['Wie ben jij?', 'Voor welke collega vul je dit formulier in?']:
-            if col not in df.columns:
-                missing_base.append(col)
+        # Competentie kolommen (en schaal) worden in een eigen stap gedetecteerd
+        self.detect_schema(df, store=store_schema, header=header)
+        competency_columns = self.competency_columns
         
-        if missing_base:
-            errors.append(f"Ontbrekende basis kolommen: {', '.join(missing_base)}")
-        
-        # Check voor competentie kolommen
-        competency_columns = self.identify_competency_columns(df)
-        if len(competency_columns) < 5:
-            errors.append(f"Te weinig competentie kolommen gevonden: {len(competency_columns)}")
-        
-        # Check voor data
-        if len(df) < 1:
-            errors.append("Geen data rijen gevonden")
+        with self.timings.stage('validate', rows_in=len(df)):
+            # Check voor basis kolommen
+            missing_base = []
+            for col in ['Wie ben jij?', 'Voor welke collega vul je dit formulier in?']:
+                if col not in df.columns:
+                    missing_base.append(col)
+            
+            if missing_base:
+                errors.append(f"Ontbrekende basis kolommen: {', '.join(missing_base)}")
+            
+            # Check voor competentie kolommen
+            if len(competency_columns) < 5:
+                errors.append(f"Te weinig competentie kolommen gevonden: {len(competency_columns)}")
+            
+            # Check voor data
+            if len(df) < 1:
+                errors.append("Geen data rijen gevonden")
         
         self.validation_errors = errors
         return len(errors) == 0, errors
     
-    def calculate_competency_scores(self, feedback_data: pd.DataFrame, person_name: str) -> Dict[str, Any]:
+    def read_sample(self, file_path: str, sample_rows: int = VALIDATION_SAMPLE_ROWS) -> pd.DataFrame:
         """
-        Berekent gemiddelde scores per competentie voor een persoon
+        Leest alleen de header en de eerste data rijen van een bestand
+        
+        Zet self.estimated_rows op een schatting van het totaal aantal data rijen
+        (None als die niet goedkoop te bepalen is).
         
         Args:
-            feedback_data (pd.DataFrame): Feedback data in long format
-            person_name (str): Naam van persoon om scores voor te berekenen
+            file_path (str): Pad naar Excel of CSV bestand
+            sample_rows (int): Maximaal aantal data rijen
             
         Returns:
-            Dict[str, Any]: Dictionary met scores en statistieken
+            pd.DataFrame: Header met steekproef van data rijen
+            
+        Raises:
+            DataProcessingError: Bij fouten in bestand lezen
         """
-        # Filter data voor specifieke persoon
-        person_data = feedback_data[feedback_data['Persoon'] == person_name].copy()
-        
-        if person_data.empty:
-            raise DataProcessingError(f"Geen data gevonden voor persoon: {person_name}")
+        self.estimated_rows = None
+        try:
+            if file_path.endswith('.xlsx'):
+                from openpyxl import load_workbook
+                
+                workbook = load_workbook(file_path, read_only=True, data_only=True)
+                try:
+                    worksheet = workbook.worksheets[0]
+                    rows = worksheet.iter_rows(values_only=True)
+                    header = next(rows, None)
+                    if header is None:
+                        raise DataProcessingError("Excel bestand bevat geen data")
+                    sample = [row for _, row in zip(range(sample_rows), rows)]
+                    # max_row komt uit de dimensie in het bestand, zonder alle rijen te lezen
+                    if worksheet.max_row:
+                        self.estimated_rows = worksheet.max_row - 1
+                finally:
+                    workbook.close()
+                df = pd.DataFrame(sample, columns=_unique_column_names(header))
+            elif file_path.endswith('.xls'):
+                import xlrd
+                
+                df = pd.read_excel(file_path, engine='xlrd', nrows=sample_rows)
+                book = xlrd.open_workbook(file_path, on_demand=True)
+                try:
+                    self.estimated_rows = book.sheet_by_index(0).nrows - 1
+                finally:
+                    # Sluit het bestand en de geladen sheets weer
+                    book.release_resources()
+            elif file_path.endswith('.csv'):
+                encoding, delimiter = sniff_csv(file_path)
+                df = pd.read_csv(file_path, sep=delimiter, encoding=encoding, nrows=sample_rows)
+                # Schat het aantal rijen uit de gemiddelde regellengte van de steekproef
+                with open(file_path, 'rb') as f:
+                    header_size = len(f.readline())
+                    sample = [line for line in (f.readline() for _ in range(sample_rows)) if line]
+                if sample:
+                    average_line = sum(len(line) for line in sample) / len(sample)
+                    self.estimated_rows = max(int((os.path.getsize(file_path) - header_size) / average_line), len(df))
+                else:
+                    self.estimated_rows = 0
+            else:
+                raise DataProcessingError(f"Niet ondersteund bestandsformaat: {file_path}")
+        except DataProcessingError:
+            raise
+        except FileNotFoundError:
+            raise DataProcessingError(f"Bestand niet gevonden: {file_path}")
+        except Exception as e:
+            raise DataProcessingError(f"Fout bij lezen Excel bestand: {str(e)}")
         
-        # Bereken scores per competentie
-        competency_scores = {}
-        competency_details = {}
+        return df.dropna(how='all')
+    
+    def inspect_file(self, file_path: str, sample_rows: int = VALIDATION_SAMPLE_ROWS) -> Dict[str, Any]:
+        """
+        Snelle validatie op basis van de header en een kleine steekproef van rijen
         
-        for competentie in person_data['Competentie'].unique():
-            comp_data = person_data[person_data['Competentie'] == competentie]
-            
-            # Filter out None scores (van 'Weet ik niet' etc.)
-            valid_scores = comp_data['Score'].dropna()
+        Args:
+            file_path (str): Pad naar Excel of CSV bestand
+            sample_rows (int): Aantal data rijen in de steekproef
             
-            if len(valid_scores) == 0:
-                continue
+        Returns:
+            Dict[str, Any]: Validatie resultaat met gedetecteerd schema en rij schatting
+        """
+        df = self.read_sample(file_path, sample_rows)
+        is_valid, errors = self.validate_excel_structure(df, store_schema=False)
+        categories = self.competency_categories
+        
+        unknown = {}
+        if self.scale is not None and self.competency_columns:
+            _, unknown = self.scale.map_answers(pd.Series(df[self.competency_columns].to_numpy().ravel()))
+        
+        return {
+            'valid': is_valid,
+            'errors': errors,
+            'schema': {
+                'columns': list(df.columns),
+                'base_columns': [col for col in BASE_COLUMNS if col in df.columns],
+                'competency_columns': len(self.competency_columns),
+                'sample_rows': len(df)
+            },
+            'competency_categories': {
+                category: [item['description'] for item in items]
+                for category, items in categories.items()
+            },
+            'estimated_rows': self.estimated_rows,
+            'schema_fingerprint': self.schema.fingerprint,
+            'schema_from_cache': self.schema_from_cache,
+            'score_scale': self.scale.name if self.scale is not None else None,
+            # Antwoorden in de steekproef die de schaal niet kent, met hun aantal
+            'unknown_answers': unknown
+        }
+    
+    def estimate_memory(self, file_path: str) -> Dict[str, Any]:
+        """
+        Schat vooraf het geheugengebruik van een verwerking, zonder het bestand te laden
+        
+        Leest alleen de header en een steekproef (zie read_sample); als het
+        aantal rijen niet in het bestand staat wordt het ruim geschat uit de
+        bestandsgrootte.
+        
+        Args:
+            file_path (str): Pad naar Excel of CSV bestand
             
-            # Algemeen gemiddelde
-            avg_score = valid_scores.mean()
+        Returns:
+            Dict[str, Any]: Geschat aantal rijen, kolommen en piek in bytes per verwerkingsmodus
+        """
+        df = self.read_sample(file_path)
+        self.detect_schema(df, store=False)
+        competency_columns = self.competency_columns
+        
+        estimated_rows = self.estimated_rows
+        if estimated_rows is None:
+            estimated_rows = max(os.path.getsize(file_path) // XLSX_MIN_BYTES_PER_ROW, len(df))
+        
+        estimate = estimate_processing_memory(estimated_rows, len(df.columns), len(competency_columns))
+        return {
+            'estimated_rows': estimated_rows,
+            'columns': len(df.columns),
+            'competency_columns': len(competency_columns),
+            'streaming_supported': file_path.endswith('.xlsx'),
+            **estimate
+        }
+    
+    def _group_statistics(self, feedback_data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Berekent in één groupby-pass de statistieken per (Persoon, Competentie)
+        
+        Alleen wat de radar chart en de team vergelijking nodig hebben; de
+        details per type worden later per persoon uit de geldige rijen berekend.
+        
+        Args:
+            feedback_data (pd.DataFrame): Feedback data in long format
             
-            # Scores per feedback type
-            type_scores = {}
-            for feedback_type in comp_data['Type'].unique():
-                type_data = comp_data[comp_data['Type'] == feedback_type]
-                type_valid_scores = type_data['Score'].dropna()
-                
-                if len(type_valid_scores) > 0:
-                    type_scores[feedback_type] = {
-                        'average': type_valid_scores.mean(),
-                        'count': len(type_valid_scores),
-                        'scores': type_valid_scores.tolist()
-                    }
-            
-            competency_scores[competentie] = round(avg_score, 2)
-            competency_details[competentie] = {
-                'overall_average': round(avg_score, 2),
-                'by_type': type_scores,
-                'total_responses': len(valid_scores),
-                'std_deviation': round(valid_scores.std(), 2) if len(valid_scores) > 1 else 0
-            }
+        Returns:
+            Dict[str, Any]: Geldige rijen en statistieken per competentie en per persoon
+        """
+        valid = feedback_data[feedback_data['Score'].notna() & feedback_data['Persoon'].notna()]
         
-        # Voeg KLANTGERICHTHEID samen als die gesplitst is
-        klant_keys = [k for k in competency_scores.keys() if 'KLANTGERICHTHEID' in k]
-        if len(klant_keys) > 1:
-            # Bereken gemiddelde van alle KLANTGERICHTHEID scores
-            klant_scores = [competency_scores[k] for k in klant_keys]
-            combined_score = round(np.mean(klant_scores), 2)
-            
-            # Verwijder individuele scores en voeg gecombineerde toe
-            for k in klant_keys:
-                del competency_scores[k]
-                del competency_details[k]
-            
-            competency_scores['KLANTGERICHTHEID'] = combined_score
-            competency_details['KLANTGERICHTHEID'] = {
-                'overall_average': combined_score,
-                'note': 'Gecombineerd uit meerdere sub-competenties'
-            }
+        # Som, aantal en gemiddelde per (persoon, competentie); de som is exact bij gehele scores
+        comp_stats = valid.groupby(['Persoon', 'Competentie'], sort=False, observed=True)['Score'].agg(['sum', 'count'])
+        comp_stats['mean'] = comp_stats['sum'] / comp_stats['count']
         
         return {
-            'person_name': person_name,
-            'scores': competency_scores,
-            'details': competency_details,
-            'total_responses': len(person_data)
+            'valid': valid,
+            'comp_stats': comp_stats,
+            'person_totals': feedback_data.groupby('Persoon', sort=False, observed=True).size()
         }
     
-    def calculate_team_averages(self, feedback_data: pd.DataFrame) -> Dict[str, float]:
+    def _build_person_scores(self, stats: Dict[str, Any]) -> Mapping:
         """
-        Berekent team gemiddelden per competentie
+        Zet groepsstatistieken om naar scores en details per persoon
         
         Args:
-            feedback_data (pd.DataFrame): Alle feedback data in long format
+            stats (Dict[str, Any]): Resultaat van _group_statistics
             
         Returns:
-            Dict[str, float]: Team gemiddelden per competentie
+            Mapping: PersonScoreStore met scores, details en aantal responses per persoon;
+                de details worden pas bij eerste gebruik berekend
         """
-        team_averages = {}
+        from score_store import PersonScoreStore
+        return PersonScoreStore.from_long(stats['valid'], stats['comp_stats'], stats['person_totals'])
+    
+    def _build_team_averages(self, stats: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Berekent team gemiddelden uit de gemiddelden per persoon
         
-        for competentie in feedback_data['Competentie'].unique():
-            comp_data = feedback_data[feedback_data['Competentie'] == competentie]
+        Args:
+            stats (Dict[str, Any]): Resultaat van _group_statistics
             
-            # Bereken gemiddelde per persoon eerst, dan team gemiddelde
-            person_averages = []
-            for person in comp_data['Persoon'].unique():
-                person_comp_data = comp_data[comp_data['Persoon'] == person]
-                valid_scores = person_comp_data['Score'].dropna()
-                
-                if len(valid_scores) > 0:
-                    person_avg = valid_scores.mean()
-                    person_averages.append(person_avg)
+        Returns:
+            Dict[str, float]: Team gemiddelden per competentie
+        """
+        # Gemiddelde per persoon eerst, dan team gemiddelde
+        person_averages = stats['comp_stats']['mean']
+        team_means = person_averages.groupby(level='Competentie', sort=False, observed=True).mean()
+        team_averages = {competentie: round(avg, 2) for competentie, avg in team_means.items()}
+        
+        combine_klantgerichtheid(team_averages)
+        return team_averages
+    
+    def calculate_all_scores(self, feedback_data: pd.DataFrame) -> Tuple[Mapping, Dict[str, float]]:
+        """
+        Berekent scores voor alle personen en de team gemiddelden in één keer
+        
+        Args:
+            feedback_data (pd.DataFrame): Alle feedback data in long format
             
-            if person_averages:
-                team_avg = np.mean(person_averages)
-                team_averages[competentie] = round(team_avg, 2)
+        Returns:
+            Tuple[Mapping, Dict[str, float]]: (scores per persoon, team gemiddelden)
+        """
+        with self.timings.stage('group_statistics', rows_in=len(feedback_data)) as stage:
+            stats = self._group_statistics(feedback_data)
+            stage.rows_out = len(stats['comp_stats'])
+        with self.timings.stage('person_scores', rows_in=len(stats['comp_stats'])) as stage:
+            persons_data = self._build_person_scores(stats)
+            stage.rows_out = len(persons_data)
+        with self.timings.stage('team_averages', rows_in=len(stats['comp_stats'])) as stage:
+            team_averages = self._build_team_averages(stats)
+            stage.rows_out = len(team_averages)
         
-        # Combineer KLANTGERICHTHEID sub-competenties
-        klant_keys = [k for k in team_averages.keys() if 'KLANTGERICHTHEID' in k]
-        if len(klant_keys) > 1:
-            klant_scores = [team_averages[k] for k in klant_keys]
-            combined_score = round(np.mean(klant_scores), 2)
+        logger.info(f"Scores berekend voor {len(persons_data)} personen en {len(team_averages)} competenties")
+        return persons_data, team_averages
+    
+    def calculate_competency_scores(self, feedback_data: pd.DataFrame, person_name: str) -> Dict[str, Any]:
+        """
+        Berekent gemiddelde scores per competentie voor een persoon
+        
+        Args:
+            feedback_data (pd.DataFrame): Feedback data in long format
+            person_name (str): Naam van persoon om scores voor te berekenen
             
-            for k in klant_keys:
-                del team_averages[k]
+        Returns:
+            Dict[str, Any]: Dictionary met scores en statistieken
+        """
+        # Filter data voor specifieke persoon
+        person_data = feedback_data[feedback_data['Persoon'] == person_name]
+        
+        if person_data.empty:
+            raise DataProcessingError(f"Geen data gevonden voor persoon: {person_name}")
+        
+        return self._build_person_scores(self._group_statistics(person_data))[person_name]
+    
+    def calculate_team_averages(self, feedback_data: pd.DataFrame) -> Dict[str, float]:
+        """
+        Berekent team gemiddelden per competentie
+        
+        Args:
+            feedback_data (pd.DataFrame): Alle feedback data in long format
             
-            team_averages['KLANTGERICHTHEID'] = combined_score
+        Returns:
+            Dict[str, float]: Team gemiddelden per competentie
+        """
+        team_averages = self._build_team_averages(self._group_statistics(feedback_data))
         
         logger.info(f"Team gemiddelden berekend voor {len(team_averages)} competenties")
         return team_averages
@@ -419,62 +1127,523 @@ class ExcelProcessor:
         Returns:
             Dict[str, Any]: Volledig verwerkte data
         """
+        self._start_run()
         try:
             # Stap 1: Lees Excel bestand
-            df = self.read_excel_file(file_path)
+            with self.timings.stage('read') as stage:
+                df = self.read_excel_file(file_path)
+                stage.rows_out = len(df)
             
             # Stap 2: Valideer structuur
-            is_valid, errors = self.validate_excel_structure(df)
+            is_valid, errors = self.validate_excel_structure(df, header=self.source_header)
             if not is_valid:
                 raise DataProcessingError(f"Validatie fouten: {'; '.join(errors)}")
             
-            # Stap 3: Converteer van wide naar long format
-            long_df = self.convert_wide_to_long(df)
+            # Stap 3: Converteer van wide naar long format met de gedetecteerde kolommen
+            long_df = self.convert_wide_to_long(df, self.competency_columns)
+            
+            # Stap 4 t/m 6: Bereken scores en compileer resultaat
+            return self._compile_result(long_df, len(df))
+        
+        except Exception as e:
+            logger.error(f"Fout bij verwerken Excel bestand: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'validation_errors': self.validation_errors
+            }
+
+    def _compile_result(self, long_df: pd.DataFrame, total_rows: int) -> Dict[str, Any]:
+        """
+        Berekent alle scores uit long format data en stelt het resultaat samen
+        
+        Args:
+            long_df (pd.DataFrame): Feedback data in long format
+            total_rows (int): Aantal verwerkte wide rijen
+            
+        Returns:
+            Dict[str, Any]: Volledig verwerkte data
+        """
+        # Bereken team gemiddelden en individuele scores in één pass
+        all_scores, team_averages = self.calculate_all_scores(long_df)
+        available_persons = self.get_available_persons(long_df)
+        persons_data = all_scores.select(available_persons)
+        self._report_unknown_answers()
+        
+        # Compileer resultaat
+        result = {
+            'success': True,
+            'persons': persons_data,
+            'team_averages': team_averages,
+            'available_persons': available_persons,
+            'total_responses': len(long_df),
+            'competencies': list(team_averages.keys()),
+            # Sleutels van de verwerkte rijen, voor het later toevoegen van nieuwe rijen
+            'row_keys': self.row_keys.tolist(),
+            'processing_summary': {
+                'total_rows_processed': total_rows,
+                'total_feedback_entries': len(long_df),
+                'persons_found': len(available_persons),
+                'competencies_found': len(team_averages),
+                'validation_errors': self.validation_errors,
+                'competency_categories': list(self.competency_categories.keys()),
+                **self._scale_summary(),
+                # Tijd, rijen in/uit en geheugen per verwerkingsstap
+                'stages': self.timings.to_dict()
+            }
+        }
+        
+        logger.info(f"Excel verwerking succesvol: {len(available_persons)} personen, {len(team_averages)} competenties")
+        logger.info(f"Verwerkingstijden: {self.timings.describe()}")
+        return result
+    
+    def _report_unknown_answers(self) -> None:
+        """Meldt antwoorden die de schaal niet kent (met aantallen) in validation_errors"""
+        if self.unknown_answers:
+            message = format_unknown_answers(self.scale, self.unknown_answers)
+            logger.warning(message)
+            self.validation_errors = self.validation_errors + [message]
+    
+    def _scale_summary(self) -> Dict[str, Any]:
+        """Gebruikte schaal (met hoogste score), schema en onbekende antwoorden voor processing_summary"""
+        return {
+            'schema': {
+                'fingerprint': self.schema.fingerprint if self.schema is not None else None,
+                'from_cache': self.schema_from_cache
+            },
+            'score_scale': self.scale.name if self.scale is not None else None,
+            # Maximum van de chart as
+            'score_max': self.scale.max_score if self.scale is not None else None,
+            'unknown_answers': dict(self.unknown_answers.most_common(UNKNOWN_ANSWERS_LIMIT))
+        }
+    
+    def iter_xlsx_chunks(self, file_path: str, chunk_size: int = STREAMING_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Leest een .xlsx bestand rij voor rij in read-only modus en levert chunks op
+        
+        Het openpyxl object model wordt niet volledig opgebouwd, zodat het
+        geheugengebruik begrensd blijft door de chunk grootte.
+        
+        Args:
+            file_path (str): Pad naar .xlsx bestand
+            chunk_size (int): Aantal rijen per chunk
             
-            # Stap 4: Bereken team gemiddelden
-            team_averages = self.calculate_team_averages(long_df)
+        Yields:
+            pd.DataFrame: Wide format chunk zonder volledig lege rijen
             
-            # Stap 5: Bereken individuele scores
-            available_persons = self.get_available_persons(long_df)
-            persons_data = {}
+        Raises:
+            DataProcessingError: Bij fouten in bestand lezen
+        """
+        from openpyxl import load_workbook
+        
+        try:
+            with self.timings.stage('read'):
+                workbook = load_workbook(file_path, read_only=True, data_only=True)
+        except FileNotFoundError:
+            raise DataProcessingError(f"Bestand niet gevonden: {file_path}")
+        except Exception as e:
+            raise DataProcessingError(f"Fout bij lezen Excel bestand: {str(e)}")
+        
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                raise DataProcessingError("Excel bestand bevat geen data")
             
-            for person in available_persons:
-                try:
-                    person_scores = self.calculate_competency_scores(long_df, person)
-                    persons_data[person] = person_scores
-                except Exception as e:
-                    logger.warning(f"Fout bij verwerken data voor {person}: {str(e)}")
-                    continue
-            
-            # Stap 6: Compileer resultaat
-            result = {
+            columns = _unique_column_names(header)
+            
+            while True:
+                # Alleen het lezen telt mee, niet de verwerking van de vorige chunk
+                with self.timings.stage('read') as stage:
+                    chunk_rows = list(islice(rows, chunk_size))
+                    chunk = pd.DataFrame(chunk_rows, columns=columns).dropna(how='all')
+                    stage.rows_out = len(chunk)
+                if not chunk_rows:
+                    break
+                yield chunk
+        finally:
+            workbook.close()
+    
+    def process_excel_file_streaming(self, file_path: str, chunk_size: int = STREAMING_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Verwerkt een groot .xlsx bestand in chunks zonder de volledige wide data te laden
+        
+        Structuur en competentie kolommen worden bepaald op de eerste chunk;
+        elke chunk wordt direct naar compact long format omgezet.
+        
+        Args:
+            file_path (str): Pad naar .xlsx bestand
+            chunk_size (int): Aantal rijen per chunk
+            
+        Returns:
+            Dict[str, Any]: Volledig verwerkte data, zelfde vorm als process_excel_file
+        """
+        self._start_run()
+        try:
+            long_frames = []
+            response_frames = []
+            key_frames = []
+            total_rows = 0
+            competency_columns = None
+            
+            for chunk in self.iter_xlsx_chunks(file_path, chunk_size):
+                if competency_columns is None:
+                    # Valideer structuur en bepaal competenties op de eerste chunk
+                    is_valid, errors = self.validate_excel_structure(chunk)
+                    if not is_valid:
+                        raise DataProcessingError(f"Validatie fouten: {'; '.join(errors)}")
+                    competency_columns = list(self.competency_columns)
+                
+                long_frames.append(self.convert_wide_to_long(chunk, competency_columns, row_offset=total_rows))
+                response_frames.append(self.responses)
+                key_frames.append(self.row_keys)
+                total_rows += len(chunk)
+            
+            if competency_columns is None:
+                raise DataProcessingError("Excel bestand is leeg")
+            
+            logger.info(f"Excel bestand gestreamd: {total_rows} rijen in {len(long_frames)} chunks")
+            
+            with self.timings.stage('combine_chunks', rows_in=total_rows) as stage:
+                self.responses = concat_long_frames(response_frames, ignore_index=False)
+                self.row_keys = np.concatenate(key_frames)
+                long_df = concat_long_frames(long_frames)
+                
+                # Zelfde volgorde als één melt over het hele bestand: per kolom, dan per response
+                order = np.lexsort((long_df['Response_ID'].to_numpy(), long_df['Competentie_Raw'].cat.codes.to_numpy()))
+                long_df = long_df.take(order)
+                stage.rows_out = len(long_df)
+            
+            return self._compile_result(long_df, total_rows)
+            
+        except Exception as e:
+            logger.error(f"Fout bij verwerken Excel bestand: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'validation_errors': self.validation_errors
+            }
+    
+    def process_partial(self, file_path: str, source: str) -> Dict[str, Any]:
+        """
+        Leest, valideert en converteert één bestand van een batch, zonder scores te berekenen
+        
+        Args:
+            file_path (str): Pad naar Excel of CSV bestand
+            source (str): Naam van het bestand voor de herkomst
+            
+        Returns:
+            Dict[str, Any]: Bij succes de long format data, responses, rij sleutels,
+                categorieën, schaal en schema van het bestand; anders 'error'
+        """
+        self._start_run()
+        try:
+            with self.timings.stage('read') as stage:
+                df = self.read_excel_file(file_path)
+                stage.rows_out = len(df)
+            
+            is_valid, errors = self.validate_excel_structure(df, header=self.source_header)
+            if not is_valid:
+                raise DataProcessingError(f"Validatie fouten: {'; '.join(errors)}")
+            
+            long_df = self.convert_wide_to_long(df, self.competency_columns)
+            return {
                 'success': True,
-                'persons': persons_data,
+                'source': source,
+                'long_df': long_df,
+                'responses': self.responses,
+                'row_keys': self.row_keys,
+                'total_rows': len(df),
+                'competency_categories': self.competency_categories,
+                'score_scale': self.scale.name,
+                'unknown_answers': self.unknown_answers,
+                'validation_errors': self.validation_errors,
+                'schema': self.schema,
+                'schema_from_cache': self.schema_from_cache,
+                'stages': self.timings.to_dict()
+            }
+        
+        except Exception as e:
+            logger.error(f"Fout bij verwerken {source}: {str(e)}")
+            return {
+                'success': False,
+                'source': source,
+                'error': str(e),
+                'validation_errors': self.validation_errors
+            }
+    
+    def process_excel_files(self, files: List[Tuple[str, str]], executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Verwerkt meerdere bestanden (bijv. een export per afdeling) tot één dataset
+        
+        Elk bestand wordt los gelezen en naar long format omgezet, met een
+        executor (process pool) parallel; daarna worden de compacte long
+        frames samengevoegd en de scores één keer berekend. Een bestand met een
+        fout valt af en wordt in 'files' gemeld; de rest wordt gewoon verwerkt.
+        
+        Args:
+            files (List[Tuple[str, str]]): (pad, bestandsnaam) per bestand, in volgorde
+            executor (Optional[Executor]): Pool voor de bestanden, None voor na elkaar in dit proces
+            
+        Returns:
+            Dict[str, Any]: Zelfde vorm als process_excel_file, met per bestand de
+                herkomst in processing_summary['files']
+        """
+        self._start_run()
+        schemas = self.schema_cache.schemas(self.schema_context) if self.schema_cache is not None else []
+        arguments = (self.requested_scale, self.scales, schemas)
+        
+        with self.timings.stage('process_files', rows_in=len(files)) as stage:
+            if executor is None:
+                partials = [process_file_partial(path, source, *arguments) for path, source in files]
+            else:
+                futures = [executor.submit(process_file_partial, path, source, *arguments) for path, source in files]
+                partials = []
+                for future, (_, source) in zip(futures, files):
+                    try:
+                        partials.append(future.result())
+                    except Exception as e:
+                        # Bijvoorbeeld een worker die door het besturingssysteem gestopt is
+                        partials.append({'success': False, 'source': source, 'error': str(e) or type(e).__name__,
+                                         'validation_errors': []})
+            stage.rows_out = sum(partial.get('total_rows', 0) for partial in partials)
+        
+        try:
+            return self._combine_partials(partials)
+        except Exception as e:
+            logger.error(f"Fout bij samenvoegen van de bestanden: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'validation_errors': self.validation_errors,
+                'files': [self._file_summary(partial) for partial in partials]
+            }
+    
+    def _file_summary(self, partial: Dict[str, Any], used: bool = True, duplicate_rows: int = 0) -> Dict[str, Any]:
+        """Herkomst en resultaat van één bestand uit een batch"""
+        if not partial['success']:
+            return {
+                'file': partial['source'],
+                'success': False,
+                'error': partial['error'],
+                'validation_errors': partial['validation_errors']
+            }
+        long_df = partial['long_df']
+        return {
+            'file': partial['source'],
+            'success': used,
+            'error': None if used else f"Andere antwoordschaal ({partial['score_scale']}) dan de rest van de batch "
+                                       f"({self.scale.name if self.scale is not None else None})",
+            'rows': partial['total_rows'],
+            'duplicate_rows': duplicate_rows,
+            'feedback_entries': len(long_df),
+            'persons': int(long_df['Persoon'].nunique()),
+            'score_scale': partial['score_scale'],
+            'unknown_answers': sum(partial['unknown_answers'].values()),
+            'schema': {
+                'fingerprint': partial['schema'].fingerprint,
+                'from_cache': partial['schema_from_cache']
+            },
+            'seconds': round(sum(stage['seconds'] for stage in partial['stages'].values()), 4)
+        }
+    
+    def _combine_partials(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Voegt de gedeeltelijke resultaten van een batch samen en berekent de scores
+        
+        Alle bestanden moeten dezelfde schaal gebruiken: zonder gevraagde schaal
+        wint de schaal van de meeste bestanden (bij gelijkstand het eerste). Een
+        rij die al in een eerder bestand stond (zelfde Timestamp, beoordelaar en
+        collega) valt weg; dubbele rijen binnen één bestand blijven staan, net
+        als bij een upload van dat bestand alleen.
+        
+        Args:
+            partials (List[Dict[str, Any]]): Resultaten van process_partial, in volgorde
+            
+        Returns:
+            Dict[str, Any]: Volledig verwerkte data met processing_summary['files']
+        """
+        self.validation_errors = []
+        self.competency_categories = {}
+        succeeded = [partial for partial in partials if partial['success']]
+        if self.requested_scale is None and succeeded:
+            scale_name = Counter(partial['score_scale'] for partial in succeeded).most_common(1)[0][0]
+            self.scale = self.scales[scale_name]
+        used = [partial for partial in succeeded if partial['score_scale'] == self.scale.name]
+        
+        if not used:
+            self.validation_errors = [f"{partial['source']}: {partial['error']}" for partial in partials]
+            raise DataProcessingError("Geen enkel bestand kon verwerkt worden")
+        
+        with self.timings.stage('combine_files', rows_in=sum(partial['total_rows'] for partial in used)) as stage:
+            long_frames, response_frames, key_frames = [], [], []
+            offset = 0
+            for partial in used:
+                long_df = partial['long_df']
+                long_df['Response_ID'] = long_df['Response_ID'] + offset
+                long_frames.append(long_df)
+                responses = partial['responses']
+                response_frames.append(responses.set_axis(responses.index + offset))
+                key_frames.append(partial['row_keys'])
+                offset += partial['total_rows']
+                
+                for category, items in partial['competency_categories'].items():
+                    known = self.competency_categories.setdefault(category, [])
+                    columns = {item['column'] for item in known}
+                    known.extend(item for item in items if item['column'] not in columns)
+                self.unknown_answers.update(partial['unknown_answers'])
+                if self.schema_cache is not None and not partial['schema_from_cache']:
+                    self.schema_cache.put(partial['schema'])
+            
+            self.column_categories = {item['column']: category for category, items in
+                                      self.competency_categories.items() for item in items}
+            self.responses = concat_long_frames(response_frames, ignore_index=False)
+            row_keys = np.concatenate(key_frames)
+            long_df = concat_long_frames(long_frames)
+            
+            # Dezelfde response in meerdere bestanden telt één keer (uit het eerste bestand)
+            file_index = np.repeat(np.arange(len(used)), [partial['total_rows'] for partial in used])
+            first_file = pd.Series(file_index).groupby(row_keys).transform('min').to_numpy()
+            duplicate = file_index > first_file
+            if duplicate.any():
+                duplicate_ids = np.flatnonzero(duplicate)
+                long_df = long_df[~long_df['Response_ID'].isin(duplicate_ids)]
+                self.responses = self.responses.drop(index=duplicate_ids)
+            self.row_keys = row_keys[~duplicate]
+            
+            # Zelfde volgorde als één bestand met alle rijen: per kolom, dan per response
+            order = np.lexsort((long_df['Response_ID'].to_numpy(), long_df['Competentie_Raw'].cat.codes.to_numpy()))
+            long_df = long_df.take(order)
+            stage.rows_out = len(long_df)
+        
+        files = []
+        boundaries = np.cumsum([0] + [partial['total_rows'] for partial in used])
+        duplicates = {id(partial): int(duplicate[start:end].sum())
+                      for partial, start, end in zip(used, boundaries[:-1], boundaries[1:])}
+        for partial in partials:
+            is_used = id(partial) in duplicates
+            files.append(self._file_summary(partial, is_used, duplicates.get(id(partial), 0)))
+            if not is_used:
+                self.validation_errors.append(f"{files[-1]['file']}: {files[-1]['error']}")
+        
+        logger.info(f"Batch samengevoegd: {len(used)} van {len(partials)} bestanden, "
+                    f"{int(duplicate.sum())} dubbele rijen")
+        result = self._compile_result(long_df, len(self.row_keys))
+        result['processing_summary']['files'] = files
+        return result
+    
+    def append_excel_file(self, file_path: str, aggregates) -> Dict[str, Any]:
+        """
+        Voegt alleen de nieuwe rijen van een (cumulatief) Excel bestand toe aan een dataset
+        
+        Rijen worden herkend op Timestamp + Beoordelaar + Persoon; rijen die al
+        verwerkt zijn worden overgeslagen. Alleen de statistieken van personen
+        met nieuwe feedback worden opnieuw samengesteld.
+        
+        Args:
+            file_path (str): Pad naar Excel bestand
+            aggregates (FeedbackAggregates): Statistieken van de dataset, worden bijgewerkt
+            
+        Returns:
+            Dict[str, Any]: Bijgewerkte personen (KLANTGERICHTHEID nog per sub-competentie,
+                zie score_store.merge_persons), team gemiddelden en samenvatting
+        """
+        self._start_run()
+        try:
+            with self.timings.stage('read') as stage:
+                df = self.read_excel_file(file_path)
+                stage.rows_out = len(df)
+            
+            is_valid, errors = self.validate_excel_structure(df, header=self.source_header)
+            if not is_valid:
+                raise DataProcessingError(f"Validatie fouten: {'; '.join(errors)}")
+            
+            # Alleen rijen die nog niet verwerkt zijn
+            with self.timings.stage('deduplicate', rows_in=len(df)) as stage:
+                keys = response_row_keys(df)
+                is_new = np.fromiter((int(key) not in aggregates.row_keys for key in keys), dtype=bool, count=len(keys))
+                new_rows = df[is_new]
+                stage.rows_out = len(new_rows)
+            
+            updated_persons = set()
+            if len(new_rows):
+                long_df = self.convert_wide_to_long(new_rows, self.competency_columns, row_offset=aggregates.total_rows)
+                with self.timings.stage('merge_statistics', rows_in=len(long_df)) as stage:
+                    updated_persons = aggregates.add_long_frame(long_df)
+                    stage.rows_out = len(updated_persons)
+                aggregates.row_keys.update(int(key) for key in keys[is_new])
+                aggregates.total_rows += len(new_rows)
+                aggregates.competency_categories = list(dict.fromkeys(
+                    aggregates.competency_categories + list(self.competency_categories.keys())
+                ))
+            
+            with self.timings.stage('team_averages') as stage:
+                team_averages = aggregates.team_averages()
+                available_persons = aggregates.available_persons()
+                stage.rows_out = len(team_averages)
+            
+            with self.timings.stage('person_scores', rows_in=len(updated_persons)) as stage:
+                persons_data = {person: aggregates.build_person(person) for person in sorted(updated_persons)}
+                stage.rows_out = len(persons_data)
+            
+            self._report_unknown_answers()
+            logger.info(f"Excel bestand toegevoegd: {len(new_rows)} nieuwe rijen, "
+                        f"{len(updated_persons)} personen bijgewerkt")
+            logger.info(f"Verwerkingstijden: {self.timings.describe()}")
+            return {
+                'success': True,
+                'updated_persons': persons_data,
                 'team_averages': team_averages,
                 'available_persons': available_persons,
-                'total_responses': len(long_df),
                 'competencies': list(team_averages.keys()),
                 'processing_summary': {
-                    'total_rows_processed': len(df),
-                    'total_feedback_entries': len(long_df),
+                    'total_rows_processed': aggregates.total_rows,
+                    'total_feedback_entries': aggregates.total_entries,
                     'persons_found': len(available_persons),
                     'competencies_found': len(team_averages),
                     'validation_errors': self.validation_errors,
-                    'competency_categories': list(self.competency_categories.keys())
+                    'competency_categories': aggregates.competency_categories,
+                    **self._scale_summary(),
+                    'stages': self.timings.to_dict()
+                },
+                'append_summary': {
+                    'rows_in_file': len(df),
+                    'new_rows': len(new_rows),
+                    'duplicate_rows': len(df) - len(new_rows),
+                    'updated_persons': len(updated_persons)
                 }
             }
-            
-            logger.info(f"Excel verwerking succesvol: {len(available_persons)} personen, {len(team_averages)} competenties")
-            return result
-            
+        
         except Exception as e:
-            logger.error(f"Fout bij verwerken Excel bestand: {str(e)}")
+            logger.error(f"Fout bij toevoegen Excel bestand: {str(e)}")
             return {
                 'success': False,
                 'error': str(e),
                 'validation_errors': self.validation_errors
             }
 
+def process_file_partial(file_path: str, source: str, scale: Optional[ScoreScale] = None,
+                         scales: Optional[Dict[str, ScoreScale]] = None,
+                         schemas: Iterable[FormSchema] = ()) -> Dict[str, Any]:
+    """
+    Verwerkt één bestand van een batch tot long format; draait in een worker proces
+    
+    Args:
+        file_path (str): Pad naar het bestand
+        source (str): Naam van het bestand voor de herkomst
+        scale (Optional[ScoreScale]): Gevraagde schaal, None voor automatisch herkennen
+        scales (Optional[Dict[str, ScoreScale]]): Beschikbare schalen
+        schemas (Iterable[FormSchema]): Bekende schema's uit de cache van de server
+        
+    Returns:
+        Dict[str, Any]: Gedeeltelijk resultaat (zie ExcelProcessor.process_partial)
+    """
+    schema_cache = SchemaCache()
+    for schema in schemas:
+        schema_cache.put(schema)
+    processor = ExcelProcessor(scale=scale, scales=scales, schema_cache=schema_cache)
+    return processor.process_partial(file_path, source)
+
 def create_sample_excel_structure() -> pd.DataFrame:
     """
     Creëert een voorbeeld Excel structuur voor testing
@@ -527,6 +1696,37 @@ def validate_excel_file(file_path: str) -> Tuple[bool, List[str]]:
     except Exception as e:
         return False, [str(e)]
 
+def inspect_excel_file(file_path: str, scale: Optional[str] = None,
+                       scales: Optional[Mapping[str, ScoreScale]] = None,
+                       schema_cache: Optional[SchemaCache] = None) -> Dict[str, Any]:
+    """
+    Convenience functie voor snelle validatie op header en steekproef
+    
+    Args:
+        file_path (str): Pad naar Excel bestand
+        scale (Optional[str]): Naam van de schaal, None voor automatisch herkennen
+        scales (Optional[Mapping[str, ScoreScale]]): Beschikbare schalen
+        schema_cache (Optional[SchemaCache]): Cache van formulier schema's (alleen lezen)
+        
+    Returns:
+        Dict[str, Any]: Validatie resultaat met schema, categorieën en rij schatting
+    """
+    try:
+        processor = ExcelProcessor(scale=scale, scales=scales, schema_cache=schema_cache)
+        return processor.inspect_file(file_path)
+    except Exception as e:
+        return {
+            'valid': False,
+            'errors': [str(e)],
+            'schema': {},
+            'competency_categories': {},
+            'estimated_rows': None,
+            'schema_fingerprint': None,
+            'schema_from_cache': False,
+            'score_scale': None,
+            'unknown_answers': {}
+        }
+
 if __name__ == "__main__":
     # Test de module met sample data
     print("🧪 Testing Data Processor Module v2.0...")
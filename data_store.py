@@ -0,0 +1,575 @@
+"""
+Data Store Module voor RadarChart Feedback Analyse
+
+Bewaart verwerkte datasets als compacte lokale snapshot, zodat de server na
+een herstart direct weer scores kan serveren zonder nieuwe upload. Per
+dataset is er een kleine JSON index (team gemiddelden, samenvatting en de
+indeling van de arrays) en een bestand met de arrays van de compacte
+PersonScoreStore, dat bij het laden via mmap gekoppeld wordt. Details per
+persoon blijven lazy: ze worden pas bij opvragen uit de arrays berekend,
+ook na het opnieuw laden. Alle data blijft lokaal op de eigen computer.
+
+Een dataset is een onveranderlijke DatasetSnapshot die volledig opgebouwd
+wordt voordat hij zichtbaar is. De registry publiceert nieuwe toestand met
+een enkele referentie toewijzing, zodat lezers nooit hoeven te locken en
+nooit een half opgebouwde dataset zien.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import itertools
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from aggregates import FeedbackAggregates
+from score_store import PersonScoreStore
+
+logger = logging.getLogger(__name__)
+
+# Aantal snapshots dat bewaard blijft, oudere worden opgeruimd
+DEFAULT_KEEP_SNAPSHOTS = 5
+
+# Standaard geheugenbudget voor datasets in de registry
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+# Maximale grootte van de geserialiseerde responses per dataset
+DEFAULT_PAYLOAD_CACHE_BYTES = 32 * 1024 * 1024
+
+INDEX_FILE = 'index.json'
+
+# Uitlijning van de arrays in het arrays bestand, zodat ze zonder kopie gemapt worden
+ARRAY_ALIGNMENT = 8
+
+def new_dataset_id() -> str:
+    """Genereert een nieuw, kort dataset id"""
+    return uuid.uuid4().hex[:12]
+
+class PayloadCache:
+    """
+    Begrensde LRU cache van de geserialiseerde responses van één dataset
+    
+    De cache groeit na publicatie van de dataset; de DatasetRegistry telt
+    de actuele grootte mee in zijn geheugenbudget.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_PAYLOAD_CACHE_BYTES):
+        """
+        Args:
+            max_bytes (int): Maximale totale grootte van de responses in bytes
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        # sleutel -> bytes, minst recent gebruikt eerst
+        self._items = OrderedDict()
+    
+    def get(self, key: Tuple[str, ...], serialize: Callable[[], bytes]) -> bytes:
+        """
+        Geeft de response voor key; bij een miss opgebouwd en bewaard binnen de grens
+        
+        Args:
+            key (Tuple[str, ...]): Sleutel van de response
+            serialize (Callable[[], bytes]): Bouwt de bytes op bij een miss
+            
+        Returns:
+            bytes: Geserialiseerde response
+        """
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+                return body
+        
+        # Buiten de lock: gelijktijdige eerste requests serialiseren hooguit dubbel, het resultaat is gelijk
+        body = serialize()
+        if len(body) > self.max_bytes:
+            return body
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = body
+                self.nbytes += len(body)
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._items.popitem(last=False)
+                    self.nbytes -= len(evicted)
+        return body
+    
+    def __len__(self) -> int:
+        return len(self._items)
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Onveranderlijke, volledig opgebouwde verwerkte dataset"""
+    dataset_id: str
+    persons: Mapping  # persoon -> {"scores", "details", "total_responses"}
+    team_averages: Dict[str, float]
+    upload_timestamp: str
+    processing_summary: Dict[str, Any]
+    available_persons: Tuple[str, ...]
+    # Sleutels (uint64) van de verwerkte rijen, voor het toevoegen van nieuwe rijen
+    row_keys: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    # Samenvoegbare statistieken (FeedbackAggregates) na een append, anders None
+    aggregates: Any = field(default=None, repr=False, compare=False)
+    # Geserialiseerde responses, per dataset opgebouwd en begrensd (zie PayloadCache)
+    payloads: PayloadCache = field(default_factory=PayloadCache, repr=False, compare=False)
+    
+    @classmethod
+    def build(cls, dataset_id: str, persons: Mapping, team_averages: Dict[str, float],
+              upload_timestamp: str, processing_summary: Dict[str, Any],
+              available_persons: List[str], row_keys: Optional[Any] = None,
+              aggregates: Any = None) -> 'DatasetSnapshot':
+        """
+        Maakt een snapshot; een gewone dict met personen wordt alleen-lezen verpakt
+        
+        Returns:
+            DatasetSnapshot: Snapshot die na publicatie niet meer verandert
+        """
+        if isinstance(persons, dict):
+            persons = MappingProxyType(persons)
+        if row_keys is not None:
+            row_keys = np.asarray(row_keys, dtype=np.uint64)
+        return cls(dataset_id, persons, team_averages, upload_timestamp,
+                   processing_summary, tuple(available_persons), row_keys, aggregates)
+    
+    def etag(self, *parts: str) -> str:
+        """
+        Sterke ETag voor een response uit deze dataset
+        
+        Args:
+            *parts (str): Onderdelen die de response identificeren (endpoint, persoon)
+            
+        Returns:
+            str: ETag waarde (zonder aanhalingstekens)
+        """
+        digest = hashlib.sha1('\x00'.join((self.dataset_id, self.upload_timestamp) + parts).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def payload(self, key: Tuple[str, ...], serialize: Callable[[], bytes]) -> bytes:
+        """
+        Geeft de geserialiseerde response voor key; wordt alleen bij een miss opgebouwd
+        
+        Args:
+            key (Tuple[str, ...]): Sleutel van de response
+            serialize (Callable[[], bytes]): Bouwt de bytes op bij een miss
+            
+        Returns:
+            bytes: Geserialiseerde response
+        """
+        return self.payloads.get(key, serialize)
+
+def estimate_memory(obj: Any) -> int:
+    """
+    Schat het geheugengebruik van geneste dicts en lijsten met Python objecten
+    
+    Args:
+        obj (Any): Object om te schatten
+        
+    Returns:
+        int: Geschatte grootte in bytes
+    """
+    if isinstance(obj, DatasetSnapshot):
+        return sys.getsizeof(obj) + sum(estimate_memory(getattr(obj, f.name)) for f in fields(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, PersonScoreStore):
+        # Gemapte arrays tellen mee met hun grootte op schijf
+        return sys.getsizeof(obj) + obj.nbytes() + estimate_memory(obj.names) + estimate_memory(obj.overrides)
+    if isinstance(obj, FeedbackAggregates):
+        # Statistieken van een append, met alle ruwe scores
+        return obj.nbytes()
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(estimate_memory(key) + estimate_memory(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_memory(item) for item in obj)
+    return size
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Schrijft eerst naar een tijdelijk bestand zodat een half geschreven snapshot nooit zichtbaar is"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _pack_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[bytes, Dict[str, Dict[str, Any]]]:
+    """
+    Zet arrays achter elkaar in één buffer, elk op een veelvoud van ARRAY_ALIGNMENT
+    
+    Returns:
+        Tuple[bytes, Dict[str, Dict[str, Any]]]: (buffer, dtype, vorm en positie per array)
+    """
+    chunks = []
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        padding = -position % ARRAY_ALIGNMENT
+        chunks.append(b'\x00' * padding)
+        position += padding
+        data = np.ascontiguousarray(array).tobytes()
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': position}
+        chunks.append(data)
+        position += len(data)
+    return b''.join(chunks), layout
+
+def _map_arrays(path: str, layout: Dict[str, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Koppelt de arrays uit _pack_arrays alleen-lezen via mmap; er wordt nog niets gelezen
+    
+    Args:
+        path (str): Pad naar het arrays bestand
+        layout (Dict[str, Dict[str, Any]]): Indeling uit _pack_arrays
+        
+    Returns:
+        Dict[str, np.ndarray]: Arrays op naam
+    """
+    buffer = b''
+    if os.path.getsize(path):
+        # De map blijft open zolang een array ernaar verwijst
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {}
+    for name, entry in layout.items():
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(entry['shape'], dtype=dtype)
+        else:
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=entry['offset'])
+            arrays[name] = array.reshape(entry['shape'])
+    return arrays
+
+class SnapshotStore:
+    """Persistente opslag van verwerkte datasets in een lokale map"""
+    
+    def __init__(self, snapshot_dir: str, keep: int = DEFAULT_KEEP_SNAPSHOTS):
+        """
+        Args:
+            snapshot_dir (str): Map voor de snapshots
+            keep (int): Aantal snapshots dat bewaard blijft
+        """
+        self.snapshot_dir = snapshot_dir
+        self.keep = keep
+        self._lock = threading.Lock()
+        os.makedirs(snapshot_dir, exist_ok=True)
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.snapshot_dir, name)
+    
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self._path(INDEX_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'datasets': []}
+        except ValueError as e:
+            logger.warning(f"Snapshot index onleesbaar, wordt genegeerd: {str(e)}")
+            return {'datasets': []}
+    
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Retourneert de bewaarde datasets, oudste eerst"""
+        return self._read_index()['datasets']
+    
+    def latest_id(self) -> Optional[str]:
+        """Retourneert het id van de meest recente snapshot"""
+        datasets = self.list_datasets()
+        return datasets[-1]['id'] if datasets else None
+    
+    def save(self, dataset: DatasetSnapshot) -> None:
+        """
+        Schrijft een verwerkte dataset weg als snapshot
+        
+        Args:
+            dataset (DatasetSnapshot): Dataset om op te slaan
+        """
+        dataset_id = dataset.dataset_id
+        persons = dataset.persons
+        if not isinstance(persons, PersonScoreStore):
+            raise ValueError(f"Snapshot vereist een PersonScoreStore, niet {type(persons).__name__}")
+        
+        # Arrays van de store achter elkaar; details worden niet berekend en niet opgeslagen
+        data, layout = _pack_arrays(persons.arrays())
+        meta = {
+            'id': dataset_id,
+            'upload_timestamp': dataset.upload_timestamp,
+            'team_averages': dataset.team_averages,
+            'processing_summary': dataset.processing_summary,
+            'available_persons': dataset.available_persons,
+            'store': persons.metadata(),
+            'arrays': layout
+        }
+        
+        with self._lock:
+            _write_atomic(self._path(f"{dataset_id}.arrays"), data)
+            if dataset.row_keys is not None:
+                _write_atomic(self._path(f"{dataset_id}.keys"), dataset.row_keys.tobytes())
+            _write_atomic(self._path(f"{dataset_id}.json"), json.dumps(meta).encode('utf-8'))
+            
+            index = self._read_index()
+            index['datasets'] = [d for d in index['datasets'] if d['id'] != dataset_id]
+            index['datasets'].append({
+                'id': dataset_id,
+                'upload_timestamp': dataset.upload_timestamp,
+                'persons_count': len(persons)
+            })
+            
+            # Ruim de oudste snapshots op
+            removed, index['datasets'] = index['datasets'][:-self.keep], index['datasets'][-self.keep:]
+            _write_atomic(self._path(INDEX_FILE), json.dumps(index, indent=2).encode('utf-8'))
+            for entry in removed:
+                self._remove_files(entry['id'])
+        
+        logger.info(f"Snapshot opgeslagen: {dataset_id} ({len(persons)} personen, {len(data)} bytes)")
+    
+    def _remove_files(self, dataset_id: str) -> None:
+        # .records is het per persoon formaat van oudere snapshots
+        for name in (f"{dataset_id}.arrays", f"{dataset_id}.records", f"{dataset_id}.keys", f"{dataset_id}.json"):
+            try:
+                os.unlink(self._path(name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Bijvoorbeeld nog geopend via mmap op Windows; het bestand blijft dan staan
+                logger.warning(f"Kon snapshot bestand {name} niet verwijderen: {str(e)}")
+    
+    def load(self, dataset_id: str) -> DatasetSnapshot:
+        """
+        Laadt een snapshot; de arrays worden gemapt en pas bij gebruik gelezen
+        
+        Args:
+            dataset_id (str): Id van de dataset
+            
+        Returns:
+            DatasetSnapshot: Geladen dataset
+            
+        Raises:
+            ValueError: Bij een snapshot in het oude formaat (JSON per persoon)
+        """
+        with open(self._path(f"{dataset_id}.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if 'store' not in meta:
+            raise ValueError(f"Snapshot {dataset_id} heeft een oud formaat; upload het bestand opnieuw")
+        
+        arrays = _map_arrays(self._path(f"{dataset_id}.arrays"), meta['arrays'])
+        persons = PersonScoreStore.from_arrays(meta['store'], arrays)
+        keys_path = self._path(f"{dataset_id}.keys")
+        row_keys = np.fromfile(keys_path, dtype=np.uint64) if os.path.exists(keys_path) else None
+        return DatasetSnapshot.build(
+            dataset_id=dataset_id,
+            persons=persons,
+            team_averages=meta['team_averages'],
+            upload_timestamp=meta['upload_timestamp'],
+            processing_summary=meta['processing_summary'],
+            available_persons=meta['available_persons'],
+            row_keys=row_keys
+        )
+
+class DatasetRegistry:
+    """
+    Houdt meerdere verwerkte datasets in geheugen binnen een geheugenbudget
+    
+    Lezers gebruiken geen lock: de toestand (datasets, groottes, nieuwste id)
+    is een tuple die nooit aangepast wordt. Schrijvers bouwen onder een lock
+    een nieuwe toestand op en publiceren die met een enkele toewijzing.
+    """
+    
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, snapshot_store: Optional[SnapshotStore] = None):
+        """
+        Args:
+            memory_budget (int): Maximaal geschat geheugengebruik van alle datasets in bytes
+            snapshot_store (Optional[SnapshotStore]): Opslag om verwijderde datasets
+                opnieuw uit te laden, None als datasets alleen in geheugen bestaan
+        """
+        self.memory_budget = memory_budget
+        self.snapshot_store = snapshot_store
+        self.evictions = 0
+        self._write_lock = threading.Lock()
+        # (dataset id -> DatasetSnapshot, dataset id -> geschatte grootte, nieuwste id)
+        self._state = ({}, {}, snapshot_store.latest_id() if snapshot_store else None)
+        # Laatste gebruik per dataset voor LRU; next() op een teller is atomair
+        self._clock = itertools.count()
+        self._last_used = {}
+    
+    @property
+    def latest_id(self) -> Optional[str]:
+        return self._state[2]
+    
+    def add(self, dataset: DatasetSnapshot) -> None:
+        """
+        Publiceert een volledig opgebouwde dataset als nieuwste en handhaaft het budget
+        
+        Args:
+            dataset (DatasetSnapshot): Dataset om te publiceren
+        """
+        self._publish(dataset, make_latest=True)
+    
+    def _publish(self, dataset: DatasetSnapshot, make_latest: bool) -> None:
+        size = estimate_memory(dataset)
+        with self._write_lock:
+            datasets, sizes, latest_id = self._state
+            datasets = dict(datasets)
+            sizes = dict(sizes)
+            datasets[dataset.dataset_id] = dataset
+            sizes[dataset.dataset_id] = size
+            self._last_used[dataset.dataset_id] = next(self._clock)
+            if make_latest:
+                latest_id = dataset.dataset_id
+            self._evict(datasets, sizes, keep=dataset.dataset_id)
+            # Enige plek waar de zichtbare toestand verandert
+            self._state = (datasets, sizes, latest_id)
+    
+    @staticmethod
+    def _memory_bytes(datasets: Dict[str, DatasetSnapshot], sizes: Dict[str, int]) -> int:
+        """Geschatte grootte van de datasets plus hun geserialiseerde responses van dit moment"""
+        return sum(sizes[dataset_id] + dataset.payloads.nbytes for dataset_id, dataset in datasets.items())
+    
+    def _evict(self, datasets: Dict[str, DatasetSnapshot], sizes: Dict[str, int], keep: str) -> None:
+        """Verwijdert minst recent gebruikte datasets uit de nieuwe toestand tot het budget gehaald wordt"""
+        candidates = sorted((d for d in datasets if d != keep), key=lambda d: self._last_used.get(d, -1))
+        for dataset_id in candidates:
+            if self._memory_bytes(datasets, sizes) <= self.memory_budget:
+                break
+            del datasets[dataset_id]
+            del sizes[dataset_id]
+            self._last_used.pop(dataset_id, None)
+            self.evictions += 1
+            logger.info(f"Dataset {dataset_id} uit geheugen verwijderd (geheugenbudget)")
+    
+    def get(self, dataset_id: Optional[str] = None) -> Optional[DatasetSnapshot]:
+        """
+        Haalt een dataset op (standaard de nieuwste) en markeert hem als recent gebruikt
+        
+        Een dataset die uit geheugen verwijderd is wordt zo nodig uit zijn
+        snapshot opnieuw geladen.
+        
+        Args:
+            dataset_id (Optional[str]): Id van de dataset, None voor de nieuwste
+            
+        Returns:
+            Optional[DatasetSnapshot]: Dataset, of None als die niet (meer) bestaat
+        """
+        datasets, _, latest_id = self._state
+        dataset_id = dataset_id or latest_id
+        if dataset_id is None:
+            return None
+        
+        dataset = datasets.get(dataset_id)
+        if dataset is not None:
+            self._last_used[dataset_id] = next(self._clock)
+            return dataset
+        
+        if self.snapshot_store is None:
+            return None
+        try:
+            dataset = self.snapshot_store.load(dataset_id)
+        except (OSError, ValueError):
+            return None
+        self._publish(dataset, make_latest=False)
+        return dataset
+    
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Retourneert alle bekende datasets met hun status, oudste eerst"""
+        datasets, sizes, _ = self._state
+        in_memory = {
+            dataset_id: {
+                'id': dataset_id,
+                'upload_timestamp': dataset.upload_timestamp,
+                'persons_count': len(dataset.persons),
+                'in_memory': True,
+                'size_bytes': sizes[dataset_id] + dataset.payloads.nbytes
+            }
+            for dataset_id, dataset in datasets.items()
+        }
+        
+        result = []
+        if self.snapshot_store is not None:
+            for dataset in self.snapshot_store.list_datasets():
+                result.append(in_memory.pop(dataset['id'], dict(dataset, in_memory=False, size_bytes=0)))
+        result.extend(in_memory.values())
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retourneert geheugengebruik en evictions van de registry"""
+        datasets, sizes, latest_id = self._state
+        return {
+            'datasets_in_memory': len(datasets),
+            'memory_bytes': self._memory_bytes(datasets, sizes),
+            'payload_bytes': sum(dataset.payloads.nbytes for dataset in datasets.values()),
+            'memory_budget': self.memory_budget,
+            'evictions': self.evictions,
+            'latest_id': latest_id
+        }
+
+class MemoryBudget:
+    """
+    Geheugenbudget voor verwerkingen die tegelijk lopen (admission control)
+    
+    Een verwerking reserveert vooraf zijn geschatte geheugengebruik en geeft
+    dat na afloop terug. Past een reservering niet naast de lopende
+    verwerkingen, dan wordt hij geweigerd in plaats van het proces te laten
+    groeien tot het door het besturingssysteem gestopt wordt.
+    """
+    
+    def __init__(self, budget: int):
+        """
+        Args:
+            budget (int): Maximaal geschat geheugengebruik van alle lopende verwerkingen in bytes
+        """
+        self.budget = budget
+        self.reserved = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+    
+    def fits(self, size: int) -> bool:
+        """Of een verwerking van deze grootte binnen het budget kan vallen (als niets anders loopt)"""
+        return size <= self.budget
+    
+    def try_reserve(self, size: int) -> bool:
+        """
+        Reserveert geheugen als het naast de lopende verwerkingen past
+        
+        Args:
+            size (int): Geschat geheugengebruik in bytes
+            
+        Returns:
+            bool: True als de reservering gelukt is; dan moet release() volgen
+        """
+        with self._lock:
+            if self.reserved + size > self.budget:
+                self.rejected += 1
+                return False
+            self.reserved += size
+            self.active += 1
+            self.admitted += 1
+            return True
+    
+    def release(self, size: int) -> None:
+        """Geeft een eerdere reservering terug"""
+        with self._lock:
+            self.reserved -= size
+            self.active -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retourneert het budget, de lopende reserveringen en tellers"""
+        with self._lock:
+            return {
+                'budget': self.budget,
+                'reserved': self.reserved,
+                'active': self.active,
+                'admitted': self.admitted,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,246 @@
+"""
+Export Jobs Module voor RadarChart Feedback Analyse
+
+Voert batch exports op de server uit: een job rendert de radar chart van
+elke persoon met chart_renderer en schrijft de bestanden een voor een in een
+ZIP archief op schijf. Jobs draaien op een begrensde thread pool, zodat een
+grote export de server niet blokkeert en het geheugengebruik klein blijft.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from chart_renderer import render_export_svg, scale_chart_options
+
+logger = logging.getLogger(__name__)
+
+# Standaard grenzen van de job manager
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_JOBS = 20
+# Zo lang blijft het archief van een afgeronde job minstens beschikbaar voor download
+DEFAULT_RETENTION_SECONDS = 15 * 60
+
+def export_file_name(person_name: str, export_date: date, extension: str = 'svg') -> str:
+    """
+    Bestandsnaam van een export, gelijk aan generateFileName in batchExport.js
+    
+    Args:
+        person_name (str): Naam van de persoon
+        export_date (date): Datum van de export
+        extension (str): Bestandsextensie
+        
+    Returns:
+        str: Naam in de vorm [YYYY-MM-DD]_[persoon_naam].[extensie]
+    """
+    clean_name = re.sub(r'[^a-z0-9]', '_', person_name.lower())
+    clean_name = re.sub(r'_+', '_', clean_name).strip('_')
+    return f"{export_date.isoformat()}_{clean_name}.{extension}"
+
+def unique_file_name(file_name: str, used: set) -> str:
+    """
+    Maakt een bestandsnaam uniek binnen een archief met een volgnummer (_2, _3, ...)
+    
+    Verschillende namen kunnen na het opschonen gelijk zijn ('Jan-Jansen' en
+    'jan jansen'); zonder volgnummer overschrijven ze elkaar in het archief.
+    
+    Args:
+        file_name (str): Gewenste bestandsnaam
+        used (set): Al gebruikte namen; de gekozen naam wordt toegevoegd
+        
+    Returns:
+        str: file_name, of file_name met volgnummer voor de extensie
+    """
+    stem, dot, extension = file_name.rpartition('.')
+    if not dot:
+        stem, extension = file_name, ''
+    candidate, n = file_name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}{dot}{extension}"
+    used.add(candidate)
+    return candidate
+
+def export_zip_name(export_date: date) -> str:
+    """Naam van het ZIP archief, gelijk aan generateZipFileName in batchExport.js"""
+    return f"radarcharts_{export_date.isoformat()}.zip"
+
+class ExportJob:
+    """Een batch export van een dataset naar een ZIP archief"""
+    
+    def __init__(self, dataset, person_names: List[str], export_date: date, work_dir: str):
+        """
+        Args:
+            dataset (DatasetSnapshot): Dataset om te exporteren
+            person_names (List[str]): Personen in de export
+            export_date (date): Datum in bestandsnamen en ondertitels
+            work_dir (str): Map voor het ZIP archief
+        """
+        self.job_id = uuid.uuid4().hex[:12]
+        self.dataset = dataset
+        self.person_names = person_names
+        self.export_date = export_date
+        self.zip_path = os.path.join(work_dir, f"{self.job_id}.zip")
+        self.status = 'queued'
+        self.done = 0
+        self.failed = []
+        self.error = None
+        self.created = datetime.now().isoformat()
+        self.finished = None
+        # Monotone tijd van afronden (voor de bewaartermijn) en lopende downloads
+        self.finished_at = None
+        self.active_downloads = 0
+    
+    def run(self) -> None:
+        """Rendert alle charts en schrijft ze een voor een in het archief"""
+        self.status = 'running'
+        used_names = set()
+        # As maximum volgens de schaal van de dataset
+        options = scale_chart_options(self.dataset.processing_summary.get('score_max'))
+        try:
+            with zipfile.ZipFile(self.zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for person_name in self.person_names:
+                    try:
+                        svg = render_export_svg(
+                            self.dataset.persons[person_name]["scores"],
+                            self.dataset.team_averages,
+                            person_name,
+                            self.export_date,
+                            options
+                        )
+                        file_name = unique_file_name(export_file_name(person_name, self.export_date), used_names)
+                        archive.writestr(file_name, svg)
+                        self.done += 1
+                    except Exception as e:
+                        logger.warning(f"Export mislukt voor {person_name}: {str(e)}")
+                        self.failed.append({'name': person_name, 'error': str(e)})
+            self.status = 'done'
+        except Exception as e:
+            logger.error(f"Export job {self.job_id} mislukt: {str(e)}")
+            self.status = 'failed'
+            self.error = str(e)
+        finally:
+            self.finished = datetime.now().isoformat()
+            self.finished_at = time.monotonic()
+    
+    def progress(self) -> Dict[str, Any]:
+        """Retourneert status en voortgang van de job"""
+        return {
+            'job_id': self.job_id,
+            'dataset_id': self.dataset.dataset_id,
+            'status': self.status,
+            'total': len(self.person_names),
+            'done': self.done,
+            'failed': len(self.failed),
+            'failed_exports': list(self.failed),
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished
+        }
+    
+    def remove_files(self) -> None:
+        """Verwijdert het ZIP archief van de job"""
+        try:
+            os.unlink(self.zip_path)
+        except FileNotFoundError:
+            pass
+
+class ExportJobManager:
+    """Plant export jobs op een begrensde thread pool en bewaart de laatste jobs"""
+    
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_jobs: int = DEFAULT_MAX_JOBS,
+                 work_dir: Optional[str] = None, retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        """
+        Args:
+            max_workers (int): Aantal jobs dat tegelijk draait
+            max_jobs (int): Aantal jobs dat bewaard blijft; oudste afgeronde jobs vervallen
+            work_dir (Optional[str]): Map voor de archieven, standaard een tijdelijke map
+            retention_seconds (float): Minimale bewaartijd na afronden voordat een job vervalt
+        """
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='radarchart_exports_')
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+    
+    def submit(self, dataset, person_names: List[str], export_date: Optional[date] = None) -> ExportJob:
+        """
+        Start een nieuwe export job
+        
+        Args:
+            dataset (DatasetSnapshot): Dataset om te exporteren
+            person_names (List[str]): Personen in de export
+            export_date (Optional[date]): Datum van de export, standaard vandaag
+            
+        Returns:
+            ExportJob: De geplande job
+        """
+        job = ExportJob(dataset, person_names, export_date or date.today(), self.work_dir)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(job.run)
+        logger.info(f"Export job {job.job_id} gestart: {len(person_names)} personen")
+        return job
+    
+    def _prune(self) -> None:
+        """
+        Laat de oudste afgeronde jobs vervallen zodra er te veel zijn
+        
+        Alleen jobs die langer dan retention_seconds klaar zijn en niet
+        gedownload worden vervallen; anders blijven er tijdelijk meer jobs staan.
+        """
+        now = time.monotonic()
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if (job.finished_at is not None and now - job.finished_at >= self.retention_seconds
+                    and job.active_downloads == 0):
+                del self._jobs[job_id]
+                job.remove_files()
+    
+    def start_download(self, job: ExportJob) -> bool:
+        """
+        Markeert een download van het archief, zodat de job niet vervalt
+        
+        Returns:
+            bool: False als de job inmiddels vervallen is
+        """
+        with self._lock:
+            if self._jobs.get(job.job_id) is not job:
+                return False
+            job.active_downloads += 1
+            return True
+    
+    def finish_download(self, job: ExportJob) -> None:
+        """Einde van een download gestart met start_download"""
+        with self._lock:
+            job.active_downloads -= 1
+    
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Retourneert een job, of None als die niet (meer) bestaat"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retourneert het aantal jobs per status"""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'jobs': counts, 'max_jobs': self.max_jobs}
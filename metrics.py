@@ -0,0 +1,262 @@
+"""
+Metrics Module voor RadarChart Feedback Analyse
+
+Twee soorten meetgegevens:
+- StageTimings meet per verwerkingsstap de wandkloktijd, rijen in/uit en het
+  geheugen van het proces; het resultaat komt in processing_summary.
+- MetricsRegistry houdt cumulatieve counters en latency histogrammen bij en
+  rendert die in het Prometheus tekst formaat voor de /metrics route.
+
+Het exacte piekgeheugen per stap (tracemalloc) is duur; het wordt alleen
+gemeten als tracemalloc actief is, bijvoorbeeld met RADARCHART_TRACE_MEMORY=1.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MB = 1024 * 1024
+
+# Standaard grenzen (seconden) van de latency histogrammen
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def current_rss_mb() -> Optional[float]:
+    """Huidig geheugengebruik (RSS) van het proces in MB, None als onbekend"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / MB, 1)
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    """Hoogste geheugengebruik van het proces tot nu toe in MB, None als onbekend"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux rapporteert in KB, macOS in bytes
+    return round(peak / (MB if sys.platform == 'darwin' else 1024), 1)
+
+class StageRun:
+    """Een lopende stap; rows_out wordt door de stap zelf ingevuld"""
+    
+    __slots__ = ('rows_in', 'rows_out')
+    
+    def __init__(self, rows_in: Optional[int] = None):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+class StageTimings:
+    """Verzamelt per stap tijd, rijen en geheugen; herhaalde stappen (chunks) tellen op"""
+    
+    def __init__(self):
+        self.stages = {}
+    
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRun]:
+        """
+        Meet een stap; stappen mogen niet genest worden
+        
+        Args:
+            name (str): Naam van de stap
+            rows_in (Optional[int]): Aantal rijen dat de stap binnenkrijgt
+            
+        Yields:
+            StageRun: Object waarop de stap rows_out kan zetten
+        """
+        run = StageRun(rows_in)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield run
+        finally:
+            elapsed = time.perf_counter() - started
+            entry = self.stages.setdefault(name, {
+                'seconds': 0.0, 'calls': 0, 'rows_in': None, 'rows_out': None,
+                'rss_mb': None, 'peak_rss_mb': None
+            })
+            entry['seconds'] += elapsed
+            entry['calls'] += 1
+            for key in ('rows_in', 'rows_out'):
+                value = getattr(run, key)
+                if value is not None:
+                    entry[key] = (entry[key] or 0) + int(value)
+            entry['rss_mb'] = current_rss_mb()
+            entry['peak_rss_mb'] = peak_rss_mb()
+            if tracing:
+                traced_peak = (tracemalloc.get_traced_memory()[1] - traced_start) / MB
+                entry['traced_peak_mb'] = round(max(entry.get('traced_peak_mb', 0.0), traced_peak), 1)
+    
+    def total_seconds(self) -> float:
+        """Som van de tijd van alle stappen"""
+        return sum(entry['seconds'] for entry in self.stages.values())
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Stappen in volgorde van uitvoeren, met afgeronde tijden"""
+        return {name: dict(entry, seconds=round(entry['seconds'], 4)) for name, entry in self.stages.items()}
+    
+    def describe(self) -> str:
+        """Korte regel voor de log, bijvoorbeeld 'read 0.30s, melt 0.94s'"""
+        return ', '.join(f"{name} {entry['seconds']:.2f}s" for name, entry in self.stages.items())
+
+class PeakRssSampler:
+    """
+    Meet het hoogste RSS tijdens een blok code met een achtergrond thread
+    
+    ru_maxrss is de piek over de hele levensduur van het proces en zegt dus
+    niets over een enkele upload; deze sampler leest /proc/self/statm periodiek.
+    Gelijktijdige uploads in hetzelfde proces tellen mee in de meting.
+    """
+    
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.baseline_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def __enter__(self) -> 'PeakRssSampler':
+        self.baseline_mb = current_rss_mb()
+        self.peak_mb = self.baseline_mb
+        if self.baseline_mb is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+    
+    @property
+    def increase_mb(self) -> Optional[float]:
+        """Stijging van het RSS ten opzichte van de start, None als onbekend"""
+        if self.baseline_mb is None or self.peak_mb is None:
+            return None
+        return round(self.peak_mb - self.baseline_mb, 1)
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames: Tuple[str, ...], labels: Tuple[Any, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+class Counter:
+    """Cumulatieve teller per combinatie van labels"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, labels: Tuple[Any, ...] = (), amount: float = 1.0) -> None:
+        """Verhoogt de teller voor de labelwaarden (in de volgorde van labelnames)"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+class Histogram:
+    """Verdeling van waarnemingen (zoals latencies) in cumulatieve buckets"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [aantal per bucket, som, aantal]
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, labels: Tuple[Any, ...] = ()) -> None:
+        """Voegt een waarneming toe voor de labelwaarden (in de volgorde van labelnames)"""
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return '\n'.join(lines)
+
+class MetricsRegistry:
+    """Verzameling metrics die samen als Prometheus tekst gerenderd worden"""
+    
+    # Content-Type van het Prometheus tekst formaat
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self):
+        self._metrics = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Registreert een nieuwe counter"""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Registreert een nieuw histogram"""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Alle metrics in het Prometheus tekst formaat"""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
@@ -0,0 +1,171 @@
+"""
+Result Cache Module voor RadarChart Feedback Analyse
+
+Bewaart verwerkte resultaten van ExcelProcessor, gesleuteld op een hash van
+de inhoud van het geüploade bestand en de versie van de verwerking. Een
+identieke upload hoeft daardoor niet opnieuw verwerkt te worden.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from data_store import estimate_memory
+from score_store import decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+# Standaard grenzen van de cache
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def file_content_key(file_path: str, version: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Berekent de cache sleutel van een bestand: hash van versie, extensie en inhoud
+    
+    Args:
+        file_path (str): Pad naar het bestand
+        version (str): Versie van de verwerking
+        block_size (int): Aantal bytes per leesblok
+        
+    Returns:
+        str: Hexadecimale SHA-256 sleutel
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode('utf-8'))
+    digest.update(os.path.splitext(file_path)[1].lower().encode('utf-8'))
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ResultCache:
+    """LRU cache van verwerkte resultaten met optionele opslag op schijf"""
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries (int): Maximaal aantal resultaten in de cache
+            max_bytes (int): Maximale totale grootte van de resultaten (in geheugen geschat,
+                of de bestandsgrootte bij opslag op schijf)
+            cache_dir (Optional[str]): Map voor persistente opslag, None voor alleen geheugen
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # sleutel -> resultaat (None = alleen op schijf, nog niet geladen)
+        self._entries = OrderedDict()
+        self._sizes = {}
+        
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_index()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _load_index(self) -> None:
+        """Registreert bestaande cache bestanden (oudste eerst) zonder ze te laden"""
+        files = [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        files.sort(key=lambda name: os.path.getmtime(os.path.join(self.cache_dir, name)))
+        for name in files:
+            key = name[:-len('.json')]
+            self._entries[key] = None
+            self._sizes[key] = os.path.getsize(os.path.join(self.cache_dir, name))
+        self._evict()
+        logger.info(f"Result cache geladen: {len(self._entries)} resultaten op schijf")
+    
+    def _evict(self) -> None:
+        """Verwijdert de minst recent gebruikte resultaten tot de cache binnen de grenzen valt"""
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 sum(self._sizes.values()) > self.max_bytes):
+            key, _ = self._entries.popitem(last=False)
+            self._sizes.pop(key, None)
+            if self.cache_dir and os.path.exists(self._path(key)):
+                os.unlink(self._path(key))
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Haalt een resultaat op en markeert het als recent gebruikt
+        
+        Args:
+            key (str): Cache sleutel
+            
+        Returns:
+            Optional[Dict[str, Any]]: Resultaat, of None bij een miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            
+            result = self._entries[key]
+            if result is None:
+                try:
+                    with open(self._path(key), 'r', encoding='utf-8') as f:
+                        result = json.load(f, object_hook=decode_json)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Cache bestand onleesbaar, wordt verwijderd: {str(e)}")
+                    del self._entries[key]
+                    self._sizes.pop(key, None)
+                    self.misses += 1
+                    return None
+                self._entries[key] = result
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+    
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Slaat een resultaat op en verwijdert zo nodig de oudste resultaten
+        
+        Args:
+            key (str): Cache sleutel
+            result (Dict[str, Any]): Verwerkt resultaat (JSON serialiseerbaar, een
+                PersonScoreStore wordt compact opgeslagen)
+        """
+        # Alleen serialiseren als er naar schijf geschreven wordt; anders volstaat een schatting
+        serialized = json.dumps(result, default=encode_json) if self.cache_dir else None
+        size = len(serialized) if serialized is not None else estimate_memory(result)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            if serialized is not None:
+                with open(self._path(key), 'w', encoding='utf-8') as f:
+                    f.write(serialized)
+            self._evict()
+    
+    def clear(self) -> None:
+        """Leegt de cache, inclusief bestanden op schijf"""
+        with self._lock:
+            for key in list(self._entries):
+                if self.cache_dir and os.path.exists(self._path(key)):
+                    os.unlink(self._path(key))
+            self._entries.clear()
+            self._sizes.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retourneert hit/miss tellers en vulling van de cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size_bytes': sum(self._sizes.values()),
+                'max_bytes': self.max_bytes,
+                'persistent': bool(self.cache_dir)
+            }
@@ -0,0 +1,233 @@
+"""
+Schema Cache Module voor RadarChart Feedback Analyse
+
+Bewaart de gedetecteerde indeling van een formulier: welke kolommen
+competenties zijn, bij welke categorie ze horen en welke sub-competentie ze
+beschrijven. De sleutel is een fingerprint van de header rij; elke nieuwe
+export van hetzelfde formulier heeft dezelfde header en hergebruikt de indeling
+zonder de data opnieuw te scannen.
+
+De detectie hangt ook af van de gebruikte antwoordschalen (een kolom is een
+competentie als er antwoorden van een schaal in staan). Daarom hoort bij elk
+schema een context: de gevraagde schaal en de fingerprint van alle schalen.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Standaard maximaal aantal schema's in de cache
+DEFAULT_MAX_SCHEMAS = 256
+
+def header_fingerprint(columns: Iterable[Any]) -> str:
+    """
+    Fingerprint van een header rij: hash van de kolomnamen in volgorde
+    
+    Args:
+        columns (Iterable[Any]): Kolomnamen van het bestand
+        
+    Returns:
+        str: Korte hexadecimale SHA-1 hash
+    """
+    content = json.dumps([str(col) for col in columns], ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+@dataclass(frozen=True)
+class FormSchema:
+    """Gedetecteerde indeling van een formulier: kolom -> categorie -> sub-competentie"""
+    fingerprint: str
+    # Gevraagde schaal en fingerprint van de schalen waarmee gedetecteerd is
+    context: str
+    column_count: int
+    competency_columns: Tuple[str, ...]
+    # Categorie -> [{'column', 'description'}], zoals extract_competency_categories
+    competency_categories: Dict[str, List[Dict[str, str]]]
+    # Automatisch gekozen schaal, None als de schaal gevraagd was
+    scale: Optional[str]
+    created: str
+    
+    @classmethod
+    def create(cls, fingerprint: str, context: str, column_count: int, competency_columns: Iterable[str],
+               competency_categories: Dict[str, List[Dict[str, str]]], scale: Optional[str]) -> 'FormSchema':
+        """Maakt een schema met kopieën van de gedetecteerde indeling en de huidige tijd"""
+        return cls(
+            fingerprint=fingerprint,
+            context=context,
+            column_count=column_count,
+            competency_columns=tuple(competency_columns),
+            competency_categories={category: [dict(item) for item in items]
+                                   for category, items in competency_categories.items()},
+            scale=scale,
+            created=datetime.now().isoformat()
+        )
+    
+    @property
+    def key(self) -> str:
+        return f"{self.fingerprint}:{self.context}"
+    
+    @property
+    def column_categories(self) -> Dict[str, str]:
+        """Competentie kolom -> hoofdcategorie"""
+        return {item['column']: category
+                for category, items in self.competency_categories.items() for item in items}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FormSchema':
+        return cls(**dict(data, competency_columns=tuple(data['competency_columns'])))
+    
+    def describe(self) -> Dict[str, Any]:
+        """Indeling voor de API: categorieën met hun sub-competenties"""
+        return {
+            'fingerprint': self.fingerprint,
+            'context': self.context,
+            'columns': self.column_count,
+            'competency_columns': len(self.competency_columns),
+            'competency_categories': {
+                category: [item['description'] for item in items]
+                for category, items in self.competency_categories.items()
+            },
+            'scale': self.scale,
+            'created': self.created
+        }
+
+class SchemaCache:
+    """LRU cache van formulier schema's met optionele opslag in een JSON bestand"""
+    
+    def __init__(self, max_schemas: int = DEFAULT_MAX_SCHEMAS, schema_file: Optional[str] = None):
+        """
+        Args:
+            max_schemas (int): Maximaal aantal schema's in de cache
+            schema_file (Optional[str]): Bestand voor persistente opslag, None voor alleen geheugen
+        """
+        self.max_schemas = max_schemas
+        self.schema_file = schema_file
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # sleutel -> schema, minst recent gebruikt eerst
+        self._schemas = OrderedDict()
+        # sleutel -> aantal keer hergebruikt
+        self._uses = {}
+        
+        if schema_file and os.path.exists(schema_file):
+            self._load()
+    
+    def _load(self) -> None:
+        """Leest de schema's uit het bestand; een onleesbaar bestand wordt genegeerd"""
+        try:
+            with open(self.schema_file, 'r', encoding='utf-8') as f:
+                for data in json.load(f):
+                    schema = FormSchema.from_dict(data)
+                    self._schemas[schema.key] = schema
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Schema bestand onleesbaar, begint leeg: {str(e)}")
+            self._schemas.clear()
+            return
+        self._evict()
+        logger.info(f"Schema cache geladen: {len(self._schemas)} schema's")
+    
+    def _save(self) -> None:
+        """Schrijft alle schema's atomair naar het bestand"""
+        directory = os.path.dirname(self.schema_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.schema_file}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump([schema.to_dict() for schema in self._schemas.values()], f, ensure_ascii=False)
+        os.replace(temp_path, self.schema_file)
+    
+    def _evict(self) -> None:
+        while len(self._schemas) > self.max_schemas:
+            key, _ = self._schemas.popitem(last=False)
+            self._uses.pop(key, None)
+    
+    def get(self, fingerprint: str, context: str) -> Optional[FormSchema]:
+        """
+        Haalt het schema van een header op en markeert het als recent gebruikt
+        
+        Args:
+            fingerprint (str): Fingerprint van de header (zie header_fingerprint)
+            context (str): Detectie context (schaal en schalen)
+            
+        Returns:
+            Optional[FormSchema]: Schema, of None bij een miss
+        """
+        key = f"{fingerprint}:{context}"
+        with self._lock:
+            schema = self._schemas.get(key)
+            if schema is None:
+                self.misses += 1
+                return None
+            self._schemas.move_to_end(key)
+            self._uses[key] = self._uses.get(key, 0) + 1
+            self.hits += 1
+            return schema
+    
+    def put(self, schema: FormSchema) -> None:
+        """
+        Slaat een schema op en verwijdert zo nodig de oudste schema's
+        
+        Args:
+            schema (FormSchema): Gedetecteerd schema
+        """
+        with self._lock:
+            self._schemas[schema.key] = schema
+            self._schemas.move_to_end(schema.key)
+            self._evict()
+            if self.schema_file:
+                try:
+                    self._save()
+                except OSError as e:
+                    logger.warning(f"Kon schema's niet opslaan: {str(e)}")
+    
+    def schemas(self, context: Optional[str] = None) -> List[FormSchema]:
+        """
+        Alle schema's (optioneel van één context), om een cache in een ander proces te vullen
+        
+        Args:
+            context (Optional[str]): Alleen schema's met deze detectie context
+            
+        Returns:
+            List[FormSchema]: Schema's, minst recent gebruikt eerst
+        """
+        with self._lock:
+            return [schema for schema in self._schemas.values() if context is None or schema.context == context]
+    
+    def list_schemas(self) -> List[Dict[str, Any]]:
+        """Bekende indelingen, meest recent gebruikt eerst, met het aantal keer hergebruikt"""
+        with self._lock:
+            return [dict(schema.describe(), uses=self._uses.get(key, 0))
+                    for key, schema in reversed(self._schemas.items())]
+    
+    def clear(self) -> None:
+        """Leegt de cache, inclusief het bestand"""
+        with self._lock:
+            self._schemas.clear()
+            self._uses.clear()
+            if self.schema_file and os.path.exists(self.schema_file):
+                os.unlink(self.schema_file)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retourneert hit/miss tellers en vulling van de cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'schemas': len(self._schemas),
+                'max_schemas': self.max_schemas,
+                'persistent': bool(self.schema_file)
+            }
@@ -0,0 +1,239 @@
+"""
+Score Scales Module voor RadarChart Feedback Analyse
+
+Antwoordschalen van vragenlijsten: welke antwoorden bij welke score horen.
+Standaard zijn er drie schalen (4-punts frequentie, 5-punts Likert en
+numeriek 1-10); eigen schalen komen uit een JSON configuratiebestand.
+
+Een schaal wordt één keer gecompileerd tot een lookup op genormaliseerde
+antwoorden. Bij het omzetten worden de antwoorden eerst gefactoriseerd, zodat
+elk uniek antwoord maar één keer genormaliseerd en opgezocht wordt; de scores
+volgen daarna via de codes voor alle rijen tegelijk.
+
+Formaat van het configuratiebestand:
+
+    {
+        "tevredenheid_5": {
+            "description": "5-punts tevredenheid",
+            "values": {"zeer ontevreden": 1, "ontevreden": 2, "neutraal": 3,
+                       "tevreden": 4, "zeer tevreden": 5},
+            "ignore": ["weet ik niet"]
+        }
+    }
+
+Scores moeten gehele getallen zijn (tussen -128 en 127): de compacte opslag
+bewaart ruwe scores als int8.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import hashlib
+import json
+import numbers
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 4-punts frequentie schaal van het standaard feedback formulier (None = genegeerd)
+FREQUENCY_ANSWERS = {
+    'zelden': 1,
+    'soms': 2,
+    'vaak': 3,
+    'zeer vaak': 4,
+    'weet ik niet': None,  # Wordt genegeerd in berekeningen
+    'n.v.t.': None,
+    'nvt': None,
+    '': None
+}
+
+# Antwoorden die op elke schaal genegeerd worden
+IGNORED_ANSWERS = ('weet ik niet', 'n.v.t.', 'nvt', '')
+
+# Aantal rijen waarop een schaal automatisch gekozen wordt
+DETECTION_SAMPLE_ROWS = 200
+
+def normalize_answer(answer: Any) -> str:
+    """
+    Normaliseert een antwoord voor de lookup: kleine letters zonder witruimte,
+    gehele getallen (ook 7.0 uit Excel) als '7'
+    
+    Args:
+        answer (Any): Ruw antwoord uit het bestand
+        
+    Returns:
+        str: Genormaliseerd antwoord
+    """
+    if isinstance(answer, numbers.Number) and not isinstance(answer, bool):
+        if float(answer).is_integer():
+            return str(int(answer))
+    return str(answer).lower().strip()
+
+class ScoreScale:
+    """Gecompileerde antwoordschaal: genormaliseerd antwoord -> score (None = genegeerd)"""
+    
+    def __init__(self, name: str, values: Dict[Any, Optional[int]], ignore: Iterable[str] = (),
+                 description: str = ''):
+        """
+        Args:
+            name (str): Naam van de schaal
+            values (Dict[Any, Optional[int]]): Antwoord -> score; None wordt genegeerd
+            ignore (Iterable[str]): Extra antwoorden die genegeerd worden
+            description (str): Korte omschrijving
+            
+        Raises:
+            ValueError: Als een score geen geheel getal in het int8 bereik is
+        """
+        self.name = name
+        self.description = description
+        lookup = {normalize_answer(answer): None for answer in ignore}
+        for answer, score in values.items():
+            if score is not None:
+                if isinstance(score, bool) or not float(score).is_integer() or not -128 <= score <= 127:
+                    raise ValueError(f"Schaal '{name}': score voor '{answer}' moet een geheel getal "
+                                     f"tussen -128 en 127 zijn, niet {score!r}")
+                score = int(score)
+            lookup[normalize_answer(answer)] = score
+        self.lookup = lookup
+    
+    @property
+    def max_score(self) -> Optional[int]:
+        """Hoogste score van de schaal (maximum van de chart as), None zonder scores"""
+        scores = [score for score in self.lookup.values() if score is not None]
+        return max(scores) if scores else None
+    
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> 'ScoreScale':
+        """Maakt een schaal uit een item van het configuratiebestand"""
+        if not isinstance(config.get('values'), dict) or not config['values']:
+            raise ValueError(f"Schaal '{name}' heeft geen 'values'")
+        return cls(name, config['values'], config.get('ignore', IGNORED_ANSWERS), config.get('description', ''))
+    
+    def text_answers(self) -> set:
+        """Niet-numerieke antwoorden (ook genegeerde), voor het herkennen van competentie kolommen"""
+        return {answer for answer in self.lookup if not answer.lstrip('-').isdigit()}
+    
+    def map_answers(self, answers: pd.Series) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Zet antwoorden om naar scores; elk uniek antwoord wordt één keer opgezocht
+        
+        Args:
+            answers (pd.Series): Ruwe antwoorden (tekst of getallen, NaN voor leeg)
+            
+        Returns:
+            Tuple[np.ndarray, Dict[str, int]]: (score per rij als float, NaN als er geen
+                score is; onbekende antwoorden met hun aantal)
+        """
+        codes, uniques = pd.factorize(answers)
+        # Laatste plek is voor code -1 (leeg)
+        unique_scores = np.full(len(uniques) + 1, np.nan)
+        unknown_codes = []
+        for code, answer in enumerate(uniques):
+            key = normalize_answer(answer)
+            if key in self.lookup:
+                score = self.lookup[key]
+                if score is not None:
+                    unique_scores[code] = score
+            else:
+                unknown_codes.append(code)
+        
+        unknown = {}
+        if unknown_codes:
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            unknown = {str(uniques[code]): int(counts[code]) for code in unknown_codes}
+        return unique_scores[codes], unknown
+    
+    def coverage(self, answer_counts: pd.Series) -> int:
+        """Aantal antwoorden (met herhalingen) dat deze schaal kent"""
+        return int(sum(count for answer, count in answer_counts.items()
+                       if normalize_answer(answer) in self.lookup))
+    
+    def describe(self) -> Dict[str, Any]:
+        """Naam, omschrijving, hoogste score en antwoorden met score, voor de API"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'max_score': self.max_score,
+            'values': {answer: score for answer, score in self.lookup.items() if score is not None},
+            'ignored': [answer for answer, score in self.lookup.items() if score is None]
+        }
+
+BUILTIN_SCALES = {
+    'frequentie_4': ScoreScale('frequentie_4', FREQUENCY_ANSWERS, description='4-punts frequentie (zelden - zeer vaak)'),
+    'likert_5': ScoreScale('likert_5', {
+        'helemaal oneens': 1,
+        'oneens': 2,
+        'neutraal': 3,
+        'eens': 4,
+        'helemaal eens': 5
+    }, IGNORED_ANSWERS, description='5-punts Likert (helemaal oneens - helemaal eens)'),
+    'numeriek_10': ScoreScale('numeriek_10', {score: score for score in range(1, 11)}, IGNORED_ANSWERS,
+                              description='Numeriek 1 - 10')
+}
+
+def load_scales(config_path: Optional[str] = None) -> Dict[str, ScoreScale]:
+    """
+    Standaard schalen plus de eigen schalen uit een JSON configuratiebestand
+    
+    Args:
+        config_path (Optional[str]): Pad naar het configuratiebestand, None voor alleen de standaard
+        
+    Returns:
+        Dict[str, ScoreScale]: Schalen op naam; eigen schalen kunnen standaard schalen vervangen
+        
+    Raises:
+        ValueError: Bij een onleesbaar bestand of een ongeldige schaal
+    """
+    scales = dict(BUILTIN_SCALES)
+    if config_path:
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Schalen configuratie onleesbaar ({config_path}): {str(e)}")
+        if not isinstance(config, dict):
+            raise ValueError(f"Schalen configuratie moet een object met schalen zijn ({config_path})")
+        for name, scale_config in config.items():
+            scales[name] = ScoreScale.from_config(name, scale_config)
+    return scales
+
+def scales_fingerprint(scales: Dict[str, ScoreScale]) -> str:
+    """Korte hash van alle schalen, voor cache sleutels"""
+    content = json.dumps({name: sorted(scale.lookup.items(), key=lambda item: item[0])
+                          for name, scale in sorted(scales.items())})
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+
+def detect_scale(df: pd.DataFrame, columns: Iterable[str], scales: Dict[str, ScoreScale],
+                 sample_rows: int = DETECTION_SAMPLE_ROWS) -> ScoreScale:
+    """
+    Kiest de schaal die de meeste antwoorden in een steekproef herkent
+    
+    Bij gelijke dekking wint de eerste schaal (de standaard frequentie schaal).
+    
+    Args:
+        df (pd.DataFrame): Wide format data
+        columns (Iterable[str]): Competentie kolommen
+        scales (Dict[str, ScoreScale]): Beschikbare schalen
+        sample_rows (int): Aantal rijen in de steekproef
+        
+    Returns:
+        ScoreScale: Best passende schaal
+    """
+    columns = list(columns)
+    answers = pd.Series(df[columns].head(sample_rows).to_numpy().ravel()) if columns else pd.Series([], dtype=object)
+    answer_counts = answers.dropna().value_counts(sort=False)
+    best, best_coverage = None, -1
+    for scale in scales.values():
+        coverage = scale.coverage(answer_counts)
+        if coverage > best_coverage:
+            best, best_coverage = scale, coverage
+    return best
+
+def format_unknown_answers(scale: ScoreScale, unknown: Counter, limit: int = 10) -> str:
+    """Validatie melding met de meest voorkomende onbekende antwoorden en hun aantal"""
+    listed = ', '.join(f"'{answer}' ({count}x)" for answer, count in unknown.most_common(limit))
+    more = f" en {len(unknown) - limit} andere" if len(unknown) > limit else ''
+    return (f"Onbekende antwoorden voor schaal {scale.name} ({sum(unknown.values())} cellen genegeerd): "
+            f"{listed}{more}")
@@ -0,0 +1,446 @@
+"""
+Score Store Module voor RadarChart Feedback Analyse
+
+Compacte opslag van de scores en details van alle personen in een dataset.
+Bij de upload wordt alleen berekend wat de radar chart en de team
+vergelijking nodig hebben: som en aantal per persoon x competentie in twee
+dichte int32 matrices. De details per persoon (per feedback type, ruwe
+scores, standaard deviatie) worden pas bij eerste gebruik berekend uit een
+compacte long format index (persoon, competentie x type en score als kleine
+integers per rij) en daarna per dataset versie onthouden.
+
+Het geheugengebruik is evenredig aan het aantal getallen en niet aan de
+overhead van Python objecten; de kosten van de details worden alleen
+betaald voor personen die echt bekeken worden.
+
+Beperking: na een append staan de bijgewerkte personen als gewone dicts
+(overrides) naast de gedeelde arrays. Bij herhaalde appends groeit dat deel
+en daarmee het geheugengebruik per persoon; een volledige nieuwe upload van
+het cumulatieve bestand maakt de dataset weer volledig compact.
+
+Auteur: RadarChart Development Team
+Versie: 2.0
+"""
+
+import base64
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processor import combine_klantgerichtheid
+
+# Sleutel waaronder een store in JSON (result cache) herkend wordt
+JSON_MARKER = '__person_score_store__'
+
+ARRAY_FIELDS = ('comp_sums', 'comp_counts', 'comp_order', 'total_responses',
+                'row_persons', 'row_cells', 'row_scores')
+
+PERSON_KEYS = ('person_name', 'scores', 'details', 'total_responses')
+
+class PersonView(Mapping):
+    """Persoon data uit een store; 'details' wordt pas bij opvragen berekend"""
+    
+    __slots__ = ('_store', '_row')
+    
+    def __init__(self, store: 'PersonScoreStore', row: int):
+        self._store = store
+        self._row = row
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'person_name':
+            return self._store.persons[self._row]
+        if key == 'scores':
+            return self._store.person_scores(self._row)
+        if key == 'details':
+            return self._store.person_details(self._row)
+        if key == 'total_responses':
+            return int(self._store.total_responses[self._row])
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(PERSON_KEYS)
+    
+    def __len__(self) -> int:
+        return len(PERSON_KEYS)
+
+class PersonScoreStore(Mapping):
+    """Alleen-lezen mapping persoon -> {"person_name", "scores", "details", "total_responses"}"""
+    
+    def __init__(self, persons: Iterable[str], competencies: Iterable[str], types: Iterable[str],
+                 comp_sums: np.ndarray, comp_counts: np.ndarray, comp_order: np.ndarray,
+                 total_responses: np.ndarray, row_persons: np.ndarray, row_cells: np.ndarray,
+                 row_scores: np.ndarray, names: Optional[Iterable[str]] = None,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                 details_cache: Optional[Dict[int, Dict[str, Any]]] = None):
+        """
+        Args:
+            persons (Iterable[str]): Personen in de volgorde van de eerste as van de matrices
+            competencies (Iterable[str]): Competenties (tweede as)
+            types (Iterable[str]): Feedback types
+            comp_sums (np.ndarray): Som van de scores per persoon x competentie (int32)
+            comp_counts (np.ndarray): Aantal scores per persoon x competentie (int32)
+            comp_order (np.ndarray): Volgorde van eerste voorkomen per persoon x competentie (int32)
+            total_responses (np.ndarray): Aantal long rijen per persoon (int32)
+            row_persons (np.ndarray): Persoon (rij in de matrices) per long rij
+            row_cells (np.ndarray): Competentie * aantal types + type per long rij
+            row_scores (np.ndarray): Score (1 t/m 4) per long rij (int8)
+            names (Optional[Iterable[str]]): Zichtbare personen en hun volgorde, standaard alle
+            overrides (Optional[Dict[str, Dict[str, Any]]]): Al samengestelde persoon data
+                die voor gaat op de arrays (na een append), met KLANTGERICHTHEID nog per
+                sub-competentie; wordt bij opvragen samengevoegd
+            details_cache (Optional[Dict[int, Dict[str, Any]]]): Berekende details per rij,
+                gedeeld met versies die dezelfde arrays gebruiken
+        """
+        self.persons = tuple(persons)
+        self.competencies = tuple(competencies)
+        self.types = tuple(types)
+        self.comp_sums = comp_sums
+        self.comp_counts = comp_counts
+        self.comp_order = comp_order
+        self.total_responses = total_responses
+        self.row_persons = row_persons
+        self.row_cells = row_cells
+        self.row_scores = row_scores
+        self.overrides = dict(overrides or {})
+        self._details = {} if details_cache is None else details_cache
+        self._rows = {person: row for row, person in enumerate(self.persons)}
+        if names is None:
+            names = self.persons
+        self.names = tuple(names)
+        self._names = frozenset(self.names)
+    
+    @classmethod
+    def from_long(cls, valid: pd.DataFrame, comp_stats: pd.DataFrame,
+                  person_totals: pd.Series) -> 'PersonScoreStore':
+        """
+        Bouwt de store uit de long format data en de statistieken per competentie
+        
+        Args:
+            valid (pd.DataFrame): Long format rijen met een score en een persoon
+            comp_stats (pd.DataFrame): 'sum' en 'count' per (Persoon, Competentie),
+                in volgorde van eerste voorkomen
+            person_totals (pd.Series): Aantal long rijen per persoon
+            
+        Returns:
+            PersonScoreStore: Store met alle personen uit person_totals
+        """
+        persons = pd.Index(person_totals.index)
+        competency_codes, competencies = pd.factorize(comp_stats.index.get_level_values(1))
+        person_codes = persons.get_indexer(comp_stats.index.get_level_values(0))
+        
+        shape = (len(persons), len(competencies))
+        comp_sums = np.zeros(shape, dtype=np.int32)
+        comp_sums[person_codes, competency_codes] = comp_stats['sum'].to_numpy(dtype=np.int32)
+        comp_counts = np.zeros(shape, dtype=np.int32)
+        comp_counts[person_codes, competency_codes] = comp_stats['count'].to_numpy(dtype=np.int32)
+        comp_order = np.zeros(shape, dtype=np.int32)
+        comp_order[person_codes, competency_codes] = np.arange(len(comp_stats), dtype=np.int32)
+        
+        # Long format index: alleen kleine integers per rij
+        type_codes, types = pd.factorize(valid['Type'])
+        row_cells = pd.Index(competencies).get_indexer(valid['Competentie']) * len(types) + type_codes
+        
+        return cls(persons, competencies, types, comp_sums, comp_counts, comp_order,
+                   person_totals.to_numpy(dtype=np.int32),
+                   persons.get_indexer(valid['Persoon']).astype(np.min_scalar_type(len(persons))),
+                   row_cells.astype(np.min_scalar_type(max(len(competencies) * len(types), 1))),
+                   valid['Score'].to_numpy(dtype=np.int8))
+    
+    def __getitem__(self, person_name: str) -> Mapping:
+        override = self.overrides.get(person_name)
+        if override is not None:
+            return combine_person(override)
+        if person_name not in self._names:
+            raise KeyError(person_name)
+        return PersonView(self, self._rows[person_name])
+    
+    def __contains__(self, person_name: object) -> bool:
+        return person_name in self._names
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def _competency_indices(self, row: int) -> np.ndarray:
+        """Competenties met scores van een persoon, in volgorde van eerste voorkomen"""
+        present = np.flatnonzero(self.comp_counts[row])
+        return present[np.argsort(self.comp_order[row, present])]
+    
+    def person_scores(self, row: int) -> Dict[str, float]:
+        """
+        Score per competentie van een persoon (radar chart), zonder details
+        
+        Args:
+            row (int): Rij van de persoon in de matrices
+            
+        Returns:
+            Dict[str, float]: Afgeronde gemiddelden, KLANTGERICHTHEID gecombineerd
+        """
+        competency_scores = {
+            self.competencies[index]: round(int(self.comp_sums[row, index]) / int(self.comp_counts[row, index]), 2)
+            for index in self._competency_indices(row)
+        }
+        combine_klantgerichtheid(competency_scores)
+        return competency_scores
+    
+    def person_details(self, row: int) -> Dict[str, Any]:
+        """
+        Details per competentie van een persoon; bij eerste gebruik berekend uit de long index
+        
+        Args:
+            row (int): Rij van de persoon in de matrices
+            
+        Returns:
+            Dict[str, Any]: Details per competentie, zelfde vorm als de volledige verwerking
+        """
+        details = self._details.get(row)
+        if details is None:
+            # Twee gelijktijdige eerste requests berekenen hooguit allebei dezelfde details
+            details = combined_details(self._compute_details(row))
+            self._details[row] = details
+        return details
+    
+    def sub_competency_details(self, person_name: str) -> Dict[str, Any]:
+        """
+        Details van een persoon met KLANTGERICHTHEID nog per sub-competentie
+        
+        Nodig om de statistieken voor een append op te bouwen; het resultaat
+        wordt niet onthouden.
+        
+        Args:
+            person_name (str): Naam van de persoon
+            
+        Returns:
+            Dict[str, Any]: Details per (sub-)competentie, elk met 'by_type'
+        """
+        override = self.overrides.get(person_name)
+        if override is not None:
+            return override['details']
+        if person_name not in self._names:
+            raise KeyError(person_name)
+        return self._compute_details(self._rows[person_name])
+    
+    def iter_cells(self) -> Iterator[Tuple[str, str, str, np.ndarray]]:
+        """
+        Ruwe scores per (persoon, sub-competentie, type) uit de arrays, in één pass
+        
+        Personen met een override en personen buiten names worden overgeslagen.
+        Per persoon komen de competenties en types in volgorde van eerste
+        voorkomen, binnen een cel de scores in volgorde van het bestand (zelfde
+        volgorde als _compute_details).
+        
+        Yields:
+            Tuple[str, str, str, np.ndarray]: (persoon, competentie, type, scores als int8)
+        """
+        included = np.zeros(len(self.persons), dtype=bool)
+        included[[self._rows[name] for name in self.names if name not in self.overrides]] = True
+        keep = np.flatnonzero(included[self.row_persons])
+        if len(keep) == 0:
+            return
+        
+        # lexsort is stabiel: binnen een cel blijft de volgorde van het bestand
+        order = keep[np.lexsort((self.row_cells[keep], self.row_persons[keep]))]
+        persons = self.row_persons[order]
+        cells = self.row_cells[order]
+        starts = np.flatnonzero(np.concatenate(([True], (persons[1:] != persons[:-1]) | (cells[1:] != cells[:-1]))))
+        scores_by_group = np.split(self.row_scores[order], starts[1:])
+        
+        group_persons = persons[starts].astype(np.intp)
+        competency_indices, type_indices = np.divmod(cells[starts].astype(np.intp), len(self.types))
+        # Persoon, dan competentie en type in volgorde van eerste voorkomen
+        ranks = self.comp_order[group_persons, competency_indices]
+        for group in np.lexsort((order[starts], ranks, group_persons)):
+            yield (self.persons[group_persons[group]], self.competencies[competency_indices[group]],
+                   self.types[type_indices[group]], scores_by_group[group])
+    
+    def _compute_details(self, row: int) -> Dict[str, Any]:
+        positions = np.flatnonzero(self.row_persons == row)
+        cells = self.row_cells[positions]
+        # Stabiel sorteren houdt de scores binnen een cel in volgorde van de file
+        order = np.argsort(cells, kind='stable')
+        cell_values, first_positions, cell_counts = np.unique(cells, return_index=True, return_counts=True)
+        scores_by_cell = np.split(self.row_scores[positions][order], np.cumsum(cell_counts)[:-1])
+        
+        # Types per competentie in volgorde van eerste voorkomen
+        by_competency = {}
+        for rank in np.argsort(first_positions, kind='stable'):
+            competency_index, type_index = divmod(int(cell_values[rank]), len(self.types))
+            by_competency.setdefault(competency_index, []).append((type_index, scores_by_cell[rank]))
+        
+        competency_details = {}
+        for competency_index in self._competency_indices(row):
+            total = int(self.comp_sums[row, competency_index])
+            n = int(self.comp_counts[row, competency_index])
+            type_scores = by_competency[competency_index]
+            average = total / n
+            if n > 1:
+                deviations = np.concatenate([values for _, values in type_scores]).astype(float) - average
+                std = round(float(np.sqrt(np.dot(deviations, deviations) / (n - 1))), 2)
+            else:
+                std = 0
+            
+            competentie = self.competencies[competency_index]
+            competency_details[competentie] = {
+                'overall_average': round(average, 2),
+                'by_type': {
+                    self.types[type_index]: {
+                        'average': int(values.sum(dtype=np.int64)) / len(values),
+                        'count': len(values),
+                        'scores': values.astype(float).tolist()
+                    }
+                    for type_index, values in type_scores
+                },
+                'total_responses': n,
+                'std_deviation': std
+            }
+        return competency_details
+    
+    def _copy(self, names: Iterable[str], overrides: Dict[str, Dict[str, Any]]) -> 'PersonScoreStore':
+        return PersonScoreStore(self.persons, self.competencies, self.types, names=names,
+                                overrides=overrides, details_cache=self._details, **self.arrays())
+    
+    def select(self, names: Iterable[str]) -> 'PersonScoreStore':
+        """
+        Store met alleen de gegeven personen, in die volgorde; de arrays worden gedeeld
+        
+        Args:
+            names (Iterable[str]): Personen, onbekende namen worden overgeslagen
+            
+        Returns:
+            PersonScoreStore: Nieuwe store
+        """
+        return self._copy([name for name in names if name in self._rows or name in self.overrides],
+                          self.overrides)
+    
+    def with_persons(self, updated: Mapping) -> 'PersonScoreStore':
+        """
+        Nieuwe versie waarin de gegeven personen vervangen of toegevoegd zijn
+        
+        Args:
+            updated (Mapping): Persoon -> al samengestelde persoon data, met
+                KLANTGERICHTHEID nog per sub-competentie
+            
+        Returns:
+            PersonScoreStore: Nieuwe store die de arrays (en berekende details) deelt met deze
+        """
+        names = list(self.names) + [name for name in updated if name not in self._names]
+        return self._copy(names, {**self.overrides, **updated})
+    
+    @property
+    def details_computed(self) -> int:
+        """Aantal personen waarvan de details al berekend zijn"""
+        return len(self._details)
+    
+    def nbytes(self) -> int:
+        """Geheugengebruik van de arrays in bytes"""
+        return sum(getattr(self, name).nbytes for name in ARRAY_FIELDS)
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """De arrays van de store op naam (zie ARRAY_FIELDS)"""
+        return {name: getattr(self, name) for name in ARRAY_FIELDS}
+    
+    def metadata(self) -> Dict[str, Any]:
+        """Alles behalve de arrays, als JSON serialiseerbare dict"""
+        return {
+            'persons': list(self.persons),
+            'competencies': list(self.competencies),
+            'types': list(self.types),
+            'names': list(self.names),
+            'overrides': self.overrides
+        }
+    
+    @classmethod
+    def from_arrays(cls, metadata: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'PersonScoreStore':
+        """
+        Herstelt een store uit metadata() en arrays()
+        
+        Args:
+            metadata (Dict[str, Any]): Resultaat van metadata()
+            arrays (Dict[str, np.ndarray]): Arrays op naam; mogen alleen-lezen zijn (mmap)
+            
+        Returns:
+            PersonScoreStore: Store zonder berekende details
+        """
+        return cls(metadata['persons'], metadata['competencies'], metadata['types'],
+                   names=metadata['names'], overrides=metadata['overrides'], **arrays)
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Compacte JSON vorm: arrays als base64, voor de result cache"""
+        data = self.metadata()
+        for name, array in self.arrays().items():
+            data[name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'data': base64.b64encode(array.tobytes()).decode('ascii')
+            }
+        return data
+    
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'PersonScoreStore':
+        """Herstelt een store uit to_json()"""
+        arrays = {
+            name: np.frombuffer(base64.b64decode(data[name]['data']),
+                                dtype=np.dtype(data[name]['dtype'])).reshape(data[name]['shape'])
+            for name in ARRAY_FIELDS
+        }
+        return cls.from_arrays(data, arrays)
+
+def combined_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """Kopie van details per sub-competentie met KLANTGERICHTHEID samengevoegd"""
+    details = dict(details)
+    combine_klantgerichtheid({competentie: detail['overall_average'] for competentie, detail in details.items()},
+                             details)
+    return details
+
+def combine_person(person_data: Mapping) -> Dict[str, Any]:
+    """
+    Persoon data zoals de API die toont, uit data met KLANTGERICHTHEID per sub-competentie
+    
+    Args:
+        person_data (Mapping): Persoon data, bijvoorbeeld uit FeedbackAggregates.build_person
+        
+    Returns:
+        Dict[str, Any]: Nieuwe dict; de invoer wordt niet aangepast
+    """
+    scores = dict(person_data['scores'])
+    combine_klantgerichtheid(scores)
+    return {**person_data, 'scores': scores, 'details': combined_details(person_data['details'])}
+
+def merge_persons(base: Mapping, updated: Mapping) -> Mapping:
+    """
+    Personen van een bestaande dataset met de bijgewerkte personen erover
+    
+    Een store deelt zijn arrays met de nieuwe versie; andere mappings
+    (bijvoorbeeld uit een snapshot) worden gekopieerd.
+    
+    Args:
+        base (Mapping): Personen van de bestaande dataset
+        updated (Mapping): Persoon -> nieuwe persoon data, met KLANTGERICHTHEID
+            nog per sub-competentie
+        
+    Returns:
+        Mapping: Personen van de nieuwe versie
+    """
+    if isinstance(base, PersonScoreStore):
+        return base.with_persons(updated)
+    persons = dict(base)
+    persons.update((name, combine_person(person_data)) for name, person_data in updated.items())
+    return persons
+
+def encode_json(obj: Any) -> Any:
+    """json.dumps default: serialiseert een PersonScoreStore (en losse persoon data)"""
+    if isinstance(obj, PersonScoreStore):
+        return {JSON_MARKER: obj.to_json()}
+    if isinstance(obj, PersonView):
+        return dict(obj)
+    raise TypeError(f"Object van type {type(obj).__name__} is niet JSON serialiseerbaar")
+
+def decode_json(obj: Dict[str, Any]) -> Any:
+    """json.load object_hook: herstelt een PersonScoreStore uit encode_json"""
+    if JSON_MARKER in obj:
+        return PersonScoreStore.from_json(obj[JSON_MARKER])
+    return obj
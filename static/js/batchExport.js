@@ -5,7 +5,13 @@ class BatchExporter {
         this.exportQueue = [];
         this.completedExports = [];
         this.failedExports = [];
-        this.exportedFiles = []; // Voor batch download
+        this.teamAverages = {};
+        this.scoreMax = null;
+        // Aantal personen dat tegelijk in de pipeline zit (renderen + rasteriseren)
+        this.concurrency = window.BATCH_EXPORT_CONCURRENCY || Math.min(4, navigator.hardwareConcurrency || 2);
+        this.workers = [];
+        this.workerJobs = new Map();
+        this.nextWorkerJob = 0;
         this.initializeEventListeners();
     }
 
@@ -34,7 +40,6 @@ class BatchExporter {
         this.isExporting = true;
         this.completedExports = [];
         this.failedExports = [];
-        this.exportedFiles = [];
 
         const zip = new JSZip();
         
@@ -45,35 +50,25 @@ class BatchExporter {
         this.showProgress(true);
         
         try {
-            // Haal data voor alle personen op
-            const response = await fetch('/get_all_persons_data');
-            const data = await response.json();
-            
-            if (!data.success) {
-                throw new Error(data.error || 'Kon personen data niet ophalen');
-            }
-            
-            this.exportQueue = data.persons_data;
-            const total = this.exportQueue.length;
-            
-            this.updateProgressBar(0, total);
-            this.showBatchStatus('processing', `🚀 Exporteren van ${total} radar charts...`);
+            // Personen komen gestreamd binnen; de eerste chart wordt al
+            // gerenderd terwijl de rest nog onderweg is
+            this.exportQueue = [];
+            let total = 0;
             
             // Genereer datum voor bestandsnamen
             const exportDate = new Date().toISOString().split('T')[0];
             
-            // Process exports met delay om browser niet te overbelasten
-            for (let i = 0; i < this.exportQueue.length; i++) {
-                const personData = this.exportQueue[i];
-                
+            // Pipeline: maximaal this.concurrency personen tegelijk onderweg,
+            // elke PNG gaat direct het archief in zodra hij klaar is
+            const inFlight = new Set();
+            const usedFileNames = new Set();
+            let finished = 0;
+            
+            const exportTask = async (personData) => {
                 try {
                     const fileBlob = await this.exportSinglePerson(personData, exportDate);
+                    zip.file(personData.fileName, fileBlob);
                     this.completedExports.push(personData.person_name);
-                    this.exportedFiles.push({
-                        name: personData.person_name,
-                        blob: fileBlob,
-                        filename: this.generateFileName(personData.person_name, exportDate)
-                    });
                 } catch (error) {
                     console.error(`Export failed for ${personData.person_name}:`, error);
                     this.failedExports.push({
@@ -82,18 +77,41 @@ class BatchExporter {
                     });
                 }
                 
-                this.updateProgressBar(i + 1, total);
+                finished++;
+                this.updateProgressBar(finished, total);
+            };
+            
+            for await (const record of this.streamPersonsData()) {
+                if (record.type === 'header') {
+                    total = record.total_persons;
+                    this.updateProgressBar(0, total);
+                    this.showBatchStatus('processing', `🚀 Exporteren van ${total} radar charts...`);
+                    continue;
+                }
+                if (record.type !== 'person') continue;
                 
-                // Kleine delay tussen exports
-                await this.delay(100);
+                const personData = {
+                    person_name: record.person_name,
+                    // Naam in volgorde van de personen, onafhankelijk van welke export eerst klaar is
+                    fileName: this.uniqueFileName(this.generateFileName(record.person_name, exportDate), usedFileNames),
+                    scores: {
+                        individual_scores: record.individual_scores,
+                        team_averages: this.teamAverages
+                    }
+                };
+                this.exportQueue.push(personData);
+                
+                const task = exportTask(personData).finally(() => inFlight.delete(task));
+                inFlight.add(task);
+                if (inFlight.size >= this.concurrency) {
+                    await Promise.race(inFlight);
+                }
             }
+            await Promise.all(inFlight);
             
-            // Voeg alle bestanden toe aan ZIP-archief en download één bestand
-            if (this.exportedFiles.length > 0) {
+            // Download het archief als één bestand
+            if (this.completedExports.length > 0) {
                 this.showBatchStatus('processing', '📦 Archiveren van downloads...');
-                for (const file of this.exportedFiles) {
-                    zip.file(file.filename, file.blob);
-                }
                 const zipBlob = await zip.generateAsync({ type: 'blob' });
                 this.downloadBlob(zipBlob, this.generateZipFileName(exportDate));
             }
@@ -104,12 +122,53 @@ class BatchExporter {
             this.showBatchStatus('error', `❌ Batch export mislukt: ${error.message}`);
         } finally {
             this.isExporting = false;
+            this.terminateWorkers();
             batchBtn.disabled = false;
             setTimeout(() => this.hideProgress(), 3000);
         }
     }
 
+    async *streamPersonsData() {
+        // Leest /stream_persons_data (NDJSON) en levert elke regel zodra die binnen is
+        const response = await fetch(`/stream_persons_data${datasetQuery()}`);
+        if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.error || 'Kon personen data niet ophalen');
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                if (!line) continue;
+                const record = JSON.parse(line);
+                if (record.type === 'header') {
+                    // Team gemiddelden en schaal worden maar een keer verstuurd
+                    this.teamAverages = record.team_averages;
+                    this.scoreMax = record.score_max;
+                } else if (record.type === 'error') {
+                    throw new Error(record.error);
+                }
+                yield record;
+            }
+            
+            if (done) break;
+        }
+    }
+    
     async exportSinglePerson(personData, exportDate) {
+        const completeSvg = await this.renderExportSvg(personData);
+        return this.rasterizeSvg(completeSvg);
+    }
+    
+    async renderExportSvg(personData) {
         // Render de radar chart voor deze persoon (invisible)
         const tempContainer = document.createElement('div');
         tempContainer.style.position = 'absolute';
@@ -118,43 +177,121 @@ class BatchExporter {
         tempContainer.style.height = '800px';
         document.body.appendChild(tempContainer);
         
+        let chart = null;
         try {
             // Initialize radar chart met person data
             const chartOptions = {
                 ...window.DEFAULT_CHART_OPTIONS,
+                ...window.chartOptionsForScale(this.scoreMax),
                 w: 600,
                 h: 600
             };
             
-            // Render chart
-            const chart = initializeRadarChart(tempContainer, personData.scores, personData.person_name, chartOptions);
+            // Render chart (D3 rendert synchroon)
+            chart = initializeRadarChart(tempContainer, personData.scores, personData.person_name, chartOptions);
             
-            // Wacht tot chart volledig gerenderd is
-            await this.delay(500);
+            // Wacht op fonts en een layout frame in plaats van een vaste delay
+            await this.waitForRender();
             
-            // Gebruik ChartExporter om PNG te maken met dezelfde opmaak als enkele export
             const svgElement = tempContainer.querySelector('svg');
             if (!svgElement) throw new Error('Chart rendering failed');
             
             // Maak complete export SVG met dezelfde opmaak als ChartExporter
             const exporter = new ChartExporter();
             exporter.setCurrentPersonName(personData.person_name);
-            const completeSvg = await exporter.createCompleteExportSvg(svgElement);
-            
-            // Converteer naar PNG blob (niet downloaden)
-            const pngBlob = await this.convertSVGtoPNGBlob(completeSvg);
+            return await exporter.createCompleteExportSvg(svgElement);
             
+        } finally {
             // Cleanup
             if (chart && chart.destroy) chart.destroy();
-            
-            return pngBlob;
-            
-        } finally {
-            // Verwijder temp container
             document.body.removeChild(tempContainer);
         }
     }
 
+    async waitForRender() {
+        if (document.fonts && document.fonts.ready) {
+            await document.fonts.ready;
+        }
+        await new Promise(resolve => requestAnimationFrame(() => resolve()));
+    }
+    
+    supportsWorkerRasterizing() {
+        return typeof Worker !== 'undefined' &&
+            typeof OffscreenCanvas !== 'undefined' &&
+            typeof OffscreenCanvas.prototype.convertToBlob === 'function' &&
+            typeof createImageBitmap === 'function';
+    }
+    
+    async rasterizeSvg(svgElement) {
+        if (!this.supportsWorkerRasterizing()) {
+            return this.convertSVGtoPNGBlob(svgElement);
+        }
+        
+        try {
+            return await this.rasterizeInWorker(svgElement);
+        } catch (error) {
+            console.warn('Worker rasterizing mislukt, terugval op main thread:', error);
+            return this.convertSVGtoPNGBlob(svgElement);
+        }
+    }
+    
+    async rasterizeInWorker(svgElement) {
+        const svgWidth = parseInt(svgElement.getAttribute('width')) || 800;
+        const svgHeight = parseInt(svgElement.getAttribute('height')) || 600;
+        const scale = 2; // 2x resolution for crisp export
+        
+        // Het SVG decoderen kan alleen op de main thread; dat is asynchroon en goedkoop.
+        // PNG encoding (het dure deel) gebeurt in een worker op een OffscreenCanvas.
+        const svgData = new XMLSerializer().serializeToString(svgElement);
+        const svgUrl = URL.createObjectURL(new Blob([svgData], { type: 'image/svg+xml;charset=utf-8' }));
+        let bitmap;
+        try {
+            const img = new Image(svgWidth * scale, svgHeight * scale);
+            img.src = svgUrl;
+            await img.decode();
+            bitmap = await createImageBitmap(img, {
+                resizeWidth: svgWidth * scale,
+                resizeHeight: svgHeight * scale,
+                resizeQuality: 'high'
+            });
+        } finally {
+            URL.revokeObjectURL(svgUrl);
+        }
+        
+        if (this.workers.length === 0) {
+            for (let i = 0; i < this.concurrency; i++) {
+                const worker = new Worker('/static/js/rasterWorker.js');
+                worker.onmessage = (event) => this.handleWorkerMessage(event.data);
+                this.workers.push(worker);
+            }
+        }
+        
+        const id = this.nextWorkerJob++;
+        const worker = this.workers[id % this.workers.length];
+        return new Promise((resolve, reject) => {
+            this.workerJobs.set(id, { resolve, reject });
+            worker.postMessage({ id, bitmap }, [bitmap]);
+        });
+    }
+    
+    handleWorkerMessage(data) {
+        const job = this.workerJobs.get(data.id);
+        if (!job) return;
+        this.workerJobs.delete(data.id);
+        if (data.blob) {
+            job.resolve(data.blob);
+        } else {
+            job.reject(new Error(data.error || 'Kon PNG niet genereren'));
+        }
+    }
+    
+    terminateWorkers() {
+        this.workers.forEach(worker => worker.terminate());
+        this.workers = [];
+        this.workerJobs.forEach(job => job.reject(new Error('Export afgebroken')));
+        this.workerJobs.clear();
+    }
+    
     async convertSVGtoPNGBlob(svgElement) {
         return new Promise((resolve, reject) => {
             try {
@@ -253,6 +390,19 @@ class BatchExporter {
         return `${exportDate}_${cleanName}.png`;
     }
 
+    uniqueFileName(fileName, usedNames) {
+        // Namen die na het opschonen gelijk zijn krijgen een volgnummer, anders overschrijven ze elkaar in de ZIP
+        const dot = fileName.lastIndexOf('.');
+        const stem = dot >= 0 ? fileName.slice(0, dot) : fileName;
+        const extension = dot >= 0 ? fileName.slice(dot) : '';
+        let candidate = fileName;
+        for (let n = 2; usedNames.has(candidate); n++) {
+            candidate = `${stem}_${n}${extension}`;
+        }
+        usedNames.add(candidate);
+        return candidate;
+    }
+
     generateZipFileName(exportDate) {
         return `radarcharts_${exportDate}.zip`;
     }
@@ -307,10 +457,6 @@ class BatchExporter {
             this.showBatchStatus('error', message);
         }
     }
-
-    delay(ms) {
-        return new Promise(resolve => setTimeout(resolve, ms));
-    }
 }
 
 // Initialize batch exporter
@@ -2,6 +2,7 @@
 // Provides default options used across the application
 window.DEFAULT_CHART_OPTIONS = {
     margin: { top: 200, right: 400, bottom: 200, left: 400 },
+    // Standaard 4-punts schaal; chartOptionsForScale past dit aan de dataset aan
     levels: 4,
     maxValue: 4,
     labelFactor: 1.3,
@@ -12,3 +13,14 @@ window.DEFAULT_CHART_OPTIONS = {
     roundStrokes: false,
     color: d3.scaleOrdinal().domain([0, 1]).range(["#27ae60", "#3498db"])
 };
+
+// Meer cirkels dan dit wordt onleesbaar; grotere schalen krijgen 5 cirkels
+window.MAX_SCALE_LEVELS = 6;
+
+// As maximum en aantal cirkels voor score_max van een dataset
+// (zelfde regels als scale_chart_options in chart_renderer.py)
+window.chartOptionsForScale = function(scoreMax) {
+    if (!scoreMax || scoreMax <= 0) return {};
+    const levels = scoreMax <= window.MAX_SCALE_LEVELS && Number.isInteger(scoreMax) ? scoreMax : 5;
+    return { maxValue: scoreMax, levels: levels };
+};
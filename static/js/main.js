@@ -81,9 +81,9 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        const maxSize = 10 * 1024 * 1024;
+        const maxSize = 64 * 1024 * 1024;
         if (file.size > maxSize) {
-            showStatus('error', 'Bestand is te groot. Maximum grootte is 10MB.');
+            showStatus('error', 'Bestand is te groot. Maximum grootte is 64MB.');
             return;
         }
 
@@ -96,6 +96,13 @@ document.addEventListener('DOMContentLoaded', function() {
     function uploadFile(file) {
         const formData = new FormData();
         formData.append('file', file);
+        // Append: alleen nieuwe rijen verwerken bovenop de huidige dataset
+        const appendMode = document.getElementById('appendMode');
+        const appending = appendMode && appendMode.checked && window.currentDatasetId;
+        if (appending) {
+            formData.append('mode', 'append');
+            formData.append('dataset_id', window.currentDatasetId);
+        }
         showProgress(0);
 
         fetch('/upload', {
@@ -108,8 +115,16 @@ document.addEventListener('DOMContentLoaded', function() {
         })
         .then(data => {
             if (data.success) {
-                showStatus('success', `✅ Upload succesvol! ${data.persons.length} personen gevonden.`);
+                if (data.append_summary) {
+                    showStatus('success', `✅ ${data.append_summary.new_rows} nieuwe rijen toegevoegd, ` +
+                        `${data.append_summary.duplicate_rows} al verwerkt. ${data.persons.length} personen.`);
+                } else {
+                    showStatus('success', `✅ Upload succesvol! ${data.persons.length} personen gevonden.`);
+                }
                 showProgress(100);
+                // Onthoud de dataset zodat vervolgverzoeken deze upload gebruiken
+                window.currentDatasetId = data.dataset_id;
+                if (appendMode) appendMode.disabled = false;
                 populatePersonDropdown(data.persons);
                 
                 // Activate batch export functionality
@@ -161,14 +176,14 @@ document.addEventListener('DOMContentLoaded', function() {
         radarChartContainer.innerHTML = '<div class="loading-spinner"></div><p style="text-align: center; margin-top: 15px;">Laden van feedback data...</p>';
         resultsSection.scrollIntoView({ behavior: 'smooth' });
 
-        fetch(`/get_scores/${encodeURIComponent(selectedPerson)}`)
+        fetch(`/get_scores/${encodeURIComponent(selectedPerson)}${datasetQuery()}`)
         .then(response => {
             if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
             return response.json();
         })
         .then(data => {
             if (data.success) {
-                displayRadarChart(data.scores, selectedPerson);
+                displayRadarChart(data.scores, selectedPerson, data.score_max);
             } else {
                 throw new Error(data.error || 'Kon scores niet ophalen');
             }
@@ -183,7 +198,7 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    function displayRadarChart(scores, personName) {
+    function displayRadarChart(scores, personName, scoreMax) {
         try {
             if (currentChart) {
                 currentChart.destroy();
@@ -211,6 +226,8 @@ document.addEventListener('DOMContentLoaded', function() {
 
             const chartOptions = {
                 ...window.DEFAULT_CHART_OPTIONS,
+                // As maximum volgens de schaal van de dataset
+                ...window.chartOptionsForScale(scoreMax),
                 w: chartSize,
                 h: chartSize
             };
@@ -289,4 +306,9 @@ document.addEventListener('DOMContentLoaded', function() {
         const i = Math.floor(Math.log(bytes) / Math.log(k));
         return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
     }
-});
\ No newline at end of file
+});
+
+// Query string voor de dataset van de laatste upload (leeg = nieuwste dataset op de server)
+function datasetQuery() {
+    return window.currentDatasetId ? `?dataset_id=${encodeURIComponent(window.currentDatasetId)}` : '';
+}
\ No newline at end of file
@@ -0,0 +1,23 @@
+// Raster Worker voor batch export
+// Tekent een gedecodeerde chart op een OffscreenCanvas en maakt er een PNG van,
+// zodat PNG encoding de main thread niet blokkeert
+
+self.onmessage = async (event) => {
+    const { id, bitmap } = event.data;
+    
+    try {
+        const canvas = new OffscreenCanvas(bitmap.width, bitmap.height);
+        const ctx = canvas.getContext('2d');
+        
+        // Fill white background
+        ctx.fillStyle = 'white';
+        ctx.fillRect(0, 0, bitmap.width, bitmap.height);
+        ctx.drawImage(bitmap, 0, 0);
+        bitmap.close();
+        
+        const blob = await canvas.convertToBlob({ type: 'image/png' });
+        self.postMessage({ id, blob });
+    } catch (error) {
+        self.postMessage({ id, error: error.message });
+    }
+};
@@ -0,0 +1,121 @@
+"""
+Tests voor append uploads met bij te werken statistieken
+
+Een gedeeltelijke upload plus een append van het volledige bestand moet
+dezelfde gemiddelden, standaard deviaties en team gemiddelden geven als een
+volledige upload van dat bestand.
+"""
+
+import pytest
+
+from benchmark import generate_survey, write_survey
+
+@pytest.fixture(scope='module')
+def survey():
+    return generate_survey(400, 25, seed=11)
+
+def write_rows(survey, tmp_path, n_rows):
+    """Schrijft de eerste n_rows rijen weg, zoals een eerdere export van hetzelfde formulier"""
+    file_path = str(tmp_path / f'export_{n_rows}.xlsx')
+    write_survey(survey.iloc[:n_rows], file_path)
+    return file_path
+
+def upload(client, file_path, **form):
+    """Upload een bestand via /upload en geef de JSON response terug"""
+    with open(file_path, 'rb') as f:
+        response = client.post('/upload', data={'file': (f, 'export.xlsx'), **form},
+                               content_type='multipart/form-data')
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert data['success']
+    return data
+
+def statistics(person_data):
+    """Vergelijkbare statistieken van een persoon; ruwe scores gesorteerd"""
+    details = {}
+    for competentie, detail in person_data['details'].items():
+        details[competentie] = {
+            key: value for key, value in detail.items() if key != 'by_type'
+        }
+        details[competentie]['by_type'] = {
+            feedback_type: (stats['average'], stats['count'], sorted(stats['scores']))
+            for feedback_type, stats in detail.get('by_type', {}).items()
+        }
+    return person_data['scores'], details, person_data['total_responses']
+
+def test_partial_upload_plus_append_matches_full_upload(client, survey, tmp_path):
+    from app import registry
+    
+    full = registry.get(upload(client, write_rows(survey, tmp_path, 400))['dataset_id'])
+    
+    data = upload(client, write_rows(survey, tmp_path, 150))
+    data = upload(client, write_rows(survey, tmp_path, 300), mode='append', dataset_id=data['dataset_id'])
+    assert data['append_summary']['new_rows'] == 150
+    # Bouw de statistieken opnieuw op uit de bijgewerkte personen van de append
+    registry.get(data['dataset_id']).aggregates.dataset_id = None
+    data = upload(client, write_rows(survey, tmp_path, 400), mode='append', dataset_id=data['dataset_id'])
+    assert data['append_summary']['new_rows'] == 100
+    appended = registry.get(data['dataset_id'])
+    
+    assert appended.available_persons == full.available_persons
+    assert list(appended.team_averages.items()) == list(full.team_averages.items())
+    for name in full.available_persons:
+        assert statistics(appended.persons[name]) == statistics(full.persons[name])
+    assert appended.processing_summary['total_rows_processed'] == 400
+    assert appended.processing_summary['total_feedback_entries'] == full.processing_summary['total_feedback_entries']
+
+def test_append_same_file_adds_no_rows(client, survey, tmp_path):
+    from app import registry
+    
+    file_path = write_rows(survey, tmp_path, 200)
+    data = upload(client, file_path)
+    base = registry.get(data['dataset_id'])
+    
+    data = upload(client, file_path, mode='append', dataset_id=base.dataset_id)
+    assert data['append_summary']['new_rows'] == 0
+    appended = registry.get(data['dataset_id'])
+    assert appended.team_averages == base.team_averages
+    assert appended.processing_summary['total_rows_processed'] == 200
+
+def test_details_do_not_expose_sub_competencies(client, survey, tmp_path):
+    data = upload(client, write_rows(survey, tmp_path, 150))
+    data = upload(client, write_rows(survey, tmp_path, 300), mode='append', dataset_id=data['dataset_id'])
+    
+    for name in data['persons']:
+        response = client.get(f"/get_person_details/{name}?dataset_id={data['dataset_id']}")
+        details = response.get_json()['details']
+        assert all('parts' not in detail for detail in details.values())
+        assert not any(competentie.startswith('KLANTGERICHTHEID ') for competentie in details)
+
+def test_rebuild_from_store_matches_details(survey, tmp_path):
+    from aggregates import FeedbackAggregates
+    from data_processor import ExcelProcessor
+    
+    result = ExcelProcessor().process_excel_file(write_rows(survey, tmp_path, 400))
+    store = result['persons']
+    from_store = FeedbackAggregates.from_dataset(store, result['team_averages'], result['row_keys'],
+                                                 result['processing_summary'])
+    # Zelfde statistieken via de details per persoon (de trage weg)
+    persons = {name: {'details': store.sub_competency_details(name),
+                      'total_responses': store[name]['total_responses']} for name in store}
+    from_details = FeedbackAggregates.from_dataset(persons, result['team_averages'], result['row_keys'],
+                                                   result['processing_summary'])
+    
+    assert list(from_store.cells) == list(from_details.cells)
+    for name, competencies in from_details.cells.items():
+        assert list(from_store.cells[name].items()) == list(competencies.items())
+    assert from_store.team == from_details.team
+    assert from_store.team_averages() == result['team_averages']
+
+def test_appended_dataset_counts_aggregates_in_memory_estimate(client, survey, tmp_path):
+    from app import registry
+    from data_store import estimate_memory
+    
+    data = upload(client, write_rows(survey, tmp_path, 150))
+    data = upload(client, write_rows(survey, tmp_path, 300), mode='append', dataset_id=data['dataset_id'])
+    appended = registry.get(data['dataset_id'])
+    
+    # Elke ruwe score is een float object in de statistieken
+    entries = appended.processing_summary['total_feedback_entries']
+    assert appended.aggregates.nbytes() > entries * 24
+    assert estimate_memory(appended) > appended.aggregates.nbytes()
@@ -0,0 +1,91 @@
+"""
+Tests voor batch uploads van meerdere bestanden
+
+Een batch moet dezelfde dataset geven als /upload van één bestand met
+dezelfde rijen; alleen rijen die al in een eerder bestand stonden vallen weg.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmark import generate_survey, write_survey
+
+@pytest.fixture(scope='module')
+def survey():
+    return generate_survey(240, 18, seed=29)
+
+def write_rows(df, tmp_path, name):
+    file_path = str(tmp_path / name)
+    write_survey(df, file_path)
+    return file_path
+
+def post_files(client, url, file_paths, field):
+    """Upload bestanden via een multipart form en geef de JSON response terug"""
+    uploads = [(open(file_path, 'rb'), file_path.rsplit('/', 1)[-1]) for file_path in file_paths]
+    try:
+        response = client.post(url, data={field: uploads if field == 'files' else uploads[0]},
+                               content_type='multipart/form-data')
+    finally:
+        for f, _ in uploads:
+            f.close()
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert data['success']
+    return data
+
+def dataset(data):
+    from app import registry
+    return registry.get(data['dataset_id'])
+
+def assert_same_dataset(batch, single):
+    assert batch.available_persons == single.available_persons
+    assert list(batch.team_averages.items()) == list(single.team_averages.items())
+    for name in single.available_persons:
+        assert dict(batch.persons[name]) == dict(single.persons[name])
+    for key in ('total_rows_processed', 'total_feedback_entries', 'persons_found', 'competencies_found'):
+        assert batch.processing_summary[key] == single.processing_summary[key]
+    assert batch.row_keys.tolist() == single.row_keys.tolist()
+
+def test_duplicates_within_one_file_are_kept(client, survey, tmp_path):
+    # Dezelfde rijen twee keer in één bestand, zoals een dubbel ingestuurd formulier
+    df = pd.concat([survey, survey.iloc[:15]], ignore_index=True)
+    file_path = write_rows(df, tmp_path, 'dubbel.xlsx')
+    
+    single = post_files(client, '/upload', [file_path], 'file')
+    batch = post_files(client, '/upload_batch', [file_path], 'files')
+    assert batch['processing_summary']['files'][0]['duplicate_rows'] == 0
+    assert_same_dataset(dataset(batch), dataset(single))
+    assert dataset(batch).processing_summary['total_rows_processed'] == len(df)
+
+def test_rows_in_an_earlier_file_count_once(client, survey, tmp_path):
+    first = write_rows(survey.iloc[:150], tmp_path, 'week1.xlsx')
+    # De tweede export overlapt 50 rijen met de eerste en is een CSV
+    second = write_rows(survey.iloc[100:], tmp_path, 'week2.csv')
+    full = write_rows(survey, tmp_path, 'alles.xlsx')
+    
+    batch = post_files(client, '/upload_batch', [first, second], 'files')
+    single = post_files(client, '/upload', [full], 'file')
+    assert_same_dataset(dataset(batch), dataset(single))
+    
+    files = batch['processing_summary']['files']
+    assert [entry['file'] for entry in files] == ['week1.xlsx', 'week2.csv']
+    assert [entry['success'] for entry in files] == [True, True]
+    assert [entry['rows'] for entry in files] == [150, 140]
+    assert [entry['duplicate_rows'] for entry in files] == [0, 50]
+    assert all(entry['persons'] > 0 and entry['feedback_entries'] > 0 for entry in files)
+    assert batch['processing_summary']['total_rows_processed'] == len(survey)
+
+def test_bad_file_is_reported_without_failing_the_batch(client, survey, tmp_path):
+    good = write_rows(survey, tmp_path, 'export.xlsx')
+    bad = str(tmp_path / 'kapot.csv')
+    pd.DataFrame({'Kolom': ['geen', 'feedback']}).to_csv(bad, index=False)
+    
+    batch = post_files(client, '/upload_batch', [good, bad], 'files')
+    files = batch['processing_summary']['files']
+    assert [entry['file'] for entry in files] == ['export.xlsx', 'kapot.csv']
+    assert files[0]['success'] and not files[1]['success']
+    assert files[1]['error']
+    assert any(error.startswith('kapot.csv') for error in batch['processing_summary']['validation_errors'])
+    
+    single = post_files(client, '/upload', [good], 'file')
+    assert_same_dataset(dataset(batch), dataset(single))
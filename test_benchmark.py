@@ -0,0 +1,21 @@
+"""
+Smoke test voor de benchmark: de stappen moeten op een kleine export draaien
+"""
+
+import pytest
+
+from benchmark import generate_survey, time_stages, write_survey
+
+@pytest.mark.parametrize('extension', ['xlsx', 'csv'])
+def test_time_stages_runs_on_small_survey(tmp_path, extension):
+    file_path = str(tmp_path / f'export.{extension}')
+    write_survey(generate_survey(30, 6, seed=1), file_path)
+    
+    summary, counts = time_stages(file_path, repeat=1)
+    expected = {'read', 'validate', 'wide_to_long', 'scores', 'persons', 'serialize', 'process_excel_file'}
+    if extension == 'xlsx':
+        expected.add('process_excel_file_streaming')
+    assert set(summary) == expected
+    assert all(stage['min'] >= 0 for stage in summary.values())
+    assert counts['wide_rows'] == 30
+    assert counts['persons'] > 0
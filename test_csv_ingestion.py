@@ -0,0 +1,59 @@
+"""
+Tests voor het inlezen van CSV exports
+
+Encoding en scheidingsteken worden uit het bestand afgeleid; een CSV export
+moet exact hetzelfde resultaat geven als dezelfde data als .xlsx.
+"""
+
+import pytest
+
+from benchmark import generate_survey, write_survey
+from data_processor import ExcelProcessor, sniff_csv
+
+@pytest.fixture(scope='module')
+def survey():
+    df = generate_survey(180, 12, seed=17)
+    # Namen met tekens buiten ASCII, zodat de encoding er toe doet
+    person_column, rater_column = df.columns[3], df.columns[1]
+    first = df[person_column].iloc[0]
+    df[person_column] = df[person_column].replace(first, 'José Müller')
+    df[rater_column] = df[rater_column].str.replace(first, 'Zoë Çelik', regex=False)
+    return df
+
+def without_emoji(df):
+    """cp1252 kent de emoji in de kolomnamen niet; de rest van de header blijft gelijk"""
+    return df.rename(columns=lambda column: column.replace('🔹 ', ''))
+
+def persons_as_dicts(result):
+    return {name: dict(person) for name, person in result['persons'].items()}
+
+@pytest.mark.parametrize('encoding, delimiter, emoji', [
+    ('utf-8-sig', ',', True),
+    ('utf-8', ';', True),
+    ('cp1252', '\t', False)
+])
+def test_csv_matches_xlsx(survey, tmp_path, encoding, delimiter, emoji):
+    df = survey if emoji else without_emoji(survey)
+    csv_path = str(tmp_path / 'export.csv')
+    df.to_csv(csv_path, sep=delimiter, index=False, encoding=encoding)
+    xlsx_path = str(tmp_path / 'export.xlsx')
+    write_survey(df, xlsx_path)
+    
+    assert sniff_csv(csv_path) == (encoding, delimiter)
+    
+    from_csv = ExcelProcessor().process_excel_file(csv_path)
+    from_xlsx = ExcelProcessor().process_excel_file(xlsx_path)
+    assert from_csv['success'] and from_xlsx['success']
+    assert 'José Müller' in from_csv['available_persons']
+    assert from_csv['available_persons'] == from_xlsx['available_persons']
+    assert list(from_csv['team_averages'].items()) == list(from_xlsx['team_averages'].items())
+    assert persons_as_dicts(from_csv) == persons_as_dicts(from_xlsx)
+    assert from_csv['row_keys'] == from_xlsx['row_keys']
+    assert from_csv['processing_summary']['total_feedback_entries'] == \
+        from_xlsx['processing_summary']['total_feedback_entries']
+
+def test_sniff_ignores_delimiters_inside_quotes(tmp_path):
+    csv_path = tmp_path / 'export.csv'
+    csv_path.write_text('Tijdstempel;Naam;"Vraag, met komma"\n1-2-2025 10:00;Piet;"Vaak, soms"\n',
+                        encoding='utf-8')
+    assert sniff_csv(str(csv_path)) == ('utf-8', ';')
@@ -0,0 +1,73 @@
+"""
+Tests voor batch export jobs op de server
+"""
+
+import os
+import time
+
+import pytest
+
+from benchmark import generate_survey, write_survey
+from export_jobs import ExportJobManager
+
+def wait_until_finished(job, timeout=30):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None:
+        assert time.monotonic() < deadline, 'export job niet op tijd klaar'
+        time.sleep(0.01)
+    assert job.status == 'done'
+
+@pytest.fixture(scope='module')
+def dataset_id(tmp_path_factory):
+    from app import app
+    file_path = str(tmp_path_factory.mktemp('export') / 'export.xlsx')
+    write_survey(generate_survey(60, 5, seed=43), file_path)
+    with app.test_client() as client, open(file_path, 'rb') as f:
+        data = client.post('/upload', data={'file': (f, 'export.xlsx')}).get_json()
+    assert data['success']
+    return data['dataset_id']
+
+@pytest.fixture
+def dataset(dataset_id):
+    from app import registry
+    return registry.get(dataset_id)
+
+def test_finished_jobs_are_kept_during_retention(dataset, tmp_path):
+    manager = ExportJobManager(max_jobs=1, work_dir=str(tmp_path), retention_seconds=3600)
+    jobs = [manager.submit(dataset, dataset.available_persons[:2]) for _ in range(3)]
+    for job in jobs:
+        wait_until_finished(job)
+    manager.submit(dataset, dataset.available_persons[:1])
+    
+    for job in jobs:
+        assert manager.get(job.job_id) is job
+        assert os.path.exists(job.zip_path)
+
+def test_active_download_is_not_pruned(dataset, tmp_path):
+    manager = ExportJobManager(max_jobs=1, work_dir=str(tmp_path), retention_seconds=0)
+    first = manager.submit(dataset, dataset.available_persons[:2])
+    wait_until_finished(first)
+    assert manager.start_download(first)
+    
+    wait_until_finished(manager.submit(dataset, dataset.available_persons[:1]))
+    assert manager.get(first.job_id) is first
+    assert os.path.exists(first.zip_path)
+    
+    manager.finish_download(first)
+    wait_until_finished(manager.submit(dataset, dataset.available_persons[:1]))
+    assert manager.get(first.job_id) is None
+    assert not os.path.exists(first.zip_path)
+    assert not manager.start_download(first)
+
+def test_download_releases_job(client, dataset_id):
+    from app import export_jobs
+    
+    data = client.post('/export_jobs', json={'dataset_id': dataset_id}).get_json()
+    job = export_jobs.get(data['job_id'])
+    wait_until_finished(job)
+    
+    response = client.get(data['download_url'])
+    assert response.status_code == 200
+    assert response.data[:2] == b'PK'
+    response.close()
+    assert job.active_downloads == 0
@@ -0,0 +1,36 @@
+"""
+Tests voor de cache van verwerkte resultaten
+"""
+
+import pytest
+
+import result_cache
+from benchmark import generate_survey, write_survey
+from data_processor import ExcelProcessor
+from result_cache import ResultCache
+
+@pytest.fixture(scope='module')
+def result(tmp_path_factory):
+    file_path = str(tmp_path_factory.mktemp('cache') / 'export.xlsx')
+    write_survey(generate_survey(120, 10, seed=41), file_path)
+    return ExcelProcessor().process_excel_file(file_path)
+
+def test_put_in_memory_does_not_serialize(result, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('json.dumps aangeroepen zonder cache_dir')
+    monkeypatch.setattr(result_cache.json, 'dumps', fail)
+    
+    cache = ResultCache()
+    cache.put('sleutel', result)
+    assert cache.get('sleutel') is result
+    assert cache.stats()['size_bytes'] > result['persons'].nbytes()
+
+def test_put_on_disk_round_trips(result, tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    cache.put('sleutel', result)
+    assert (tmp_path / 'sleutel.json').stat().st_size == cache.stats()['size_bytes']
+    
+    loaded = ResultCache(cache_dir=str(tmp_path)).get('sleutel')
+    assert loaded['team_averages'] == result['team_averages']
+    for name in result['available_persons']:
+        assert dict(loaded['persons'][name]) == dict(result['persons'][name])
@@ -0,0 +1,129 @@
+"""
+Tests voor de antwoordschalen
+
+Dezelfde antwoorden op een andere schaal moeten herkend worden en scores
+geven die volgens die schaal verschoven of geschaald zijn.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from benchmark import generate_survey, write_survey
+from chart_renderer import render_export_svg, scale_chart_options
+from data_processor import ExcelProcessor
+from score_scales import BUILTIN_SCALES, ScoreScale, load_scales
+
+FREQUENCY_SCORES = {'zelden': 1, 'soms': 2, 'vaak': 3, 'zeer vaak': 4}
+LIKERT_ANSWERS = {1: 'Oneens', 2: 'Neutraal', 3: 'Eens', 4: 'Helemaal eens'}
+
+@pytest.fixture(scope='module')
+def survey():
+    return generate_survey(250, 15, seed=21)
+
+def recode(survey, mapping):
+    """Zet de frequentie antwoorden om met mapping(score); andere antwoorden blijven staan"""
+    df = survey.copy()
+    for column in df.columns[5:]:
+        df[column] = [mapping(FREQUENCY_SCORES[answer.strip().lower()])
+                      if isinstance(answer, str) and answer.strip().lower() in FREQUENCY_SCORES else answer
+                      for answer in df[column]]
+    return df
+
+def process(df, tmp_path, name, **kwargs):
+    file_path = str(tmp_path / f'{name}.xlsx')
+    write_survey(df, file_path)
+    result = ExcelProcessor(**kwargs).process_excel_file(file_path)
+    assert result['success'], result.get('error')
+    return result
+
+def assert_transformed(result, reference, transform):
+    """Scores en team gemiddelden van result zijn transform(scores van reference)"""
+    assert result['available_persons'] == reference['available_persons']
+    for competentie, average in reference['team_averages'].items():
+        assert result['team_averages'][competentie] == pytest.approx(transform(average), abs=0.02)
+    for name in reference['available_persons']:
+        expected = reference['persons'][name]['scores']
+        scores = result['persons'][name]['scores']
+        assert scores.keys() == expected.keys()
+        for competentie, score in expected.items():
+            assert scores[competentie] == pytest.approx(transform(score), abs=0.02)
+
+def test_detects_likert_and_numeric_sheets(survey, tmp_path):
+    reference = process(survey, tmp_path, 'frequentie')
+    assert reference['processing_summary']['score_scale'] == 'frequentie_4'
+    assert reference['processing_summary']['score_max'] == 4
+    
+    likert = process(recode(survey, LIKERT_ANSWERS.get), tmp_path, 'likert')
+    assert likert['processing_summary']['score_scale'] == 'likert_5'
+    assert likert['processing_summary']['score_max'] == 5
+    assert_transformed(likert, reference, lambda score: score + 1)
+    
+    numeric = process(recode(survey, lambda score: score * 2), tmp_path, 'numeriek')
+    assert numeric['processing_summary']['score_scale'] == 'numeriek_10'
+    assert numeric['processing_summary']['score_max'] == 10
+    assert_transformed(numeric, reference, lambda score: score * 2)
+
+def test_custom_json_scale(survey, tmp_path):
+    config_path = tmp_path / 'scales.json'
+    config_path.write_text(json.dumps({
+        'ervaring_3': {
+            'description': '3-punts ervaring',
+            'values': {'nooit': 0, 'af en toe': 1, 'regelmatig': 2, 'altijd': 3},
+            'ignore': ['weet ik niet', 'geen mening']
+        }
+    }), encoding='utf-8')
+    scales = load_scales(str(config_path))
+    assert set(BUILTIN_SCALES) < set(scales)
+    assert scales['ervaring_3'].max_score == 3
+    assert scales['ervaring_3'].describe()['ignored'] == ['weet ik niet', 'geen mening']
+    
+    answers = {1: 'Nooit', 2: 'Af en toe', 3: 'Regelmatig', 4: 'Altijd'}
+    reference = process(survey, tmp_path, 'frequentie')
+    result = process(recode(survey, answers.get), tmp_path, 'ervaring', scales=scales)
+    assert result['processing_summary']['score_scale'] == 'ervaring_3'
+    assert result['processing_summary']['score_max'] == 3
+    assert result['processing_summary']['unknown_answers'] == {}
+    assert_transformed(result, reference, lambda score: score - 1)
+
+@pytest.mark.parametrize('score', [200, -129, 2.5, True])
+def test_rejects_scores_outside_int8(score):
+    with pytest.raises(ValueError):
+        ScoreScale('ongeldig', {'goed': score})
+
+def test_invalid_scale_in_config_file(tmp_path):
+    config_path = tmp_path / 'scales.json'
+    config_path.write_text(json.dumps({'te_groot': {'values': {'veel': 1000}}}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_scales(str(config_path))
+
+def test_unknown_answers_reported_with_counts(survey, tmp_path):
+    df = survey.copy()
+    column = df.columns[5]
+    df.loc[df.index[:7], column] = 'Misschien'
+    df.loc[df.index[7:10], column] = 'Geen idee'
+    
+    result = process(df, tmp_path, 'onbekend')
+    summary = result['processing_summary']
+    assert summary['score_scale'] == 'frequentie_4'
+    assert summary['unknown_answers'] == {'Misschien': 7, 'Geen idee': 3}
+    messages = [error for error in summary['validation_errors'] if 'Onbekende antwoorden' in error]
+    assert len(messages) == 1
+    assert "'Misschien' (7x)" in messages[0] and "'Geen idee' (3x)" in messages[0]
+    assert '10 cellen genegeerd' in messages[0]
+    
+    # Onbekende antwoorden tellen niet mee: de vervangen scores vallen weg
+    replaced = sum(isinstance(answer, str) and answer.strip().lower() in FREQUENCY_SCORES
+                   for answer in survey[column].iloc[:10])
+    reference = process(survey, tmp_path, 'frequentie')
+    assert summary['total_feedback_entries'] == reference['processing_summary']['total_feedback_entries'] - replaced
+
+def test_chart_axis_follows_scale_max():
+    assert scale_chart_options(4) == {'maxValue': 4, 'levels': 4}
+    assert scale_chart_options(10) == {'maxValue': 10, 'levels': 5}
+    assert scale_chart_options(None) == {}
+    
+    scores = {'PLANNING': 8.5, 'TEAMSPELER': 6.0, 'INNOVATIE': 9.0}
+    svg = render_export_svg(scores, scores, 'Test Persoon', options=scale_chart_options(10))
+    assert '>10.0</text>' in svg and '>2.0</text>' in svg
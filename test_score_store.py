@@ -0,0 +1,107 @@
+"""
+Tests voor de compacte PersonScoreStore
+
+De store moet per persoon exact dezelfde dict geven als de oorspronkelijke
+berekening met een dict per persoon, ook na een append.
+"""
+
+import numpy as np
+import pytest
+
+from benchmark import generate_survey, write_survey
+from data_processor import ExcelProcessor, combine_klantgerichtheid
+from score_store import PersonScoreStore
+
+def reference_person(long_df, person_name):
+    """Oorspronkelijke berekening van de persoon data uit de long format data"""
+    person_data = long_df[long_df['Persoon'] == person_name]
+    competency_scores = {}
+    competency_details = {}
+    for competentie in person_data['Competentie'].unique():
+        comp_data = person_data[person_data['Competentie'] == competentie]
+        valid_scores = comp_data['Score'].dropna()
+        if len(valid_scores) == 0:
+            continue
+        type_scores = {}
+        for feedback_type in comp_data['Type'].unique():
+            type_valid_scores = comp_data[comp_data['Type'] == feedback_type]['Score'].dropna()
+            if len(type_valid_scores) > 0:
+                type_scores[feedback_type] = {
+                    'average': type_valid_scores.mean(),
+                    'count': len(type_valid_scores),
+                    'scores': type_valid_scores.tolist()
+                }
+        competency_scores[competentie] = round(valid_scores.mean(), 2)
+        competency_details[competentie] = {
+            'overall_average': round(valid_scores.mean(), 2),
+            'by_type': type_scores,
+            'total_responses': len(valid_scores),
+            'std_deviation': round(valid_scores.std(), 2) if len(valid_scores) > 1 else 0
+        }
+    combine_klantgerichtheid(competency_scores, competency_details)
+    return {
+        'person_name': person_name,
+        'scores': competency_scores,
+        'details': competency_details,
+        'total_responses': len(person_data)
+    }
+
+def reference_persons(file_path):
+    processor = ExcelProcessor()
+    df = processor.read_excel_file(file_path)
+    processor.validate_excel_structure(df)
+    long_df = processor.convert_wide_to_long(df)
+    long_df = long_df.astype({'Persoon': object, 'Competentie': object, 'Type': object})
+    return {name: reference_person(long_df, name) for name in processor.get_available_persons(long_df)}
+
+def with_sorted_scores(person_data):
+    """Persoon data met de ruwe scores per type gesorteerd (volgorde na een append)"""
+    details = {
+        competentie: {**detail, 'by_type': {
+            feedback_type: {**stats, 'scores': sorted(stats['scores'])}
+            for feedback_type, stats in detail['by_type'].items()
+        }} if 'by_type' in detail else detail
+        for competentie, detail in person_data['details'].items()
+    }
+    return {**person_data, 'details': details}
+
+@pytest.fixture(scope='module')
+def survey():
+    return generate_survey(300, 20, seed=31)
+
+def test_store_matches_dict_output(survey, tmp_path):
+    file_path = str(tmp_path / 'export.xlsx')
+    write_survey(survey, file_path)
+    result = ExcelProcessor().process_excel_file(file_path)
+    
+    assert isinstance(result['persons'], PersonScoreStore)
+    expected = reference_persons(file_path)
+    assert list(result['persons']) == list(expected)
+    for name, person_data in expected.items():
+        assert dict(result['persons'][name]) == person_data
+    
+    # De arrays zijn veel kleiner dan de dicts per persoon
+    assert result['persons'].row_scores.dtype == np.int8
+
+def test_store_after_append_matches_dict_output(client, survey, tmp_path):
+    from app import registry
+    
+    partial_path = str(tmp_path / 'partial.xlsx')
+    write_survey(survey.iloc[:200], partial_path)
+    full_path = str(tmp_path / 'export.xlsx')
+    write_survey(survey, full_path)
+    
+    with open(partial_path, 'rb') as f:
+        data = client.post('/upload', data={'file': (f, 'partial.xlsx')}).get_json()
+    with open(full_path, 'rb') as f:
+        data = client.post('/upload', data={'file': (f, 'export.xlsx'), 'mode': 'append',
+                                            'dataset_id': data['dataset_id']}).get_json()
+    assert data['success'] and data['append_summary']['new_rows'] == 100
+    
+    persons = registry.get(data['dataset_id']).persons
+    assert isinstance(persons, PersonScoreStore)
+    assert persons.overrides
+    expected = reference_persons(full_path)
+    assert sorted(persons) == sorted(expected)
+    for name, person_data in expected.items():
+        assert with_sorted_scores(dict(persons[name])) == with_sorted_scores(person_data)
@@ -0,0 +1,41 @@
+"""
+Tests voor de lokale snapshots van datasets
+
+Een snapshot bewaart de compacte arrays van de score store; de details per
+persoon blijven daardoor lazy, zowel bij het opslaan als na herladen.
+"""
+
+from benchmark import generate_survey, write_survey
+
+def upload(client, file_path):
+    """Upload een bestand via /upload en geef de JSON response terug"""
+    with open(file_path, 'rb') as f:
+        response = client.post('/upload', data={'file': (f, 'export.xlsx')},
+                               content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_snapshot_keeps_details_lazy(client, tmp_path):
+    from app import registry, snapshot_store
+    
+    assert snapshot_store is not None
+    file_path = str(tmp_path / 'export.xlsx')
+    write_survey(generate_survey(200, 12, seed=5), file_path)
+    data = upload(client, file_path)
+    assert data['success']
+    
+    dataset = registry.get(data['dataset_id'])
+    assert dataset.dataset_id in [d['id'] for d in snapshot_store.list_datasets()]
+    # Opslaan van de snapshot mag geen details berekenen
+    assert dataset.persons.details_computed == 0
+    
+    loaded = snapshot_store.load(dataset.dataset_id)
+    assert loaded.persons.details_computed == 0
+    assert list(loaded.persons) == list(dataset.persons)
+    assert loaded.team_averages == dataset.team_averages
+    
+    name = dataset.available_persons[0]
+    assert loaded.persons[name]['scores'] == dataset.persons[name]['scores']
+    assert loaded.persons.details_computed == 0
+    assert loaded.persons[name]['details'] == dataset.persons[name]['details']
+    assert loaded.persons.details_computed == 1
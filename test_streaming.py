@@ -0,0 +1,48 @@
+"""
+Tests voor de streaming verwerking van grote .xlsx bestanden
+
+De verwerking in chunks moet exact hetzelfde resultaat geven als de
+volledige verwerking van het bestand in één keer.
+"""
+
+import pytest
+
+from benchmark import generate_survey, write_survey
+from data_processor import ExcelProcessor
+
+def persons_as_dicts(result):
+    """Persoon data (inclusief details) als gewone dicts, om te vergelijken"""
+    return {name: dict(person) for name, person in result['persons'].items()}
+
+@pytest.fixture(scope='module')
+def survey_xlsx(tmp_path_factory):
+    """Export met 523 rijen: geen veelvoud van de chunk grootte"""
+    file_path = str(tmp_path_factory.mktemp('streaming') / 'export.xlsx')
+    write_survey(generate_survey(523, 40, seed=3), file_path)
+    return file_path
+
+@pytest.mark.parametrize('chunk_size', [100, 523, 1000])
+def test_streaming_matches_full_processing(survey_xlsx, chunk_size):
+    full = ExcelProcessor().process_excel_file(survey_xlsx)
+    streamed = ExcelProcessor().process_excel_file_streaming(survey_xlsx, chunk_size=chunk_size)
+    
+    assert full['success'] and streamed['success']
+    assert streamed['available_persons'] == full['available_persons']
+    # Ook de volgorde van de competenties moet gelijk zijn
+    assert list(streamed['team_averages'].items()) == list(full['team_averages'].items())
+    assert persons_as_dicts(streamed) == persons_as_dicts(full)
+    assert streamed['row_keys'] == full['row_keys']
+    assert streamed['total_responses'] == full['total_responses']
+    for key in ('total_rows_processed', 'total_feedback_entries', 'persons_found', 'competencies_found',
+                'competency_categories', 'score_scale', 'unknown_answers'):
+        assert streamed['processing_summary'][key] == full['processing_summary'][key]
+
+def test_streaming_counts_chunks(survey_xlsx):
+    processor = ExcelProcessor()
+    result = processor.process_excel_file_streaming(survey_xlsx, chunk_size=100)
+    
+    stages = result['processing_summary']['stages']
+    # Vijf chunks van 100 rijen en een laatste van 23
+    assert stages['melt']['calls'] == 6
+    assert stages['melt']['rows_in'] == 523
+    assert result['processing_summary']['total_rows_processed'] == 523